@@ -1,8 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from app.services.http_cache import cached_json_response, data_version
 
 router = APIRouter()
 
+# Placeholder for Firestore integration
+PRODUCTS = [{"id": 1, "name": "Product A", "price": 100}, {"id": 2, "name": "Product B", "price": 200}]
+PRODUCTS_VERSION = data_version(PRODUCTS)
+
 @router.get("/")
-async def get_products():
-    # Placeholder for Firestore integration
-    return [{"id": 1, "name": "Product A", "price": 100}, {"id": 2, "name": "Product B", "price": 200}]
+async def get_products(request: Request):
+    return cached_json_response(request, "products", PRODUCTS_VERSION, lambda: PRODUCTS, static=True)
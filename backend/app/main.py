@@ -1,28 +1,120 @@
 """
-Bimo Tech RFQ Backend
-FastAPI application for handling chat, RFQ processing, and supplier matching.
+Bimo Tech Backend
+FastAPI application for chat, RFQ processing, supplier matching, and the
+site's product, investor, contact and payment endpoints.
+
+This is the only ASGI entry point (`uvicorn app.main:app`). Startup is kept
+short for scale-to-zero cold starts: slow SDK imports and remote loads run
+as a background warm-up after the server is listening (see
+app/services/startup.py), and phase timings are reported on /health.
 """
-from fastapi import FastAPI
+from app.services.startup import get_startup_stats, mark, phase, start_warmup, stop_warmup
+
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from app.api.api import api_router
 from app.routers import chat, rfq
-from app.services.firebase import initialize_firebase
+from app.services.firebase import ensure_firebase, shutdown_firebase, probe_firestore, probe_storage
+from app.services.material_catalog import (
+    start_material_catalog,
+    stop_material_catalog,
+    get_material_catalog_info,
+)
+from app.services.supplier_catalog import (
+    start_supplier_catalog,
+    stop_supplier_catalog,
+    get_catalog_stats,
+)
+from app.services.rfq_pipeline import drain_pipeline, get_pending_count
+from app.services.outbox import start_outbox_worker, stop_outbox_worker, get_outbox_stats
+from app.services.email_transport import initialize_email_transport, close_email_transport
+from app.services.llm_clients import ensure_llm_clients, close_llm_clients, get_connection_stats
+from app.services.conversation import drain_summaries, start_tokenizer
+from app.services.http_cache import get_http_cache_stats
+from app.services.admission import get_admission_stats
+from app.services.design_storage import start_design_storage, stop_design_storage, get_design_storage_stats
+from app.services.design_analysis import stop_design_analysis, get_design_analysis_stats
+from app.services.bulk_ingest import stop_bulk_ingest, get_ingest_stats
+from app.services.response_cache import start_response_cache, close_response_cache, get_response_cache_stats
+from app.services.metrics import RequestMetricsMiddleware, register_stats, render_metrics
+from app.services.health import (
+    register_probe,
+    start_health_probes,
+    stop_health_probes,
+    get_dependency_health,
+    overall_status,
+)
+
+register_probe("firestore", probe_firestore)
+register_probe("storage", probe_storage)
+
+# Service stats exported as gauges on /metrics
+register_stats("chat_admission", get_admission_stats)
+register_stats("llm_cache", get_response_cache_stats)
+register_stats("http_cache", get_http_cache_stats)
+register_stats("supplier_catalog", get_catalog_stats)
+register_stats("email_outbox", get_outbox_stats)
+register_stats("design_uploads", get_design_storage_stats)
+register_stats("design_analysis", get_design_analysis_stats)
+register_stats("bulk_ingest", get_ingest_stats)
+register_stats("rfq_pipeline", lambda: {"pending": get_pending_count()})
+register_stats("startup", get_startup_stats)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize services on startup."""
-    # Initialize Firebase
-    initialize_firebase()
+    """Start the request-critical services, then warm up the rest in the background."""
+    with phase("response_cache"):
+        await start_response_cache()
+    # Compiled materials catalog (hot-reloaded when the snapshot changes)
+    with phase("material_catalog"):
+        await start_material_catalog()
+    # Deliver queued emails (including any left over from a previous run)
+    with phase("email_outbox"):
+        initialize_email_transport()
+        await start_outbox_worker()
+    # Purge abandoned resumable design uploads
+    with phase("design_storage"):
+        await start_design_storage()
+    mark("serving")
+    # Slow SDK imports and remote loads; a request that needs one first initializes it on demand
+    start_warmup(
+        [
+            ("firebase", ensure_firebase),
+            # Load the supplier replica used by matching
+            ("supplier_catalog", start_supplier_catalog),
+            # Dependency probes behind /health
+            ("health_probes", start_health_probes),
+        ],
+        # Shared LLM provider clients (pooled keep-alive connections)
+        [("llm_clients", ensure_llm_clients)],
+        # Chat history token counting (BPE file from the local cache)
+        [("tokenizer", start_tokenizer)],
+    )
     yield
-    # Cleanup on shutdown
-    pass
+    # Cleanup on shutdown (let in-flight RFQ fan-outs finish first)
+    await stop_warmup()
+    await stop_health_probes()
+    await drain_pipeline()
+    await stop_design_analysis()
+    await stop_bulk_ingest()
+    await stop_design_storage()
+    await stop_outbox_worker()
+    await close_email_transport()
+    await drain_summaries()
+    await close_llm_clients()
+    close_response_cache()
+    await stop_supplier_catalog()
+    await stop_material_catalog()
+    shutdown_firebase()
 
 
 app = FastAPI(
-    title="Bimo Tech RFQ API",
-    description="Backend API for chat-based RFQ system and supplier matching",
+    title="Bimo Tech API",
+    description="Backend API for the chat-based RFQ system, supplier matching, and site data",
     version="1.0.0",
     lifespan=lifespan,
 )
@@ -32,6 +124,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=[
         "http://localhost:3000",
+        "http://127.0.0.1:3000",
         "https://bimotech.pl",
         "https://www.bimotech.pl",
     ],
@@ -40,27 +133,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency by route template, for /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
 app.include_router(rfq.router, prefix="/api/v1/rfq", tags=["rfq"])
+# Products, investors, contacts, payments
+app.include_router(api_router, prefix="/api/v1")
 
 
 @app.get("/")
 async def root():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "Bimo Tech RFQ API"}
+    return {"status": "healthy", "service": "Bimo Tech API"}
 
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check."""
+    """Detailed health check (dependency state comes from cached probes and recent calls)."""
     return {
-        "status": "healthy",
+        "status": overall_status(),
         "version": "1.0.0",
+        "dependencies": get_dependency_health(),
+        "startup": get_startup_stats(),
         "services": {
-            "firebase": "connected",
-            "llm": "available",
+            "llm_connections": get_connection_stats(),
+            "llm_cache": get_response_cache_stats(),
+            "chat_admission": get_admission_stats(),
+            "supplier_catalog": get_catalog_stats(),
+            "material_catalog": get_material_catalog_info(),
+            "http_cache": get_http_cache_stats(),
+            "rfq_pipeline": {"pending": get_pending_count()},
+            "email_outbox": await asyncio.to_thread(get_outbox_stats),
+            "design_uploads": get_design_storage_stats(),
+            "design_analysis": get_design_analysis_stats(),
+            "bulk_ingest": get_ingest_stats(),
         }
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    # Stats sources include SQLite counts (email outbox); keep them off the event loop
+    body, content_type = await asyncio.to_thread(render_metrics)
+    return Response(content=body, headers={"Content-Type": content_type})
+
+
+mark("imported")
@@ -1,7 +1,7 @@
 """RFQ Data Models"""
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from enum import Enum
 
 
@@ -51,6 +51,13 @@ class RFQSubmitResponse(BaseModel):
     estimated_response_time: str = "24-48 hours"
 
 
+class DesignUploadRequest(BaseModel):
+    """Request to start a resumable design file upload."""
+    filename: str
+    size: int = Field(..., gt=0)
+    content_type: Optional[str] = None
+
+
 class SupplierMatch(BaseModel):
     """Matched supplier for an RFQ item."""
     supplier_id: str
@@ -1,6 +1,6 @@
 """Supplier Data Models"""
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from enum import Enum
 
 
@@ -23,6 +23,12 @@ class Supplier(BaseModel):
     active: bool = True
     notes: Optional[str] = None
 
+    @field_validator('capabilities')
+    @classmethod
+    def lowercase_capabilities(cls, capabilities: List[str]) -> List[str]:
+        # Firestore's array-contains-any is case-sensitive; matching queries lowercase tags
+        return [c.strip().lower() for c in capabilities]
+
 
 class SupplierQuote(BaseModel):
     """Quote from a supplier."""
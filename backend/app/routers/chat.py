@@ -1,14 +1,22 @@
 """Chat Router - Handles conversational AI for material inquiries and RFQ."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from app.models.chat import ChatRequest, ChatResponse, ChatResponseType
-from app.services.llm import get_chat_response
-from app.services.materials import search_materials, get_material_info
+from app.services.llm import get_chat_response, stream_chat_response
+from app.services.materials import find_material_context, search_materials_ranked, get_material_info, catalog_version
+from app.services.http_cache import cached_json_response
+from app.services.fast_json import dumps, json_body, json_body_openapi, model_response
+from app.services.admission import check_rate, client_key
 
 router = APIRouter()
 
 
-@router.post("/", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+@router.post(
+    "/",
+    responses={200: {"model": ChatResponse}},
+    openapi_extra=json_body_openapi(ChatRequest),
+)
+async def chat(http_request: Request, request: ChatRequest = Depends(json_body(ChatRequest))):
     """
     Process a chat message and return an AI response.
     
@@ -17,40 +25,115 @@ async def chat(request: ChatRequest):
     - Provide product recommendations
     - Help build RFQ requests
     - Provide technical specifications
+    
+    Clients over the chat rate limit get 429 with Retry-After.
     """
+    client_id = _check_rate(http_request)
     try:
         # Get the latest user message
         user_message = request.messages[-1].content if request.messages else ""
         
-        # Check for material-related queries
-        material_info = search_materials(user_message)
+        # Ground the reply in the material the message mentions
+        material_info = find_material_context(user_message)
         
         # Get AI response
         response = await get_chat_response(
             messages=request.messages,
             context=request.context,
-            material_context=material_info
+            material_context=material_info,
+            client_id=client_id,
         )
         
-        return response
+        return model_response(response)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/stream", openapi_extra=json_body_openapi(ChatRequest))
+async def chat_stream(http_request: Request, request: ChatRequest = Depends(json_body(ChatRequest))):
+    """
+    Stream an AI response as Server-Sent Events.
+    
+    Events:
+    - `token`: {"text": "..."} for each chunk as the provider produces it
+    - `done`: the full ChatResponse (response, type, data, suggested_actions)
+    
+    If the client disconnects, the upstream LLM request is cancelled.
+    """
+    client_id = _check_rate(http_request)
+    user_message = request.messages[-1].content if request.messages else ""
+    material_info = find_material_context(user_message)
+    
+    async def event_stream():
+        async for event, payload in stream_chat_response(
+            messages=request.messages,
+            context=request.context,
+            material_context=material_info,
+            client_id=client_id,
+        ):
+            if event == "token":
+                yield _sse(event, dumps({"text": payload}).decode())
+            else:
+                yield _sse(event, payload.model_dump_json())
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _check_rate(request: Request) -> str:
+    """Apply the per-client chat rate limit; returns the client id."""
+    client_id = client_key(request)
+    retry_after = check_rate(client_id)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many chat requests, please slow down",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+    return client_id
+
+
+def _sse(event: str, data: str) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
 @router.get("/materials/{material_id}")
-async def get_material(material_id: str):
+async def get_material(material_id: str, request: Request):
     """Get detailed information about a specific material."""
     material = get_material_info(material_id)
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
-    return material
+    return cached_json_response(request, ("material", material_id), catalog_version(), lambda: material, static=True)
 
 
 @router.get("/search")
-async def search(q: str):
-    """Search for materials by name or keyword."""
-    results = search_materials(q)
-    return {"results": results, "count": len(results)}
+async def search(
+    request: Request,
+    q: str,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Search for materials by name, symbol, alloy, form or application.
+    
+    Results are ranked by relevance and tolerate typos ("tungstn").
+    `count` is the total number of matches; page with `limit` / `offset`.
+    """
+    def build():
+        total, hits = search_materials_ranked(q, limit=limit, offset=offset)
+        return {
+            "results": [{**hit.document, "score": hit.score} for hit in hits],
+            "count": total,
+            "limit": limit,
+            "offset": offset,
+        }
+    
+    key = ("search", " ".join(q.lower().split()), limit, offset)
+    return cached_json_response(request, key, catalog_version(), build)
 
 
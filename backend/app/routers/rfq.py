@@ -1,24 +1,38 @@
 """RFQ Router - Handles Request for Quote operations."""
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header, Request
+from fastapi.responses import FileResponse
 from typing import List, Optional
-from app.models.rfq import RFQSubmitRequest, RFQSubmitResponse, RFQSession, RFQStatus
-from app.services.firebase import save_rfq, get_rfq, update_rfq_status
-from app.services.matching import match_suppliers_for_rfq
-from app.services.email import send_rfq_to_suppliers, send_confirmation_to_customer
+import hmac
+import os
+from app.models.rfq import RFQSubmitRequest, RFQSubmitResponse, RFQSession, RFQStatus, DesignUploadRequest
+from app.services.design_storage import UploadError, WRITE_BUFFER_SIZE, get_design_store
+from app.services.design_analysis import analyze_design, get_preview_path, schedule_analysis
+from app.services.fast_json import FastJSONResponse, json_body, json_body_openapi, model_response
+from app.services.bulk_ingest import IngestError, detect_format, ingest
+from app.services.firebase import get_rfq, update_rfq_status
+from app.services.rfq_pipeline import submit_rfq_pipeline
+from app.services.supplier_catalog import refresh_suppliers, get_catalog_stats
 
 router = APIRouter()
 
+# Bearer token for the internal supplier endpoints; unset disables them
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
 
-@router.post("/submit", response_model=RFQSubmitResponse)
-async def submit_rfq(request: RFQSubmitRequest):
+
+@router.post(
+    "/submit",
+    responses={200: {"model": RFQSubmitResponse}},
+    openapi_extra=json_body_openapi(RFQSubmitRequest),
+)
+async def submit_rfq(request: RFQSubmitRequest = Depends(json_body(RFQSubmitRequest))):
     """
     Submit an RFQ for processing.
     
     This will:
-    1. Save the RFQ to the database
-    2. Match with appropriate suppliers
-    3. Send anonymized RFQ emails to suppliers
-    4. Send confirmation to customer
+    1. Save the RFQ to the database (while matching suppliers concurrently)
+    2. Respond as soon as the RFQ is saved
+    3. Send anonymized RFQ emails to suppliers (background)
+    4. Send confirmation to customer (background)
     """
     try:
         # Create RFQ session
@@ -30,33 +44,77 @@ async def submit_rfq(request: RFQSubmitRequest):
             design_files=request.design_files,
         )
         
-        # Save to Firebase
-        rfq_id = await save_rfq(rfq_session)
-        
-        # Match suppliers
-        matches = await match_suppliers_for_rfq(rfq_session)
+        rfq_id = await submit_rfq_pipeline(rfq_session)
         
-        # Send emails to matched suppliers (anonymized)
-        await send_rfq_to_suppliers(rfq_session, matches)
-        
-        # Send confirmation to customer
-        await send_confirmation_to_customer(
-            email=request.contact_email,
-            rfq_id=rfq_id,
-            item_count=len(request.items)
-        )
-        
-        return RFQSubmitResponse(
+        return model_response(RFQSubmitResponse(
             success=True,
             rfq_id=rfq_id,
             message="Your RFQ has been submitted successfully. We will contact you within 24-48 hours.",
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{rfq_id}")
+async def require_admin(authorization: Optional[str] = Header(None)):
+    """Only callers holding ADMIN_API_TOKEN may use the internal endpoints."""
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+@router.post("/suppliers/refresh", dependencies=[Depends(require_admin)])
+async def refresh_supplier_catalog():
+    """
+    Force a reload of the in-memory supplier catalog (internal use).
+
+    Needs the admin bearer token; answers 404 while ADMIN_API_TOKEN is unset.
+    """
+    try:
+        await refresh_suppliers()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Supplier read failed: {e}")
+    return get_catalog_stats()
+
+
+@router.post("/suppliers/bulk", response_class=FastJSONResponse, dependencies=[Depends(require_admin)])
+async def bulk_import_suppliers(request: Request, format: Optional[str] = None, dry_run: bool = False):
+    """
+    Create or update suppliers from a CSV or JSONL request body (internal use).
+    
+    The format comes from `format` or the Content-Type (`text/csv`,
+    `application/x-ndjson`). CSV needs a header row with the Supplier field
+    names; list cells separate values with `;` or `|`. Rows are keyed by
+    `id`. Returns counts and the rejected rows with their line numbers.
+    """
+    return await _bulk_import("suppliers", request, format, dry_run)
+
+
+@router.post("/quotes/bulk", response_class=FastJSONResponse, dependencies=[Depends(require_admin)])
+async def bulk_import_quotes(request: Request, format: Optional[str] = None, dry_run: bool = False):
+    """
+    Save supplier quotes from a CSV or JSONL request body (internal use).
+    
+    Same body and report as `/suppliers/bulk`; one document per RFQ,
+    supplier and item, so a re-sent quote replaces the earlier one.
+    """
+    return await _bulk_import("quotes", request, format, dry_run)
+
+
+async def _bulk_import(kind: str, request: Request, fmt: Optional[str], dry_run: bool):
+    fmt = fmt or detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=csv|jsonl")
+    try:
+        return await ingest(kind, request.stream(), fmt, dry_run=dry_run)
+    except IngestError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.get("/{rfq_id}", response_class=FastJSONResponse)
 async def get_rfq_status(rfq_id: str):
     """Get the status and details of an RFQ."""
     rfq = await get_rfq(rfq_id)
@@ -79,31 +137,111 @@ async def upload_design_file(file: UploadFile = File(...)):
     """
     Upload a design file (PDF, STEP, DXF, DWG).
     Returns a reference to use in the RFQ submission.
+    
+    The file is streamed to storage and stored by content hash, so
+    re-uploading an identical file returns the same `file_ref`. For large
+    CAD files use the resumable `/uploads` endpoints instead.
     """
-    # Validate file type
-    allowed_types = [
-        "application/pdf",
-        "application/step",
-        "application/dxf",
-        "application/dwg",
-        "image/png",
-        "image/jpeg",
-    ]
+    store = get_design_store()
+    try:
+        session = store.create(file.filename, file.content_type)
+        try:
+            await store.append(session, 0, _read_chunks(file))
+            result = await store.finalize(session)
+        except BaseException:
+            await store.abort(session)
+            raise
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     
-    if file.content_type not in allowed_types and not file.filename.endswith(('.step', '.stp', '.dxf', '.dwg')):
-        raise HTTPException(
-            status_code=400, 
-            detail="Invalid file type. Allowed: PDF, STEP, DXF, DWG, PNG, JPEG"
-        )
+    schedule_analysis(result["file_ref"])
+    return {"success": True, **result}
+
+
+@router.post("/uploads")
+async def create_design_upload(request: DesignUploadRequest):
+    """
+    Start a resumable design file upload.
     
-    # TODO: Upload to Firebase Storage
-    # For now, return a placeholder
-    file_ref = f"designs/{file.filename}"
+    Send the file with `PATCH /uploads/{upload_id}` requests (any number,
+    `chunk_size` bytes is a good size), each with an `Upload-Offset` header
+    equal to the current offset. After a dropped connection, `GET
+    /uploads/{upload_id}` returns the offset to resume from. The request
+    that completes the file returns its `file_ref`.
+    """
+    try:
+        session = get_design_store().create(request.filename, request.content_type, request.size)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return session.info()
+
+
+@router.get("/uploads/{upload_id}")
+async def get_design_upload(upload_id: str):
+    """Current offset of a resumable upload."""
+    try:
+        return get_design_store().get(upload_id).info()
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.patch("/uploads/{upload_id}")
+async def append_design_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+):
+    """Append the request body to a resumable upload at `Upload-Offset`."""
+    store = get_design_store()
+    try:
+        session = store.get(upload_id)
+        await store.append(session, upload_offset, request.stream())
+        if not store.is_complete(session):
+            return {**session.info(), "complete": False}
+        result = await store.finalize(session)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     
-    return {
-        "success": True,
-        "file_ref": file_ref,
-        "filename": file.filename,
-    }
+    schedule_analysis(result["file_ref"])
+    return {"success": True, "complete": True, **result}
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_design_upload(upload_id: str):
+    """Abandon a resumable upload and delete what was received."""
+    store = get_design_store()
+    try:
+        await store.abort(store.get(upload_id))
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return {"success": True}
+
+
+@router.get("/designs/{sha256}/analysis")
+async def get_design_analysis(sha256: str):
+    """
+    Metadata extracted from a stored design file: part count, bounding box,
+    volume and material callouts (STEP/DXF), page count and text (PDF),
+    size and preview (PNG/JPEG). Waits for the analysis if it is still running.
+    """
+    result = await analyze_design(f"designs/{sha256}")
+    if result["status"] in ("unsupported", "missing"):
+        raise HTTPException(status_code=404, detail="Design file not found")
+    return result
+
+
+@router.get("/designs/{sha256}/preview")
+async def get_design_preview(sha256: str):
+    """Downscaled JPEG preview of an image design file."""
+    result = await analyze_design(f"designs/{sha256}")
+    if not result.get("preview"):
+        raise HTTPException(status_code=404, detail="No preview for this design file")
+    return FileResponse(get_preview_path(sha256), media_type="image/jpeg")
 
 
+async def _read_chunks(file: UploadFile):
+    while True:
+        chunk = await file.read(WRITE_BUFFER_SIZE)
+        if not chunk:
+            return
+        yield chunk
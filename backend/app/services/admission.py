@@ -0,0 +1,272 @@
+"""Admission Control - Keeps LLM-backed chat within what the providers can serve.
+
+Two layers:
+
+- Per-client token buckets (`check_rate`): each client gets CHAT_RATE_BURST
+  requests up front, refilled at CHAT_RATE_PER_MINUTE. Over the limit the
+  request is refused with 429 and a Retry-After.
+- A global concurrency cap on provider calls (`admit`): at most
+  LLM_MAX_CONCURRENCY run at once. Beyond that, callers wait in a short
+  bounded queue served round-robin across clients, so one busy client cannot
+  starve the rest. When the queue is full, or a caller waits longer than
+  LLM_QUEUE_TIMEOUT, the request is shed: it gets the keyword fallback
+  straight away instead of piling onto a saturated provider. A full queue
+  sheds the newest request of whichever client has the most waiting.
+
+Cache hits never reach the provider and are not admitted. Queue depth,
+wait times and the shed rate are reported on /health.
+"""
+import os
+import time
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_QUEUE_SIZE = int(os.getenv("LLM_QUEUE_SIZE", "32"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "2"))
+CHAT_RATE_PER_MINUTE = float(os.getenv("CHAT_RATE_PER_MINUTE", "20"))
+CHAT_RATE_BURST = int(os.getenv("CHAT_RATE_BURST", "5"))
+
+# Sliding window for the shed rate, in seconds
+METRICS_WINDOW = 60
+# Idle buckets are dropped once this many clients are tracked
+MAX_TRACKED_CLIENTS = 10000
+
+
+def client_key(request: Request) -> str:
+    """
+    Identify the caller for rate limiting: the address the platform's proxy
+    appended to X-Forwarded-For (Cloud Run), else the peer address.
+    """
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """Token bucket per client."""
+
+    def __init__(self, per_minute: float = CHAT_RATE_PER_MINUTE, burst: int = CHAT_RATE_BURST):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # client -> (tokens, updated)
+        self.limited = 0
+
+    def try_acquire(self, client: str) -> float:
+        """Take a token; returns 0 if allowed, else seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self._buckets[client] = (tokens - 1, now)
+            if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._prune(now)
+            return 0.0
+        self._buckets[client] = (tokens, now)
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely is the same as no bucket
+        full_after = self.burst / self.rate
+        for client, (_, updated) in list(self._buckets.items()):
+            if now - updated >= full_after:
+                del self._buckets[client]
+
+
+class _Window:
+    """Event counts over the last METRICS_WINDOW seconds, in one-second buckets."""
+
+    def __init__(self, seconds: int = METRICS_WINDOW):
+        self.seconds = seconds
+        self._buckets: Deque[List[Any]] = deque()  # [second, counts]
+
+    def add(self, event: str):
+        second = int(time.monotonic())
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, {}])
+        counts = self._buckets[-1][1]
+        counts[event] = counts.get(event, 0) + 1
+
+    def totals(self) -> Dict[str, int]:
+        cutoff = int(time.monotonic()) - self.seconds
+        while self._buckets and self._buckets[0][0] <= cutoff:
+            self._buckets.popleft()
+        totals: Dict[str, int] = {}
+        for _, counts in self._buckets:
+            for event, count in counts.items():
+                totals[event] = totals.get(event, 0) + count
+        return totals
+
+
+class AdmissionController:
+    """Concurrency cap with a bounded, per-client round-robin wait queue."""
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        queue_size: int = LLM_QUEUE_SIZE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._waits: Deque[float] = deque(maxlen=1024)
+        self._window = _Window()
+        self.counts = {"admitted": 0, "waited": 0, "shed_queue_full": 0, "shed_timeout": 0}
+
+    def _record(self, event: str):
+        self.counts[event] += 1
+        self._window.add(event)
+
+    async def acquire(self, client: str) -> bool:
+        """Wait for a slot. False means the request was shed."""
+        if self.active < self.max_concurrency and self.queued == 0:
+            self.active += 1
+            self._record("admitted")
+            return True
+        if self.queued >= self.queue_size and not self._push_out(client):
+            self._record("shed_queue_full")
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(client, deque()).append(future)
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            admitted = await asyncio.wait_for(future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled() and future.result():
+                # A slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                self._remove(client, future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._record("shed_timeout")
+            return False
+        if not admitted:
+            # Pushed out of the queue by a client with fewer requests waiting
+            self._record("shed_queue_full")
+            return False
+        self._waits.append(time.perf_counter() - start)
+        self._record("admitted")
+        self._record("waited")
+        return True
+
+    def release(self):
+        """Free a slot, handing it straight to the next client in turn."""
+        while self._waiting:
+            client, queue = next(iter(self._waiting.items()))
+            future = queue.popleft()
+            self.queued -= 1
+            if queue:
+                self._waiting.move_to_end(client)
+            else:
+                del self._waiting[client]
+            if not future.done():
+                future.set_result(True)
+                return
+        self.active -= 1
+
+    def _push_out(self, client: str) -> bool:
+        """
+        Make room in a full queue by shedding the newest waiter of the client
+        with the most requests waiting, if that is more than `client` would
+        have. Keeps one busy client from filling the queue for everyone.
+        """
+        busiest = max(self._waiting, key=lambda c: len(self._waiting[c]), default=None)
+        if busiest is None:
+            return False
+        waiting = len(self._waiting.get(client, ()))
+        if len(self._waiting[busiest]) <= waiting + 1:
+            return False
+        future = self._waiting[busiest].pop()
+        self.queued -= 1
+        future.set_result(False)
+        return True
+
+    def _remove(self, client: str, future: asyncio.Future):
+        queue = self._waiting.get(client)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self.queued -= 1
+        if not queue:
+            del self._waiting[client]
+
+    @asynccontextmanager
+    async def admit(self, client: str) -> AsyncIterator[bool]:
+        """`async with admit(client) as admitted:`; the slot is released on exit."""
+        admitted = await self.acquire(client)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        window = self._window.totals()
+        shed = window.get("shed_queue_full", 0) + window.get("shed_timeout", 0)
+        decided = window.get("admitted", 0) + shed
+        waits = sorted(self._waits)
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued,
+            "queue_size": self.queue_size,
+            "queued_clients": len(self._waiting),
+            **self.counts,
+            "shed_rate": round(shed / decided, 4) if decided else 0.0,
+            "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+        }
+
+
+_controller: Optional[AdmissionController] = None
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the global admission controller."""
+    global _controller
+
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the global per-client rate limiter."""
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def check_rate(client: str) -> float:
+    """0 if `client` may send a chat request now, else seconds to wait."""
+    return get_rate_limiter().try_acquire(client)
+
+
+def admit(client: Optional[str]):
+    """Admission for one provider call (see AdmissionController.admit)."""
+    return get_admission_controller().admit(client or "anonymous")
+
+
+def get_admission_stats() -> Dict[str, Any]:
+    return {
+        **get_admission_controller().stats(),
+        "rate_limited": get_rate_limiter().limited,
+    }
@@ -0,0 +1,483 @@
+"""Bulk Ingest - Streaming CSV/JSONL import of suppliers and supplier quotes.
+
+An upload is split into records as it streams in and handed out in batches
+to a process pool, which parses and validates them against the Supplier /
+SupplierQuote models (email validation makes this CPU-bound, so it runs on
+several cores). Valid rows are written through Firestore's BulkWriter: 20
+writes per commit, commits in parallel, a rate limit that starts at
+INGEST_INITIAL_OPS_PER_SECOND and ramps up by 50% every five minutes (the
+500/50/5 rule) to INGEST_MAX_OPS_PER_SECOND, and retries of transient
+per-document failures. Later batches are validated while earlier ones are
+being written.
+
+Each rejected row is reported with its line number and the reason (parse,
+validation or write error); the rest of the import goes ahead. Suppliers
+are keyed by `id` and quotes by RFQ, supplier and item, so an import that
+is re-run - after fixing rejected rows or an interrupted upload - updates
+documents instead of duplicating them.
+"""
+import os
+import csv
+import json
+import time
+import codecs
+import asyncio
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.supplier import Supplier, SupplierQuote
+from app.services.firebase import bulk_set, close_bulk_writer, open_bulk_writer
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_VALIDATION_WORKERS = int(os.getenv("INGEST_VALIDATION_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_INITIAL_OPS_PER_SECOND = int(os.getenv("INGEST_INITIAL_OPS_PER_SECOND", "500"))
+INGEST_MAX_OPS_PER_SECOND = int(os.getenv("INGEST_MAX_OPS_PER_SECOND", "10000"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "5"))
+INGEST_WRITE_TIMEOUT = float(os.getenv("INGEST_WRITE_TIMEOUT", "120"))
+INGEST_MAX_REPORTED_ERRORS = int(os.getenv("INGEST_MAX_REPORTED_ERRORS", "1000"))
+
+FORMATS = ("csv", "jsonl")
+# kind -> (model, collection)
+KINDS = {
+    "suppliers": (Supplier, "suppliers"),
+    "quotes": (SupplierQuote, "quotes"),
+}
+# CSV cells holding lists: "ISO9001;EN9100" or "ISO9001|EN9100"
+LIST_FIELDS = {"capabilities", "certifications"}
+
+# gRPC status codes worth another attempt (anything else is a property of the row)
+_RETRYABLE_CODES = {
+    1: "CANCELLED",
+    4: "DEADLINE_EXCEEDED",
+    8: "RESOURCE_EXHAUSTED",
+    10: "ABORTED",
+    13: "INTERNAL",
+    14: "UNAVAILABLE",
+}
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/jsonl": "jsonl",
+    "application/x-ndjson": "jsonl",
+    "application/x-jsonlines": "jsonl",
+    "application/json-lines": "jsonl",
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_stats = {"imports": 0, "active": 0, "rows": 0, "written": 0, "failed": 0}
+
+# A parsed record: (line number where it starts, raw text)
+Record = Tuple[int, str]
+RowError = Dict[str, Any]
+
+
+class IngestError(Exception):
+    """An import that cannot go ahead at all; carries the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def get_validation_pool() -> ProcessPoolExecutor:
+    """Get (or lazily create) the row validation process pool."""
+    global _pool
+
+    if _pool is None:
+        # spawn: workers start clean instead of forking the server's threads and sockets
+        _pool = ProcessPoolExecutor(
+            max_workers=INGEST_VALIDATION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def detect_format(content_type: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+    """"csv" or "jsonl" from a Content-Type or a file extension (None if neither says)."""
+    if content_type:
+        fmt = _CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+        if fmt:
+            return fmt
+    if filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        if extension == "csv":
+            return "csv"
+        if extension in ("jsonl", "ndjson"):
+            return "jsonl"
+    return None
+
+
+# --- Worker side (runs in the validation processes) ---
+
+def _csv_row(header: List[str], text: str) -> Dict[str, Any]:
+    values = next(csv.reader([text], strict=True))
+    if len(values) > len(header):
+        raise ValueError(f"{len(values)} columns, header has {len(header)}")
+    row = {}
+    for name, value in zip(header, values):
+        value = value.strip()
+        # Empty cells fall back to the model defaults
+        if not value:
+            continue
+        if name in LIST_FIELDS:
+            row[name] = [v.strip() for v in value.replace("|", ";").split(";") if v.strip()]
+        else:
+            row[name] = value
+    return row
+
+
+def _document_id(kind: str, data: Dict[str, Any]) -> str:
+    if kind == "suppliers":
+        doc_id = data["id"]
+    else:
+        # One document per quote line: a re-sent quote replaces the earlier one
+        doc_id = f"{data['rfq_id']}_{data['supplier_id']}_{data['item_id']}"
+    if not doc_id.strip() or "/" in doc_id or doc_id in (".", ".."):
+        raise ValueError(f"invalid document id {doc_id!r}")
+    return doc_id
+
+
+def _validate_batch(
+    kind: str,
+    fmt: str,
+    header: Optional[List[str]],
+    records: List[Record],
+) -> Tuple[List[Tuple[int, str, Dict[str, Any]]], List[RowError]]:
+    """Parse and validate records; returns (line, doc_id, document) rows and row errors."""
+    model = KINDS[kind][0]
+    valid = []
+    errors = []
+    for line, text in records:
+        try:
+            row = _csv_row(header, text) if fmt == "csv" else json.loads(text)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        except (ValueError, csv.Error) as e:
+            errors.append({"line": line, "stage": "parse", "errors": [str(e)]})
+            continue
+        try:
+            data = model.model_validate(row).model_dump(mode="json")
+            valid.append((line, _document_id(kind, data), data))
+        except ValidationError as e:
+            errors.append({
+                "line": line,
+                "stage": "validation",
+                "errors": [
+                    f"{'.'.join(str(p) for p in error['loc']) or 'row'}: {error['msg']}"
+                    for error in e.errors(include_url=False)
+                ],
+            })
+        except ValueError as e:
+            errors.append({"line": line, "stage": "validation", "errors": [str(e)]})
+    return valid, errors
+
+
+# --- Reading ---
+
+def _quote_open_after(line: str, in_quotes: bool) -> bool:
+    """Whether a quoted CSV cell is still open at the end of `line`."""
+    if '"' not in line:
+        return in_quotes
+    field_start = not in_quotes
+    after_close = False
+    for ch in line:
+        if in_quotes:
+            if ch == '"':
+                in_quotes = False
+                after_close = True
+            continue
+        # Only a quote opening a cell (or a doubled quote inside one) counts
+        if ch == '"' and (field_start or after_close):
+            in_quotes = True
+        after_close = False
+        field_start = ch == ","
+    return in_quotes
+
+
+async def _records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[List[Record]]:
+    """
+    Split a byte stream into records, yielding what each chunk completes.
+
+    A CSV record ends at a newline outside quotes (quoted cells may span
+    lines); a JSONL record is one non-empty line. Numbers are 1-based file
+    lines where the record starts.
+    """
+    # utf-8-sig: spreadsheet exports often start with a byte order mark
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    line_no = 0
+    record: List[str] = []
+    record_start = 0
+    in_quotes = False
+
+    def split(text: str, final: bool) -> Tuple[List[Record], str]:
+        nonlocal line_no, record, record_start, in_quotes
+        lines = text.split("\n")
+        rest = "" if final else lines.pop()
+        done = []
+        for line in lines:
+            line_no += 1
+            line = line.rstrip("\r")
+            if fmt == "jsonl":
+                if line.strip():
+                    done.append((line_no, line))
+                continue
+            if not record:
+                if not line.strip():
+                    continue
+                record_start = line_no
+            record.append(line)
+            in_quotes = _quote_open_after(line, in_quotes)
+            if not in_quotes:
+                done.append((record_start, "\n".join(record)))
+                record = []
+        if final and record:
+            # Unterminated quote: hand it over anyway and let the parser report it
+            done.append((record_start, "\n".join(record)))
+        return done, rest
+
+    try:
+        async for chunk in chunks:
+            done, tail = split(tail + decoder.decode(chunk), final=False)
+            if done:
+                yield done
+        done, _ = split(tail + decoder.decode(b"", final=True), final=True)
+    except UnicodeDecodeError as e:
+        raise IngestError(400, f"Line {line_no + 1}: not valid UTF-8 ({e.reason})")
+    if done:
+        yield done
+
+
+def _csv_header(model, text: str) -> List[str]:
+    try:
+        header = [name.strip().lower() for name in next(csv.reader([text]))]
+    except csv.Error as e:
+        raise IngestError(400, f"Unreadable CSV header: {e}")
+    missing = [name for name, field in model.model_fields.items() if field.is_required() and name not in header]
+    if missing:
+        raise IngestError(400, f"CSV header is missing required columns: {', '.join(missing)}")
+    return header
+
+
+async def _batches(
+    chunks: AsyncIterator[bytes], fmt: str, model,
+) -> AsyncIterator[Tuple[Optional[List[str]], List[Record]]]:
+    """Records in batches of INGEST_BATCH_SIZE, with the CSV header row (None for JSONL)."""
+    header = None
+    batch: List[Record] = []
+    async for records in _records(chunks, fmt):
+        if fmt == "csv" and header is None:
+            _, text = records.pop(0)
+            header = _csv_header(model, text)
+        batch.extend(records)
+        while len(batch) >= INGEST_BATCH_SIZE:
+            yield header, batch[:INGEST_BATCH_SIZE]
+            batch = batch[INGEST_BATCH_SIZE:]
+    if batch:
+        yield header, batch
+
+
+async def file_chunks(path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Read a local file as an async byte stream (for the CLI)."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# --- Import ---
+
+class _Import:
+    """Counters, row errors and in-flight writes of one import (updated from BulkWriter threads)."""
+
+    def __init__(self, kind: str, mode: str, max_errors: Optional[int]):
+        self.kind = kind
+        self.mode = mode
+        self.max_errors = max_errors
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.valid = 0
+        self.written = 0
+        self.failed = 0
+        self.errors: List[RowError] = []
+        self.truncated = False
+        # doc_id -> line, for duplicates within the import and write results
+        self.seen: Dict[str, int] = {}
+        self.pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def reject(self, error: RowError):
+        with self._lock:
+            self.failed += 1
+            if self.max_errors is None or len(self.errors) < self.max_errors:
+                self.errors.append(error)
+            else:
+                self.truncated = True
+
+    def accept(self, valid: List[Tuple[int, str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Keep the first row per document id; returns the (doc_id, document) writes."""
+        documents = []
+        for line, doc_id, data in valid:
+            first = self.seen.get(doc_id)
+            if first is not None:
+                self.reject({"line": line, "stage": "validation",
+                             "errors": [f"duplicate of line {first} ({doc_id})"]})
+                continue
+            self.seen[doc_id] = line
+            documents.append((doc_id, data))
+        self.valid += len(documents)
+        return documents
+
+    def on_written(self, doc_id: str):
+        with self._lock:
+            self.pending.pop(doc_id, None)
+            self.written += 1
+
+    def on_failed(self, doc_id: str, code: int, message: str, attempts: int) -> bool:
+        if code in _RETRYABLE_CODES and attempts + 1 < INGEST_MAX_ATTEMPTS:
+            return True
+        with self._lock:
+            line = self.pending.pop(doc_id, None)
+        name = _RETRYABLE_CODES.get(code, f"code {code}")
+        self.reject({"line": line, "stage": "write",
+                     "errors": [f"{name} after {attempts + 1} attempt(s): {message}"]})
+        return False
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        errors = sorted(self.errors, key=lambda error: error["line"] or 0)
+        return {
+            "kind": self.kind,
+            "mode": self.mode,
+            "rows": self.rows,
+            "valid": self.valid,
+            "written": self.written,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed) if elapsed else 0,
+            "errors": errors,
+            **({"errors_truncated": True} if self.truncated else {}),
+        }
+
+
+async def ingest(
+    kind: str,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    dry_run: bool = False,
+    max_errors: Optional[int] = INGEST_MAX_REPORTED_ERRORS,
+) -> Dict[str, Any]:
+    """
+    Import suppliers or quotes from a CSV/JSONL byte stream.
+
+    Returns the report: row counts, throughput and one entry per rejected
+    row (`line`, `stage` = parse / validation / write, `errors`), at most
+    `max_errors` of them (None for all). `dry_run` validates without writing.
+    Raises IngestError for an unknown kind or format, an unreadable stream
+    or a CSV header without the required columns.
+    """
+    global _pool
+
+    if kind not in KINDS:
+        raise IngestError(404, f"Unknown import kind: {kind}")
+    if fmt not in FORMATS:
+        raise IngestError(415, f"Unsupported format {fmt!r}; send CSV or JSONL")
+    collection = KINDS[kind][1]
+
+    state = _Import(kind, "dry_run" if dry_run else "firestore", max_errors)
+    writer = None
+    if not dry_run:
+        writer = await open_bulk_writer(
+            INGEST_INITIAL_OPS_PER_SECOND,
+            INGEST_MAX_OPS_PER_SECOND,
+            state.on_written,
+            state.on_failed,
+        )
+        if writer is None:
+            state.mode = "mock"
+
+    loop = asyncio.get_running_loop()
+    pool = get_validation_pool() if INGEST_VALIDATION_WORKERS > 0 else None
+    validating: Deque[asyncio.Future] = deque()
+    writing: Optional[asyncio.Future] = None
+
+    async def write(documents: List[Tuple[str, Dict[str, Any]]]):
+        if writer is None:
+            if state.mode == "mock":
+                state.written += len(documents)
+            return
+        with state._lock:
+            for doc_id, _ in documents:
+                state.pending[doc_id] = state.seen[doc_id]
+        await bulk_set(writer, collection, documents, timeout=INGEST_WRITE_TIMEOUT)
+
+    async def drain_one():
+        nonlocal writing
+        valid, errors = await validating.popleft()
+        for error in errors:
+            state.reject(error)
+        documents = state.accept(valid)
+        # BulkWriter is not thread-safe: one batch is handed to it at a time
+        if writing is not None:
+            await writing
+        writing = asyncio.ensure_future(write(documents))
+
+    _stats["imports"] += 1
+    _stats["active"] += 1
+    try:
+        async for header, records in _batches(chunks, fmt, KINDS[kind][0]):
+            state.rows += len(records)
+            validating.append(loop.run_in_executor(pool, _validate_batch, kind, fmt, header, records))
+            if len(validating) > max(INGEST_VALIDATION_WORKERS, 1):
+                await drain_one()
+        while validating:
+            await drain_one()
+        if writing is not None:
+            await writing
+    except BrokenProcessPool as e:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        _pool = None
+        raise IngestError(503, f"Validation worker crashed: {e}")
+    finally:
+        _stats["active"] -= 1
+        for future in validating:
+            future.cancel()
+        if writer is not None:
+            if writing is not None and not writing.done():
+                await asyncio.wait([writing])
+            # Rows already queued are written either way; a re-run overwrites them
+            await close_bulk_writer(writer, timeout=INGEST_WRITE_TIMEOUT)
+        _stats["rows"] += state.rows
+
+    # Queued writes that never got a result (e.g. a whole commit failed in transport)
+    for doc_id, line in list(state.pending.items()):
+        state.reject({"line": line, "stage": "write", "errors": [f"no write result for {doc_id}"]})
+    state.pending.clear()
+
+    _stats["written"] += state.written
+    _stats["failed"] += state.failed
+    if state.mode == "mock":
+        print(f"[MOCK] Bulk import of {state.written} {kind} (Firestore not configured)")
+    return state.report()
+
+
+async def stop_bulk_ingest():
+    """Shut the validation worker processes down."""
+    global _pool
+
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def get_ingest_stats() -> Dict[str, Any]:
+    return {"workers": INGEST_VALIDATION_WORKERS, **_stats}
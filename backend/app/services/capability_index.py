@@ -0,0 +1,167 @@
+"""Capability Index Service - Inverted capability -> supplier index for matching.
+
+The index subscribes to the supplier catalog replica and is maintained
+incrementally as suppliers are added, changed or deactivated. Every supplier
+gets a row (in catalog order); posting lists map capability tags to rows and
+the fields scoring needs (certifications, lead time, reliability) are NumPy
+columns indexed by row. A lookup only touches the suppliers that cover the
+requested tags, and a catalog change costs time proportional to the change,
+not to the catalog.
+"""
+import threading
+from typing import Optional, Dict, Any, NamedTuple, Set, Tuple, Iterable
+
+import numpy as np
+
+from app.services import supplier_catalog
+
+DEFAULT_LEAD_TIME = 30
+DEFAULT_RELIABILITY = 0.8
+
+INITIAL_CAPACITY = 1024
+
+
+class Candidates(NamedTuple):
+    """Suppliers covering a requirement set, in catalog order, with their scoring columns."""
+    suppliers: np.ndarray  # supplier dicts (object array)
+    overlap: np.ndarray  # how many of the required capabilities each one has
+    certification_codes: np.ndarray  # EN9100 * 2 + ISO9001
+    lead_time: np.ndarray
+    reliability: np.ndarray
+
+
+class CapabilityIndex:
+    """Inverted index from lowercased capability tag to supplier rows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._posting_arrays: Dict[str, np.ndarray] = {}
+        # Row per supplier id; rows follow catalog insertion order, so results tie-break like a catalog scan
+        self._rows: Dict[str, int] = {}
+        self._row_caps: Dict[int, Set[str]] = {}
+        self._size = 0
+        self._suppliers = np.empty(INITIAL_CAPACITY, dtype=object)
+        self._certification_codes = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._lead_time = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._reliability = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._row_caps)
+
+    def _unpost_locked(self, row: int):
+        for cap in self._row_caps.pop(row, ()):
+            posting = self._postings[cap]
+            posting.discard(row)
+            if not posting:
+                del self._postings[cap]
+            self._posting_arrays.pop(cap, None)
+        self._suppliers[row] = None
+
+    def _resize_locked(self, capacity: int, keep: Optional[np.ndarray] = None):
+        """Reallocate the columns; `keep` lists the rows to carry over (default: all used rows)."""
+        if keep is None:
+            keep = np.arange(self._size)
+        for name in ('_suppliers', '_certification_codes', '_lead_time', '_reliability'):
+            column = getattr(self, name)
+            resized = np.empty(capacity, dtype=column.dtype)
+            resized[:len(keep)] = column[keep]
+            setattr(self, name, resized)
+
+    def _compact_locked(self):
+        """Renumber rows without the gaps left by removed suppliers, keeping their order."""
+        keep = np.array(sorted(self._rows.values()), dtype=np.int64)
+        renumber = {int(old): new for new, old in enumerate(keep)}
+        self._rows = {sid: renumber[row] for sid, row in self._rows.items()}
+        self._row_caps = {renumber[row]: caps for row, caps in self._row_caps.items()}
+        self._postings = {cap: {renumber[row] for row in rows} for cap, rows in self._postings.items()}
+        self._posting_arrays.clear()
+        self._resize_locked(max(INITIAL_CAPACITY, 2 * len(keep)), keep)
+        self._size = len(keep)
+
+    def _upsert_locked(self, supplier: Dict[str, Any]):
+        supplier_id = supplier['id']
+        row = self._rows.get(supplier_id)
+        if row is None:
+            if self._size == len(self._suppliers):
+                self._resize_locked(2 * len(self._suppliers))
+            row = self._size
+            self._size += 1
+            self._rows[supplier_id] = row
+        else:
+            self._unpost_locked(row)
+
+        # Deactivated suppliers leave the postings but keep their row
+        if supplier.get('active', True) is False:
+            return
+
+        caps = {c.lower() for c in supplier.get('capabilities', [])}
+        for cap in caps:
+            self._postings.setdefault(cap, set()).add(row)
+            self._posting_arrays.pop(cap, None)
+        self._row_caps[row] = caps
+
+        certifications = supplier.get('certifications', [])
+        self._suppliers[row] = supplier
+        self._certification_codes[row] = ('EN9100' in certifications) * 2 + ('ISO9001' in certifications)
+        self._lead_time[row] = _value_or(supplier.get('avg_lead_time'), DEFAULT_LEAD_TIME)
+        self._reliability[row] = _value_or(supplier.get('reliability_score'), DEFAULT_RELIABILITY)
+
+    def apply_changes(self, upserts: Dict[str, Dict[str, Any]], removals: Iterable[str]):
+        """Apply a catalog diff (supplier_catalog subscriber signature)."""
+        with self._lock:
+            for supplier_id in removals:
+                row = self._rows.pop(supplier_id, None)
+                if row is not None:
+                    self._unpost_locked(row)
+            for supplier in upserts.values():
+                self._upsert_locked(supplier)
+            # Removed suppliers leave unused rows behind; reclaim them once they dominate
+            if self._size > INITIAL_CAPACITY and self._size > 2 * len(self._rows):
+                self._compact_locked()
+
+    def _posting_array_locked(self, cap: str) -> np.ndarray:
+        array = self._posting_arrays.get(cap)
+        if array is None:
+            array = np.fromiter(self._postings.get(cap, ()), dtype=np.int64)
+            self._posting_arrays[cap] = array
+        return array
+
+    def candidates(self, required_capabilities: Tuple[str, ...]) -> Candidates:
+        """
+        Suppliers covering any of the (lowercased) required capabilities.
+
+        `overlap` counts the required capabilities each candidate has. The
+        arrays are copies, so they stay valid while the catalog changes.
+        """
+        with self._lock:
+            postings = [self._posting_array_locked(cap) for cap in required_capabilities]
+            rows = np.concatenate(postings) if postings else np.empty(0, dtype=np.int64)
+            rows, overlap = np.unique(rows, return_counts=True)
+            return Candidates(
+                self._suppliers[rows],
+                overlap,
+                self._certification_codes[rows],
+                self._lead_time[rows],
+                self._reliability[rows],
+            )
+
+
+def _value_or(value, default):
+    return default if value is None else value
+
+
+_index: Optional[CapabilityIndex] = None
+
+
+def get_capability_index() -> CapabilityIndex:
+    """Get the shared index, subscribing it to the supplier catalog on first use."""
+    global _index
+
+    if _index is None:
+        # subscribe() hands over the current contents, then every change
+        index = CapabilityIndex()
+        supplier_catalog.subscribe(index.apply_changes)
+        _index = index
+
+    return _index
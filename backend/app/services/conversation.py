@@ -0,0 +1,226 @@
+"""Conversation Window - Fits chat history into a per-request token budget.
+
+The newest turns are kept verbatim; everything older is folded into a
+running summary. Summaries are cached by a chained hash of the folded
+prefix, so each turn only has to fold the messages that newly fell out of
+the window. Summarization runs in the background: a request never waits
+for it, and uses the newest cached summary plus a short extractive digest
+of any turns not yet summarized.
+"""
+import os
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import List, Optional, Callable, Awaitable, Tuple, Set
+
+from app.models.chat import Message, MessageRole
+from app.services.response_cache import ResponseCache
+
+LLM_INPUT_TOKEN_BUDGET = int(os.getenv("LLM_INPUT_TOKEN_BUDGET", "3000"))
+LLM_SUMMARY_MAX_TOKENS = int(os.getenv("LLM_SUMMARY_MAX_TOKENS", "300"))
+SUMMARY_CACHE_BYTES = 8 * 1024 * 1024
+SUMMARY_TTL = 6 * 3600
+
+# Per-message framing overhead (role, separators) in chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+# Characters per token when no tokenizer is available
+CHARS_PER_TOKEN = 4
+DIGEST_CHARS = 200
+
+TOKENIZER_ENCODING = "cl100k_base"
+# tiktoken's BPE file cache; `python -m scripts.fetch_tokenizer` fills it at build time
+TOKENIZER_CACHE_DIR = os.getenv("TOKENIZER_CACHE_DIR", str(Path(__file__).resolve().parents[2] / "tokenizer_cache"))
+
+# (previous summary or None, messages to fold) -> new summary
+Summarizer = Callable[[Optional[str], List[Message]], Awaitable[str]]
+
+# Set by start_tokenizer(); token counts are estimated until then
+_encoding = None
+
+
+def load_encoding():
+    """Load the tokenizer from TOKENIZER_CACHE_DIR, downloading it there if missing (blocking)."""
+    global _encoding
+
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", TOKENIZER_CACHE_DIR)
+    import tiktoken
+    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+    return _encoding
+
+
+async def start_tokenizer():
+    """Load the tokenizer off the event loop (startup warm-up); failures show on /health."""
+    try:
+        await asyncio.to_thread(load_encoding)
+    except Exception as e:
+        raise RuntimeError(
+            f"{TOKENIZER_ENCODING} not available (run python -m scripts.fetch_tokenizer); "
+            f"estimating token counts: {e}"
+        ) from e
+
+
+def count_tokens(text: str) -> int:
+    """Token count of `text` (estimated from its length without a tokenizer)."""
+    encoding = _encoding
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def count_message_tokens(message: Message) -> int:
+    return count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the beginning of `text` within `max_tokens`."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def _prefix_hashes(messages: List[Message]) -> List[str]:
+    """hashes[i] identifies messages[:i + 1] (chained, so each costs O(message))."""
+    hashes = []
+    digest = b""
+    for message in messages:
+        digest = hashlib.sha256(
+            digest + message.role.value.encode() + b"\0" + message.content.encode("utf-8")
+        ).digest()
+        hashes.append(digest.hex())
+    return hashes
+
+
+def _digest(messages: List[Message]) -> str:
+    """Cheap extractive stand-in for turns that are not summarized yet."""
+    lines = []
+    for message in messages:
+        text = " ".join(message.content.split())
+        if len(text) > DIGEST_CHARS:
+            text = text[:DIGEST_CHARS].rstrip() + "..."
+        lines.append(f"{message.role.value}: {text}")
+    return "\n".join(lines)
+
+
+_summaries: Optional[ResponseCache] = None
+_pending: Set[str] = set()
+_tasks: Set[asyncio.Task] = set()
+
+
+def _get_summary_cache() -> ResponseCache:
+    global _summaries
+
+    if _summaries is None:
+        _summaries = ResponseCache(max_bytes=SUMMARY_CACHE_BYTES, ttl=SUMMARY_TTL)
+    return _summaries
+
+
+def _schedule_summary(
+    key: str,
+    previous: Optional[str],
+    messages: List[Message],
+    summarize: Summarizer,
+):
+    """Fold `messages` into `previous` in the background and cache it under `key`."""
+    if key in _pending:
+        return
+    _pending.add(key)
+
+    async def run():
+        try:
+            summary = await summarize(previous, messages)
+            _get_summary_cache().set_memory(key, truncate_to_tokens(summary, LLM_SUMMARY_MAX_TOKENS))
+        except Exception as e:
+            print(f"Conversation summary error: {e}")
+        finally:
+            _pending.discard(key)
+
+    task = asyncio.create_task(run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def _split_point(messages: List[Message], budget: int) -> int:
+    """Index of the first message kept verbatim within `budget` tokens."""
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = count_message_tokens(messages[start - 1])
+        if used + cost > budget and start < len(messages):
+            break
+        used += cost
+        start -= 1
+    # The kept window must open with a user turn (required by Anthropic)
+    while start < len(messages) - 1 and messages[start].role != MessageRole.USER:
+        start += 1
+    return start
+
+
+def fit_conversation(
+    messages: List[Message],
+    budget: int,
+    summarize: Optional[Summarizer] = None,
+) -> Tuple[Optional[str], List[Message]]:
+    """
+    Fit `messages` into `budget` input tokens.
+
+    Returns (summary of the folded older turns or None, recent messages
+    kept verbatim). Never blocks on summarization: the newest cached
+    summary is used and, if `summarize` is given, the rest is folded in
+    the background for the next turn.
+    """
+    if sum(count_message_tokens(m) for m in messages) <= budget:
+        return None, messages
+
+    summary_budget = min(LLM_SUMMARY_MAX_TOKENS, budget // 3)
+    start = _split_point(messages, budget - summary_budget)
+    recent = list(messages[start:])
+
+    # A single oversized message: keep its beginning
+    if len(recent) == 1 and count_message_tokens(recent[0]) > budget - summary_budget:
+        recent[0] = Message(
+            role=recent[0].role,
+            content=truncate_to_tokens(
+                recent[0].content, budget - summary_budget - MESSAGE_OVERHEAD_TOKENS
+            ),
+        )
+    if start == 0:
+        return None, recent
+
+    folded = messages[:start]
+    hashes = _prefix_hashes(folded)
+    cache = _get_summary_cache()
+
+    # Newest cached summary of some prefix of the folded turns
+    covered, previous = 0, None
+    for i in range(len(folded), 0, -1):
+        previous = cache.get_memory(hashes[i - 1])
+        if previous is not None:
+            covered = i
+            break
+
+    if covered < len(folded) and summarize is not None:
+        _schedule_summary(hashes[-1], previous, folded[covered:], summarize)
+
+    parts = [previous] if previous else []
+    if covered < len(folded):
+        parts.append(_digest(folded[covered:]))
+    text = "\n".join(parts)
+    if count_tokens(text) > summary_budget:
+        # Keep the most recent part of the digest
+        encoding = _encoding
+        if encoding is not None:
+            tokens = encoding.encode(text, disallowed_special=())
+            text = encoding.decode(tokens[-summary_budget:])
+        else:
+            text = text[-summary_budget * CHARS_PER_TOKEN:]
+    return text, recent
+
+
+async def drain_summaries(timeout: float = 10.0):
+    """Wait for background summarization tasks (used on shutdown)."""
+    if _tasks:
+        await asyncio.wait(list(_tasks), timeout=timeout)
@@ -0,0 +1,248 @@
+"""Design Analysis - Background metadata extraction for uploaded design files.
+
+Parsing a CAD file is CPU-bound, so it runs in a process pool (see
+design_parsers.py for what is extracted); the event loop only waits on the
+result. Results depend on nothing but the file's bytes, so they are cached
+by content hash - in memory and as JSON next to the stored designs - and an
+identical file uploaded again is never re-analyzed. Concurrent requests for
+the same file share one analysis.
+
+Analysis starts as soon as an upload completes and runs again (usually a
+cache hit) as an RFQ pipeline stage that attaches the results to the RFQ.
+"""
+import os
+import re
+import json
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.design_parsers import analyze_file
+from app.services.design_storage import DESIGN_UPLOAD_TIMEOUT, get_design_store
+from app.services.entity_extractor import extract_entities
+from app.services.firebase import download_storage_blob, ensure_firebase, has_storage, update_rfq_design_analysis
+
+DESIGN_ANALYSIS_WORKERS = int(os.getenv("DESIGN_ANALYSIS_WORKERS", str(min(4, os.cpu_count() or 1))))
+DESIGN_ANALYSIS_TIMEOUT = float(os.getenv("DESIGN_ANALYSIS_TIMEOUT", "300"))
+
+# Bump when the parsers change so cached results are recomputed
+ANALYZER_VERSION = 1
+MEMORY_CACHE_ENTRIES = 1024
+# Recycle workers now and then; parsing libraries can hold on to memory
+WORKER_MAX_TASKS = 50
+TEXT_EXCERPT_CHARS = 500
+
+_DESIGN_REF_RE = re.compile(r"^designs/([0-9a-f]{64})$")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_in_flight: Dict[str, asyncio.Task] = {}
+_background_tasks: Set[asyncio.Task] = set()
+_stats = {"analyzed": 0, "cache_hits": 0, "failed": 0}
+
+
+def get_analysis_pool() -> ProcessPoolExecutor:
+    """Get (or lazily create) the analysis process pool."""
+    global _pool
+
+    if _pool is None:
+        # spawn: workers start clean instead of forking the server's threads and sockets
+        _pool = ProcessPoolExecutor(
+            max_workers=DESIGN_ANALYSIS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=WORKER_MAX_TASKS,
+        )
+    return _pool
+
+
+def design_digest(file_ref: str) -> Optional[str]:
+    """The content hash in a `designs/<sha256>` reference (None for anything else)."""
+    match = _DESIGN_REF_RE.match(file_ref or "")
+    return match.group(1) if match else None
+
+
+def _analysis_dir() -> Path:
+    path = get_design_store().root / "analysis"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def get_preview_path(digest: str) -> Path:
+    return _analysis_dir() / f"{digest}.jpg"
+
+
+def _result_path(digest: str) -> Path:
+    return _analysis_dir() / f"{digest}.v{ANALYZER_VERSION}.json"
+
+
+def _read_result(digest: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(_result_path(digest).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_result(digest: str, result: Dict[str, Any]):
+    path = _result_path(digest)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(result))
+    os.replace(tmp_path, path)
+
+
+def _remember(digest: str, result: Dict[str, Any]):
+    _results[digest] = result
+    _results.move_to_end(digest)
+    while len(_results) > MEMORY_CACHE_ENTRIES:
+        _results.popitem(last=False)
+
+
+async def analyze_design(file_ref: str) -> Dict[str, Any]:
+    """Analysis of a stored design file (cached per content hash)."""
+    digest = design_digest(file_ref)
+    if digest is None:
+        return {"file_ref": file_ref, "status": "unsupported", "error": "Not a stored design file reference"}
+
+    result = _results.get(digest)
+    if result is None:
+        result = await asyncio.to_thread(_read_result, digest)
+        if result is not None:
+            _remember(digest, result)
+    if result is not None:
+        _stats["cache_hits"] += 1
+        return result
+
+    task = _in_flight.get(digest)
+    if task is None:
+        task = asyncio.create_task(_analyze(digest, file_ref))
+        _in_flight[digest] = task
+        task.add_done_callback(lambda _: _in_flight.pop(digest, None))
+    # One caller giving up must not cancel the analysis for the others
+    return await asyncio.shield(task)
+
+
+async def _analyze(digest: str, file_ref: str) -> Dict[str, Any]:
+    global _pool
+
+    base = {"file_ref": file_ref, "sha256": digest, "analyzer_version": ANALYZER_VERSION}
+    store = get_design_store()
+    download_path = None
+    try:
+        await ensure_firebase()
+        if has_storage():
+            download_path = store.staging_dir / f"{digest}.analysis"
+            if not await download_storage_blob(file_ref, str(download_path), timeout=DESIGN_UPLOAD_TIMEOUT):
+                return {**base, "status": "missing", "error": "Design file not found"}
+            path = download_path
+        else:
+            path = store.designs_dir / digest
+            if not path.exists():
+                return {**base, "status": "missing", "error": "Design file not found"}
+
+        loop = asyncio.get_running_loop()
+        pool = get_analysis_pool()
+        try:
+            details = await asyncio.wait_for(
+                loop.run_in_executor(pool, analyze_file, str(path), str(get_preview_path(digest))),
+                DESIGN_ANALYSIS_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            # The worker is still parsing and would keep its slot; replace the pool
+            _recycle_pool(pool)
+            _stats["failed"] += 1
+            return {**base, "status": "failed", "error": f"Analysis timed out after {DESIGN_ANALYSIS_TIMEOUT:.0f}s"}
+    except BrokenProcessPool as e:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        _stats["failed"] += 1
+        _pool = None
+        return {**base, "status": "failed", "error": f"Analysis worker crashed: {e}"}
+    except Exception as e:
+        # Parse errors are properties of the file, so remember them (in memory only)
+        _stats["failed"] += 1
+        result = {**base, "status": "failed", "error": str(e) or type(e).__name__}
+        _remember(digest, result)
+        return result
+    finally:
+        if download_path is not None:
+            download_path.unlink(missing_ok=True)
+
+    text = details.pop("text", "") or ""
+    materials: Dict[str, Dict[str, Any]] = {}
+    for mention in extract_entities(text):
+        materials.setdefault(mention.entity.keyword, {
+            "keyword": mention.entity.keyword,
+            "material_id": mention.entity.material_id,
+            "text": mention.text,
+        })
+    result = {
+        **base,
+        **details,
+        "status": "ok",
+        "materials": list(materials.values()),
+        "text_excerpt": text[:TEXT_EXCERPT_CHARS],
+        "analyzed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    await asyncio.to_thread(_write_result, digest, result)
+    _remember(digest, result)
+    _stats["analyzed"] += 1
+    return result
+
+
+def schedule_analysis(file_ref: str):
+    """Start analyzing a freshly uploaded file in the background."""
+    task = asyncio.create_task(analyze_design(file_ref))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def analyze_designs(file_refs: List[str]) -> List[Dict[str, Any]]:
+    """Analyses for several files, in order."""
+    return list(await asyncio.gather(*(analyze_design(ref) for ref in file_refs)))
+
+
+async def attach_design_analysis(rfq_id: str, file_refs: List[str]):
+    """Analyze an RFQ's design files and record the results on it."""
+    results = await analyze_designs(file_refs)
+    await update_rfq_design_analysis(rfq_id, results)
+
+
+def _recycle_pool(pool: ProcessPoolExecutor):
+    """
+    Shut a pool down and kill its workers; the next analysis starts a fresh one.
+
+    shutdown() alone lets a running task finish, which for a runaway parse
+    may be never. Other analyses on the same pool fail as crashed (and are
+    not remembered, so they are retried).
+    """
+    global _pool
+
+    if _pool is pool:
+        _pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+async def stop_design_analysis():
+    """Cancel pending analyses and shut the worker processes down."""
+    global _pool
+
+    for task in list(_background_tasks) + list(_in_flight.values()):
+        task.cancel()
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def get_design_analysis_stats() -> Dict[str, Any]:
+    return {
+        "workers": DESIGN_ANALYSIS_WORKERS,
+        "in_flight": len(_in_flight),
+        "cached": len(_results),
+        **_stats,
+    }
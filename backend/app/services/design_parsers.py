@@ -0,0 +1,329 @@
+"""Design Parsers - Metadata extraction for uploaded design files.
+
+Runs inside the design analysis process pool (see design_analysis.py), so
+this module only imports the standard library and its optional parsing
+libraries, never the web app.
+
+`analyze_file` sniffs the file type from its content (stored designs have
+no extension) and returns plain JSON-able data:
+
+- STEP: part count, solids, bounding box (from the model's points),
+  declared volume, length unit, schema, product names
+- DXF: entity counts, block references / closed contours (parts),
+  bounding box, drawing units, text and attribute values
+- DWG: AutoCAD release (the format is proprietary; nothing else is read)
+- PDF: page count, page size, text of the first pages
+- PNG/JPEG: size and a downscaled JPEG preview
+
+Extracted text is returned under `text`, for material callouts to be
+picked out by the caller.
+"""
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+DESIGN_ANALYSIS_MAX_TEXT = int(os.getenv("DESIGN_ANALYSIS_MAX_TEXT", "20000"))
+DESIGN_PREVIEW_SIZE = int(os.getenv("DESIGN_PREVIEW_SIZE", "512"))
+PDF_TEXT_PAGES = 10
+
+DWG_RELEASES = {
+    "AC1012": "R13", "AC1014": "R14", "AC1015": "2000", "AC1018": "2004",
+    "AC1021": "2007", "AC1024": "2010", "AC1027": "2013", "AC1032": "2018",
+}
+STEP_UNIT_PREFIXES = {".MILLI.": "mm", ".CENTI.": "cm", ".DECI.": "dm", ".KILO.": "km", "$": "m"}
+
+_STEP_ENTITY_RE = re.compile(r"^#\d+\s*=\s*([A-Z0-9_]+)\s*\((.*)\)\s*;$", re.S)
+_STEP_STRING_RE = re.compile(r"'((?:[^']|'')*)'")
+_STEP_REAL = r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[Ee][-+]?\d+)?)"
+_STEP_POINT_RE = re.compile(rf"\(\s*{_STEP_REAL}\s*,\s*{_STEP_REAL}\s*(?:,\s*{_STEP_REAL}\s*)?\)\s*$")
+_STEP_VOLUME_RE = re.compile(rf"VOLUME_MEASURE\s*\(\s*{_STEP_REAL}\s*\)")
+_STEP_UNIT_RE = re.compile(r"SI_UNIT\s*\(\s*(\.[A-Z]+\.|\$)\s*,\s*\.METRE\.\s*\)")
+# Entities whose strings name parts or materials
+_STEP_TEXT_ENTITIES = {
+    "PRODUCT", "MATERIAL_DESIGNATION", "DESCRIPTIVE_REPRESENTATION_ITEM",
+    "PROPERTY_DEFINITION", "PRODUCT_DEFINITION", "DOCUMENT",
+}
+
+
+def sniff(path: str) -> str:
+    """File kind from its first bytes: step, dxf, dwg, pdf, png, jpeg or unknown."""
+    with open(path, 'rb') as f:
+        head = f.read(64)
+    if head.startswith(b"%PDF"):
+        return "pdf"
+    if head.startswith(b"\x89PNG"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"AutoCAD Binary DXF"):
+        return "dxf"
+    if head.startswith(b"AC10"):
+        return "dwg"
+    text = head.lstrip().upper()
+    if text.startswith(b"ISO-10303-21"):
+        return "step"
+    if text.startswith(b"0\r\nSECTION") or text.startswith(b"0\nSECTION") or text.startswith(b"999"):
+        return "dxf"
+    return "unknown"
+
+
+def analyze_file(path: str, preview_path: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze one design file. `preview_path` receives a JPEG preview for images."""
+    kind = sniff(path)
+    result: Dict[str, Any] = {"kind": kind, "size": os.path.getsize(path)}
+    if kind == "step":
+        result.update(analyze_step(path))
+    elif kind == "dxf":
+        result.update(analyze_dxf(path))
+    elif kind == "dwg":
+        result.update(analyze_dwg(path))
+    elif kind == "pdf":
+        result.update(analyze_pdf(path))
+    elif kind in ("png", "jpeg"):
+        result.update(analyze_image(path, preview_path))
+    return result
+
+
+# -- STEP (ISO 10303-21) -----------------------------------------------------
+
+def _step_statements(path: str):
+    """Yield DATA-section statements one at a time (statements may span lines)."""
+    buffer: List[str] = []
+    in_data = False
+    with open(path, 'r', encoding='latin-1') as f:
+        for line in f:
+            stripped = line.strip()
+            if not in_data:
+                if stripped.upper().startswith("DATA"):
+                    in_data = True
+                elif stripped.startswith(("FILE_SCHEMA", "FILE_NAME")):
+                    yield stripped
+                continue
+            if not stripped:
+                continue
+            buffer.append(stripped)
+            # A ';' inside a string does not end the statement
+            if stripped.endswith(";") and sum(part.count("'") for part in buffer) % 2 == 0:
+                statement = " ".join(buffer)
+                buffer.clear()
+                if statement.upper().startswith("ENDSEC"):
+                    in_data = False
+                    continue
+                yield statement
+
+
+def _step_strings(args: str) -> List[str]:
+    return [s.replace("''", "'").strip() for s in _STEP_STRING_RE.findall(args)]
+
+
+def analyze_step(path: str) -> Dict[str, Any]:
+    counts: Counter = Counter()
+    low = [float("inf")] * 3
+    high = [float("-inf")] * 3
+    products: List[str] = []
+    texts: List[str] = []
+    text_length = 0
+    volume = None
+    unit = None
+    schema = None
+
+    for statement in _step_statements(path):
+        if statement.startswith("FILE_SCHEMA"):
+            strings = _step_strings(statement)
+            schema = strings[0] if strings else None
+            continue
+        if statement.startswith("FILE_NAME"):
+            continue
+
+        match = _STEP_ENTITY_RE.match(statement)
+        if match is None:
+            # Complex (multi-type) entity; units live here
+            if "LENGTH_UNIT" in statement:
+                if "CONVERSION_BASED_UNIT" in statement and "INCH" in statement.upper():
+                    unit = "inch"
+                else:
+                    unit_match = _STEP_UNIT_RE.search(statement)
+                    if unit_match:
+                        unit = STEP_UNIT_PREFIXES.get(unit_match.group(1), unit)
+            continue
+
+        name, args = match.group(1), match.group(2)
+        counts[name] += 1
+        if name == "CARTESIAN_POINT":
+            point = _STEP_POINT_RE.search(args)
+            if point:
+                for axis, value in enumerate(point.groups()):
+                    if value is not None:
+                        value = float(value)
+                        if value < low[axis]:
+                            low[axis] = value
+                        if value > high[axis]:
+                            high[axis] = value
+        elif name in _STEP_TEXT_ENTITIES:
+            strings = [s for s in _step_strings(args) if s]
+            if name == "PRODUCT" and strings:
+                products.append(strings[0])
+            if text_length < DESIGN_ANALYSIS_MAX_TEXT:
+                texts.extend(strings)
+                text_length += sum(len(s) + 1 for s in strings)
+        elif volume is None and "VOLUME_MEASURE" in args:
+            volume_match = _STEP_VOLUME_RE.search(args)
+            if volume_match:
+                volume = float(volume_match.group(1))
+
+    bounding_box = None
+    if low[0] != float("inf"):
+        dims = 3 if low[2] != float("inf") else 2
+        bounding_box = {
+            "min": low[:dims],
+            "max": high[:dims],
+            "size": [round(high[i] - low[i], 6) for i in range(dims)],
+        }
+
+    return {
+        "schema": schema,
+        "unit": unit,
+        "part_count": counts["PRODUCT"],
+        "parts": sorted(set(products))[:50],
+        "solid_count": counts["MANIFOLD_SOLID_BREP"] + counts["BREP_WITH_VOIDS"],
+        # From the points as written (part placements are not applied)
+        "bounding_box": bounding_box,
+        # Only when the file carries validation properties
+        "volume": volume,
+        "entity_count": sum(counts.values()),
+        "text": " ".join(texts)[:DESIGN_ANALYSIS_MAX_TEXT],
+    }
+
+
+# -- DXF / DWG ---------------------------------------------------------------
+
+def analyze_dxf(path: str) -> Dict[str, Any]:
+    try:
+        from ezdxf import bbox, recover, units
+    except ImportError:
+        return {"error": "ezdxf is not installed"}
+
+    doc, auditor = recover.readfile(path)
+    msp = doc.modelspace()
+
+    counts: Counter = Counter()
+    texts: List[str] = []
+    text_length = 0
+    closed = 0
+    for entity in msp:
+        kind = entity.dxftype()
+        counts[kind] += 1
+        text = None
+        if kind == "TEXT":
+            text = entity.dxf.text
+        elif kind == "MTEXT":
+            text = entity.plain_text()
+        elif kind == "INSERT":
+            text = " ".join(attrib.dxf.text for attrib in entity.attribs)
+        elif kind == "CIRCLE" or (kind in ("LWPOLYLINE", "POLYLINE") and entity.is_closed):
+            closed += 1
+        if text and text_length < DESIGN_ANALYSIS_MAX_TEXT:
+            texts.append(text)
+            text_length += len(text) + 1
+
+    extents = bbox.extents(msp, fast=True)
+    bounding_box = None
+    if extents.has_data:
+        bounding_box = {
+            "min": list(extents.extmin),
+            "max": list(extents.extmax),
+            "size": [round(v, 6) for v in extents.size],
+        }
+    try:
+        unit = units.InsertUnits(doc.units).name.lower()
+    except ValueError:
+        unit = None
+
+    return {
+        "version": doc.acad_release,
+        "unit": unit,
+        # Block references are parts in an assembly drawing; closed contours in a flat pattern
+        "part_count": counts["INSERT"] or closed or None,
+        "block_references": counts["INSERT"],
+        "closed_contours": closed,
+        "layers": len(doc.layers),
+        "entities": dict(counts.most_common(10)),
+        "bounding_box": bounding_box,
+        "volume": None,
+        "repaired": len(auditor.fixes) > 0,
+        "text": " ".join(texts)[:DESIGN_ANALYSIS_MAX_TEXT],
+    }
+
+
+def analyze_dwg(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        code = f.read(6).decode('ascii', 'replace')
+    return {
+        "version": code,
+        "release": DWG_RELEASES.get(code),
+        "note": "DWG geometry is not read; request a DXF or STEP export for details",
+    }
+
+
+# -- PDF / images -------------------------------------------------------------
+
+def analyze_pdf(path: str) -> Dict[str, Any]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return {"error": "pypdf is not installed"}
+
+    reader = PdfReader(path)
+    if reader.is_encrypted:
+        reader.decrypt("")
+
+    page_size = None
+    if reader.pages:
+        box = reader.pages[0].mediabox
+        # PDF units are points (1/72 inch)
+        page_size = [round(float(box.width) * 25.4 / 72, 1), round(float(box.height) * 25.4 / 72, 1)]
+
+    texts: List[str] = []
+    text_length = 0
+    for page in reader.pages[:PDF_TEXT_PAGES]:
+        text = page.extract_text() or ""
+        texts.append(text)
+        text_length += len(text)
+        if text_length >= DESIGN_ANALYSIS_MAX_TEXT:
+            break
+
+    metadata = reader.metadata or {}
+    return {
+        "page_count": len(reader.pages),
+        "page_size_mm": page_size,
+        "title": metadata.get("/Title"),
+        "creator": metadata.get("/Creator"),
+        "text": "\n".join(texts)[:DESIGN_ANALYSIS_MAX_TEXT],
+    }
+
+
+def analyze_image(path: str, preview_path: Optional[str] = None) -> Dict[str, Any]:
+    try:
+        from PIL import Image
+    except ImportError:
+        return {"error": "Pillow is not installed"}
+
+    with Image.open(path) as image:
+        result = {
+            "width": image.width,
+            "height": image.height,
+            "mode": image.mode,
+            "preview": False,
+        }
+        if preview_path:
+            # draft() lets the JPEG decoder downscale while decoding
+            image.draft("RGB", (DESIGN_PREVIEW_SIZE, DESIGN_PREVIEW_SIZE))
+            image.thumbnail((DESIGN_PREVIEW_SIZE, DESIGN_PREVIEW_SIZE))
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            tmp_path = f"{preview_path}.tmp"
+            image.save(tmp_path, "JPEG", quality=80, optimize=True)
+            os.replace(tmp_path, preview_path)
+            result["preview"] = True
+    return result
@@ -0,0 +1,335 @@
+"""Design Storage - Streaming, content-addressed design file uploads.
+
+Uploads are written chunk by chunk to a staging file while their SHA-256 is
+computed, so memory per upload stays at one write buffer whatever the file
+size. When the last byte arrives the file is stored under its content
+address (`designs/<sha256>`): identical files are stored once, and
+same-named files never collide.
+
+Large CAD files can be sent resumably: create an upload session with the
+total size, append chunks at the current offset, and after a dropped
+connection ask for the offset and continue from there. Sessions survive a
+restart (the staging file is the source of truth for the offset) and are
+purged after DESIGN_UPLOAD_TTL seconds of inactivity.
+
+Files go to Firebase Storage when a bucket is configured, otherwise to a
+local directory (DESIGN_STORAGE_DIR) that stands in for it.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import secrets
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.services.firebase import ensure_firebase, has_storage, storage_blob_exists, upload_storage_blob
+
+DESIGN_STORAGE_DIR = Path(os.getenv(
+    "DESIGN_STORAGE_DIR", Path(__file__).resolve().parents[2] / "uploads"
+))
+DESIGN_UPLOAD_MAX_BYTES = int(os.getenv("DESIGN_UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+# Advertised to resumable clients; also the Cloud Storage upload chunk (multiple of 256 KB)
+DESIGN_UPLOAD_CHUNK_SIZE = int(os.getenv("DESIGN_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+DESIGN_UPLOAD_TTL = float(os.getenv("DESIGN_UPLOAD_TTL", "86400"))
+DESIGN_UPLOAD_TIMEOUT = float(os.getenv("DESIGN_UPLOAD_TIMEOUT", "600"))
+
+# Incoming pieces are gathered into writes of this size
+WRITE_BUFFER_SIZE = 1024 * 1024
+PURGE_INTERVAL = 3600
+
+ALLOWED_CONTENT_TYPES = {
+    "application/pdf",
+    "application/step",
+    "application/dxf",
+    "application/dwg",
+    "image/png",
+    "image/jpeg",
+}
+ALLOWED_EXTENSIONS = ('.step', '.stp', '.dxf', '.dwg')
+
+_UPLOAD_ID_RE = re.compile(r"^[A-Za-z0-9_-]{22}$")
+
+
+class UploadError(Exception):
+    """An upload request that cannot be honored; carries the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def is_allowed_design(filename: str, content_type: Optional[str]) -> bool:
+    """Design files: PDF, STEP, DXF, DWG, PNG, JPEG."""
+    return content_type in ALLOWED_CONTENT_TYPES or (filename or "").lower().endswith(ALLOWED_EXTENSIONS)
+
+
+class UploadSession:
+    """One in-progress upload: a staging file plus the running hash of its bytes."""
+
+    def __init__(self, store: "DesignStore", upload_id: str, meta: Dict[str, Any]):
+        self.id = upload_id
+        self.filename: str = meta['filename']
+        self.content_type: Optional[str] = meta.get('content_type')
+        self.size: Optional[int] = meta.get('size')
+        self.part_path = store.staging_dir / f"{upload_id}.part"
+        self.meta_path = store.staging_dir / f"{upload_id}.json"
+        self.offset = self.part_path.stat().st_size if self.part_path.exists() else 0
+        self.lock = asyncio.Lock()
+        # Rebuilt from the staging file when a session is resumed after a restart
+        self._hasher = hashlib.sha256() if self.offset == 0 else None
+
+    def _write(self, data: bytes):
+        """Append to the staging file and the hash (runs off the event loop)."""
+        if self._hasher is None:
+            self._hasher = hashlib.sha256()
+            with open(self.part_path, 'rb') as f:
+                for block in iter(lambda: f.read(WRITE_BUFFER_SIZE), b''):
+                    self._hasher.update(block)
+        with open(self.part_path, 'ab') as f:
+            f.write(data)
+        self._hasher.update(data)
+        self.offset += len(data)
+
+    def _digest(self) -> str:
+        if self._hasher is None:
+            self._write(b'')
+        return self._hasher.hexdigest()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "upload_id": self.id,
+            "filename": self.filename,
+            "offset": self.offset,
+            "size": self.size,
+            "chunk_size": DESIGN_UPLOAD_CHUNK_SIZE,
+        }
+
+
+class DesignStore:
+    """Staged, hashed uploads stored by content address (locally or in Cloud Storage)."""
+
+    def __init__(self, root: Path = DESIGN_STORAGE_DIR):
+        self.root = root
+        self.staging_dir = root / ".staging"
+        self.designs_dir = root / "designs"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.designs_dir.mkdir(parents=True, exist_ok=True)
+        self._sessions: Dict[str, UploadSession] = {}
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_received = 0
+
+    # -- sessions -----------------------------------------------------------
+
+    def create(self, filename: str, content_type: Optional[str], size: Optional[int] = None) -> UploadSession:
+        """Start an upload. `size` is required for resumable uploads."""
+        if not is_allowed_design(filename, content_type):
+            raise UploadError(400, "Invalid file type. Allowed: PDF, STEP, DXF, DWG, PNG, JPEG")
+        if size is not None and size > DESIGN_UPLOAD_MAX_BYTES:
+            raise UploadError(413, f"File too large (limit {DESIGN_UPLOAD_MAX_BYTES} bytes)")
+
+        upload_id = secrets.token_urlsafe(16)
+        meta = {
+            "filename": os.path.basename(filename or "design"),
+            "content_type": content_type,
+            "size": size,
+            "created_at": time.time(),
+        }
+        session = UploadSession(self, upload_id, meta)
+        session.meta_path.write_text(json.dumps(meta))
+        session.part_path.touch()
+        self._sessions[upload_id] = session
+        return session
+
+    def get(self, upload_id: str) -> UploadSession:
+        """An upload session by id, reloaded from the staging directory if needed."""
+        session = self._sessions.get(upload_id)
+        if session is not None:
+            return session
+        if not _UPLOAD_ID_RE.match(upload_id):
+            raise UploadError(404, "Upload not found")
+        meta_path = self.staging_dir / f"{upload_id}.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (FileNotFoundError, ValueError):
+            raise UploadError(404, "Upload not found")
+        session = UploadSession(self, upload_id, meta)
+        self._sessions[upload_id] = session
+        return session
+
+    async def append(self, session: UploadSession, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Stream `chunks` onto the upload at `offset` (which must be its current
+        offset). Returns the new offset; whatever arrived before a dropped
+        connection is kept, so the client can resume from there.
+        """
+        if session.lock.locked():
+            raise UploadError(409, "Another request is writing to this upload")
+        async with session.lock:
+            if offset != session.offset:
+                raise UploadError(409, f"Offset mismatch: upload is at {session.offset}")
+            limit = session.size if session.size is not None else DESIGN_UPLOAD_MAX_BYTES
+
+            buffer = bytearray()
+            try:
+                async for chunk in chunks:
+                    if session.offset + len(buffer) + len(chunk) > limit:
+                        raise UploadError(413, f"Upload exceeds its size ({limit} bytes)")
+                    buffer += chunk
+                    if len(buffer) >= WRITE_BUFFER_SIZE:
+                        await asyncio.to_thread(session._write, bytes(buffer))
+                        self.bytes_received += len(buffer)
+                        buffer.clear()
+            finally:
+                if buffer:
+                    await asyncio.to_thread(session._write, bytes(buffer))
+                    self.bytes_received += len(buffer)
+            return session.offset
+
+    def is_complete(self, session: UploadSession) -> bool:
+        return session.size is not None and session.offset >= session.size
+
+    async def finalize(self, session: UploadSession) -> Dict[str, Any]:
+        """Store the staged file under its content address and end the session."""
+        async with session.lock:
+            if session.size is not None and session.offset != session.size:
+                raise UploadError(409, f"Upload incomplete: {session.offset} of {session.size} bytes")
+            if session.offset == 0:
+                raise UploadError(400, "Empty file")
+
+            digest = await asyncio.to_thread(session._digest)
+            file_ref = f"designs/{digest}"
+            await ensure_firebase()
+            if has_storage():
+                created = not await storage_blob_exists(file_ref) and await upload_storage_blob(
+                    file_ref,
+                    str(session.part_path),
+                    content_type=session.content_type,
+                    metadata={"filename": session.filename},
+                    chunk_size=DESIGN_UPLOAD_CHUNK_SIZE,
+                    timeout=DESIGN_UPLOAD_TIMEOUT,
+                )
+            else:
+                created = await asyncio.to_thread(self._store_local, session, digest)
+
+            if created:
+                self.stored += 1
+            else:
+                self.deduplicated += 1
+            result = {
+                "file_ref": file_ref,
+                "filename": session.filename,
+                "size": session.offset,
+                "sha256": digest,
+                "deduplicated": not created,
+            }
+            await asyncio.to_thread(self._discard, session)
+            return result
+
+    def _store_local(self, session: UploadSession, digest: str) -> bool:
+        target = self.designs_dir / digest
+        if target.exists():
+            return False
+        os.chmod(session.part_path, 0o644)
+        os.replace(session.part_path, target)
+        return True
+
+    async def abort(self, session: UploadSession):
+        async with session.lock:
+            await asyncio.to_thread(self._discard, session)
+
+    def _discard(self, session: UploadSession):
+        self._sessions.pop(session.id, None)
+        for path in (session.part_path, session.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def purge_stale(self, max_age: float = DESIGN_UPLOAD_TTL) -> int:
+        """Drop staged uploads that have not been written to for `max_age` seconds."""
+        cutoff = time.time() - max_age
+        purged = 0
+        for meta_path in self.staging_dir.glob("*.json"):
+            part_path = meta_path.with_suffix(".part")
+            try:
+                last_write = max(meta_path.stat().st_mtime,
+                                 part_path.stat().st_mtime if part_path.exists() else 0)
+            except FileNotFoundError:
+                continue
+            if last_write < cutoff:
+                session = self._sessions.get(meta_path.stem)
+                if session is not None and session.lock.locked():
+                    continue
+                self._sessions.pop(meta_path.stem, None)
+                for path in (part_path, meta_path):
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                purged += 1
+        return purged
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "firebase" if has_storage() else "local",
+            "active_uploads": len(self._sessions),
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "bytes_received": self.bytes_received,
+        }
+
+
+# Global store instance
+_store: Optional[DesignStore] = None
+_purge_task: Optional[asyncio.Task] = None
+
+
+def get_design_store() -> DesignStore:
+    """Get or create the global design store."""
+    global _store
+
+    if _store is None:
+        _store = DesignStore()
+    return _store
+
+
+async def _purge_loop():
+    while True:
+        await asyncio.sleep(PURGE_INTERVAL)
+        try:
+            purged = await asyncio.to_thread(get_design_store().purge_stale)
+            if purged:
+                print(f"Purged {purged} stale design uploads")
+        except Exception as e:
+            print(f"Design upload purge error: {e}")
+
+
+async def start_design_storage():
+    """Purge abandoned uploads now and periodically."""
+    global _purge_task
+
+    purged = await asyncio.to_thread(get_design_store().purge_stale)
+    if purged:
+        print(f"Purged {purged} stale design uploads")
+    _purge_task = asyncio.create_task(_purge_loop())
+
+
+async def stop_design_storage():
+    global _purge_task
+
+    if _purge_task is not None:
+        _purge_task.cancel()
+        try:
+            await _purge_task
+        except asyncio.CancelledError:
+            pass
+        _purge_task = None
+
+
+def get_design_storage_stats() -> Dict[str, Any]:
+    return get_design_store().stats()
@@ -1,8 +1,22 @@
-"""Email Service - Handles sending anonymized RFQ emails to suppliers."""
-import os
-from typing import List, Dict, Any
+"""Email Service - Handles sending anonymized RFQ emails to suppliers.
+
+Emails are appended to the durable outbox (app/services/outbox.py) and
+delivered by its worker, so request latency does not depend on SendGrid.
+Delivery goes through the pooled SendGrid transport, which batches
+recipients into multi-personalization API calls.
+"""
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from app.services import firebase
+from app.services.outbox import enqueue, register_handler
+from app.services.email_transport import EmailMessage, get_email_transport
+from app.services.supplier_catalog import get_supplier
+
+# Outbox message kinds
+SUPPLIER_RFQ = "supplier_rfq"
+CUSTOMER_CONFIRMATION = "customer_confirmation"
+
 
 def generate_rfq_reference() -> str:
     """Generate a unique RFQ reference number."""
@@ -14,7 +28,7 @@ def generate_rfq_reference() -> str:
 
 async def send_rfq_to_suppliers(rfq, matches: Dict[str, List[Any]]):
     """
-    Send anonymized RFQ emails to matched suppliers.
+    Queue anonymized RFQ emails to matched suppliers.
     
     The email does NOT include:
     - Customer name
@@ -27,8 +41,6 @@ async def send_rfq_to_suppliers(rfq, matches: Dict[str, List[Any]]):
     - Quantities
     - Required certifications
     """
-    sendgrid_key = os.getenv("SENDGRID_API_KEY")
-    
     # Group items by supplier
     supplier_items = {}
     for item in rfq.items:
@@ -41,16 +53,46 @@ async def send_rfq_to_suppliers(rfq, matches: Dict[str, List[Any]]):
     rfq_ref = generate_rfq_reference()
     
     for supplier_id, items in supplier_items.items():
-        email_content = _build_supplier_email(rfq_ref, items)
-        
-        if sendgrid_key:
-            await _send_via_sendgrid(supplier_id, email_content, rfq_ref)
-        else:
-            # Log in development mode
-            print(f"[EMAIL] To: Supplier {supplier_id}")
-            print(f"[EMAIL] Subject: RFQ {rfq_ref}")
-            print(f"[EMAIL] Content:\n{email_content}")
+        # Before the replica has loaded, matching ran a one-off query; read the contact directly
+        supplier = get_supplier(supplier_id) or await firebase.get_supplier(supplier_id) or {}
+        await enqueue(SUPPLIER_RFQ, {
+            'supplier_id': supplier_id,
+            'email': supplier.get('email'),
+            'rfq_ref': rfq_ref,
+            'content': _build_supplier_email(rfq_ref, items),
+        })
+
+
+async def deliver_supplier_rfqs(payloads: List[Dict[str, Any]]) -> List[Optional[BaseException]]:
+    """Outbox batch handler: deliver supplier RFQ emails, one result per payload."""
+    transport = get_email_transport()
+    
+    if transport is None:
+        # Log in development mode
+        for payload in payloads:
+            print(f"[EMAIL] To: Supplier {payload['supplier_id']}")
+            print(f"[EMAIL] Subject: RFQ {payload['rfq_ref']}")
+            print(f"[EMAIL] Content:\n{payload['content']}")
             print("-" * 50)
+        return [None] * len(payloads)
+    
+    results: List[Optional[BaseException]] = [None] * len(payloads)
+    messages = []
+    positions = []
+    for i, payload in enumerate(payloads):
+        if not payload.get('email'):
+            results[i] = ValueError(f"No email on file for supplier {payload['supplier_id']}")
+            continue
+        messages.append(EmailMessage(
+            to=payload['email'],
+            subject=f"RFQ {payload['rfq_ref']} - Quote Request",
+            content=payload['content'],
+        ))
+        positions.append(i)
+    
+    for i, result in zip(positions, await transport.send(messages)):
+        results[i] = result
+    return results
 
 
 def _build_supplier_email(rfq_ref: str, items: List[Any]) -> str:
@@ -94,33 +136,8 @@ def _build_supplier_email(rfq_ref: str, items: List[Any]) -> str:
     return "\n".join(lines)
 
 
-async def _send_via_sendgrid(supplier_id: str, content: str, rfq_ref: str):
-    """Send email using SendGrid."""
-    try:
-        from sendgrid import SendGridAPIClient
-        from sendgrid.helpers.mail import Mail
-        
-        # In production, look up supplier email from database
-        # For now, log the attempt
-        print(f"[SENDGRID] Would send to supplier {supplier_id}: {rfq_ref}")
-        
-        # sg = SendGridAPIClient(os.environ.get('SENDGRID_API_KEY'))
-        # message = Mail(
-        #     from_email='quotes@bimotech.pl',
-        #     to_emails=supplier_email,
-        #     subject=f'RFQ {rfq_ref} - Quote Request',
-        #     plain_text_content=content
-        # )
-        # response = sg.send(message)
-        
-    except Exception as e:
-        print(f"SendGrid error: {e}")
-
-
 async def send_confirmation_to_customer(email: str, rfq_id: str, item_count: int):
-    """Send confirmation email to customer after RFQ submission."""
-    sendgrid_key = os.getenv("SENDGRID_API_KEY")
-    
+    """Queue the confirmation email to the customer after RFQ submission."""
     content = f"""
 Thank you for your quote request.
 
@@ -140,25 +157,29 @@ ul. Pawińskiego 5B
 02-106 Warsaw, Poland
 """
     
-    if sendgrid_key:
-        try:
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail
-            
-            sg = SendGridAPIClient(sendgrid_key)
-            message = Mail(
-                from_email='quotes@bimotech.pl',
-                to_emails=email,
-                subject=f'Quote Request Received - {rfq_id.upper()}',
-                plain_text_content=content
-            )
-            response = sg.send(message)
-            print(f"Confirmation sent to {email}: {response.status_code}")
-            
-        except Exception as e:
-            print(f"SendGrid error: {e}")
+    await enqueue(CUSTOMER_CONFIRMATION, {
+        'email': email,
+        'subject': f'Quote Request Received - {rfq_id.upper()}',
+        'content': content,
+    })
+
+
+async def deliver_customer_confirmation(payload: Dict[str, Any]):
+    """Outbox handler: deliver a customer confirmation (raises on failure)."""
+    transport = get_email_transport()
+    email = payload['email']
+    content = payload['content']
+    
+    if transport is not None:
+        message = EmailMessage(to=email, subject=payload['subject'], content=content)
+        error = (await transport.send([message]))[0]
+        if error is not None:
+            raise error
+        print(f"Confirmation sent to {email}")
     else:
         print(f"[EMAIL] Confirmation to: {email}")
         print(f"[EMAIL] Content:\n{content}")
 
 
+register_handler(SUPPLIER_RFQ, deliver_supplier_rfqs, batch=True)
+register_handler(CUSTOMER_CONFIRMATION, deliver_customer_confirmation)
@@ -0,0 +1,178 @@
+"""Email Transport - Pooled async client for the SendGrid v3 mail API.
+
+One keep-alive HTTP client is shared by all sends. Messages that share a
+subject are packed into a single API call with one personalization per
+recipient (the body travels as a per-personalization substitution), and
+API calls run concurrently under a semaphore. An RFQ matched to 50
+suppliers therefore costs one or a few round trips instead of 50.
+
+`SENDGRID_API_URL` points the transport at a local fake server for tests
+and benchmarks (see benchmarks/fake_sendgrid.py).
+"""
+import os
+import asyncio
+from typing import Optional, List, Dict, Any, NamedTuple, Tuple
+
+import httpx
+
+from app.services.health import report, set_status
+from app.services.metrics import span
+
+SENDGRID_API_URL = os.getenv("SENDGRID_API_URL", "https://api.sendgrid.com")
+EMAIL_MAX_CONCURRENCY = int(os.getenv("EMAIL_MAX_CONCURRENCY", "8"))
+FROM_EMAIL = "quotes@bimotech.pl"
+
+# SendGrid limits
+MAX_PERSONALIZATIONS = 1000
+MAX_SUBSTITUTION_BYTES = 10000
+
+BODY_TOKEN = "-body-"
+
+
+class EmailMessage(NamedTuple):
+    """A plain-text email to a single recipient."""
+    to: str
+    subject: str
+    content: str
+
+
+class SendGridError(Exception):
+    """SendGrid rejected a request or could not be reached."""
+
+
+class SendGridTransport:
+    """Async SendGrid client with a pooled connection and bounded fan-out."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = SENDGRID_API_URL,
+        max_concurrency: int = EMAIL_MAX_CONCURRENCY,
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=60.0,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests_sent = 0
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def _post(self, payload: Dict[str, Any]):
+        async with self._semaphore:
+            self.requests_sent += 1
+            with span("email.send"):
+                try:
+                    response = await self._client.post("/v3/mail/send", json=payload)
+                except httpx.HTTPError as e:
+                    report("sendgrid", False, str(e))
+                    raise SendGridError(f"SendGrid request failed: {e}") from e
+                if response.status_code >= 300:
+                    report("sendgrid", False, f"HTTP {response.status_code}")
+                    raise SendGridError(f"SendGrid returned {response.status_code}: {response.text[:500]}")
+        report("sendgrid", True)
+
+    async def send(self, messages: List[EmailMessage]) -> List[Optional[BaseException]]:
+        """
+        Send messages with as few API calls as possible.
+
+        Returns one result per message: None if SendGrid accepted it,
+        otherwise the exception for the request that carried it.
+        """
+        requests = build_requests(messages)
+        outcomes = await asyncio.gather(
+            *[self._post(payload) for _, payload in requests],
+            return_exceptions=True,
+        )
+
+        results: List[Optional[BaseException]] = [None] * len(messages)
+        for (indexes, _), outcome in zip(requests, outcomes):
+            if isinstance(outcome, BaseException):
+                for i in indexes:
+                    results[i] = outcome
+        return results
+
+
+def _single_payload(message: EmailMessage) -> Dict[str, Any]:
+    return {
+        "personalizations": [{"to": [{"email": message.to}]}],
+        "from": {"email": FROM_EMAIL},
+        "subject": message.subject,
+        "content": [{"type": "text/plain", "value": message.content}],
+    }
+
+
+def build_requests(messages: List[EmailMessage]) -> List[Tuple[List[int], Dict[str, Any]]]:
+    """
+    Pack messages into SendGrid mail/send payloads.
+
+    Returns (message indexes, payload) pairs. Messages sharing a subject go
+    into one multi-personalization payload; a message whose body exceeds the
+    substitution size limit is sent on its own.
+    """
+    groups: Dict[str, List[int]] = {}
+    requests = []
+
+    for i, message in enumerate(messages):
+        if len(message.content.encode("utf-8")) > MAX_SUBSTITUTION_BYTES:
+            requests.append(([i], _single_payload(message)))
+        else:
+            groups.setdefault(message.subject, []).append(i)
+
+    for subject, indexes in groups.items():
+        for start in range(0, len(indexes), MAX_PERSONALIZATIONS):
+            chunk = indexes[start:start + MAX_PERSONALIZATIONS]
+            if len(chunk) == 1:
+                requests.append((chunk, _single_payload(messages[chunk[0]])))
+                continue
+            requests.append((chunk, {
+                "personalizations": [
+                    {
+                        "to": [{"email": messages[i].to}],
+                        "substitutions": {BODY_TOKEN: messages[i].content},
+                    }
+                    for i in chunk
+                ],
+                "from": {"email": FROM_EMAIL},
+                "subject": subject,
+                "content": [{"type": "text/plain", "value": BODY_TOKEN}],
+            }))
+
+    return requests
+
+
+_transport: Optional[SendGridTransport] = None
+
+
+def get_email_transport() -> Optional[SendGridTransport]:
+    """Get the shared transport, or None when SENDGRID_API_KEY is not set."""
+    global _transport
+
+    if _transport is None:
+        api_key = os.getenv("SENDGRID_API_KEY")
+        if not api_key:
+            return None
+        _transport = SendGridTransport(api_key)
+    return _transport
+
+
+def initialize_email_transport():
+    """Create the shared transport at startup; SendGrid shows as "mock" on /health without a key."""
+    transport = get_email_transport()
+    set_status("sendgrid", "unknown" if transport is not None else "mock")
+
+
+async def close_email_transport():
+    """Close the pooled HTTP client."""
+    global _transport
+
+    if _transport is not None:
+        await _transport.close()
+        _transport = None
@@ -0,0 +1,257 @@
+"""Entity Extractor - Finds material mentions in free text in one pass.
+
+An Aho-Corasick automaton is compiled over every material name, id,
+chemical symbol, alloy designation (Ti6Al4V, TZM, W-Re, Inconel...) and
+synonym. Scanning a chat message or RFQ line visits each character once,
+however many patterns there are. Matches must sit on word boundaries;
+chemical symbols ("W", "Mo") must also match case, so "mo" or "w" in
+ordinary prose are not taken for metals.
+"""
+import re
+from collections import deque
+from typing import Dict, Any, List, Optional, NamedTuple, Iterable, Tuple
+
+# Extra names for materials: pattern -> keyword (a MATERIALS id or a
+# MATERIAL_CAPABILITIES key)
+SYNONYMS = {
+    'wolfram': 'tungsten',
+    'moly': 'molybdenum',
+    'ti-6al-4v': 'titanium',
+    'ti64': 'titanium',
+    'grade 5': 'titanium',
+    'cp titanium': 'titanium',
+    'inconel 600': 'inconel',
+    'inconel 625': 'inconel',
+    'inconel 718': 'inconel',
+    'hastelloy c-276': 'hastelloy',
+    'hastelloy x': 'hastelloy',
+    'monel': 'nickel',
+    'nimonic': 'nickel',
+    'stellite 6': 'stellite',
+    'zircaloy': 'zirconium',
+    'sputtering target': 'sputtering-targets',
+    'pvd target': 'sputtering-targets',
+}
+
+# Alloy list entries that name a class of material rather than an alloy
+_GENERIC_ALLOYS = {
+    'pure metals', 'alloys', 'binary/ternary alloys', 'oxides', 'nitrides', 'carbides', 'borides',
+}
+
+# Symbols up to this length only match with the exact capitalization
+CASE_SENSITIVE_MAX_LENGTH = 2
+
+_SEPARATORS = str.maketrans({'-': ' ', '_': ' ', '/': ' ', '–': ' ', '‑': ' '})
+
+
+class Entity(NamedTuple):
+    """What a pattern refers to."""
+    keyword: str                # matching keyword (MATERIAL_CAPABILITIES key when known)
+    material_id: Optional[str]  # MATERIALS id, if the backend has data for it
+
+
+class EntityMention(NamedTuple):
+    """One entity occurrence in a text (character offsets into the original)."""
+    entity: Entity
+    start: int
+    end: int
+    text: str
+
+
+def normalize(text: str) -> str:
+    """Lowercase and map separators to spaces, preserving character offsets."""
+    return text.lower().translate(_SEPARATORS)
+
+
+class EntityExtractor:
+    """Aho-Corasick automaton over material patterns."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, Entity]]):
+        # Trie: per-node transitions, failure links and (pattern index) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, Entity, Optional[str]]] = []
+
+        seen = set()
+        for pattern, entity in patterns:
+            key = normalize(pattern).strip()
+            exact = pattern if len(pattern) <= CASE_SENSITIVE_MAX_LENGTH else None
+            if not key or (key, exact) in seen:
+                continue
+            seen.add((key, exact))
+            self._add(key, len(self._patterns))
+            self._patterns.append((key, entity, exact))
+
+        self._build_failure_links()
+
+    def _add(self, key: str, index: int):
+        node = 0
+        for char in key:
+            following = self._goto[node].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto[node][char] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = following
+        self._outputs[node].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def to_state(self) -> Dict[str, Any]:
+        """The compiled automaton, JSON-serializable."""
+        return {
+            "goto": self._goto,
+            "fail": self._fail,
+            "outputs": self._outputs,
+            "patterns": [
+                [key, entity.keyword, entity.material_id, exact]
+                for key, entity, exact in self._patterns
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "EntityExtractor":
+        """Restore a compiled automaton from `to_state()` output."""
+        extractor = cls.__new__(cls)
+        extractor._goto = state["goto"]
+        extractor._fail = state["fail"]
+        extractor._outputs = state["outputs"]
+        extractor._patterns = [
+            (key, Entity(keyword, material_id), exact)
+            for key, keyword, material_id, exact in state["patterns"]
+        ]
+        return extractor
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def extract(self, text: str) -> List[EntityMention]:
+        """All non-overlapping mentions, leftmost first (longest wins at a position)."""
+        normalized = normalize(text)
+        candidates = []
+        node = 0
+        for position, char in enumerate(normalized):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._outputs[node]:
+                key, entity, exact = self._patterns[index]
+                start = position - len(key) + 1
+                end = position + 1
+                if start > 0 and normalized[start - 1].isalnum():
+                    continue
+                if end < len(normalized) and normalized[end].isalnum():
+                    continue
+                if exact is not None and text[start:end] != exact:
+                    continue
+                candidates.append((start, -end, entity))
+
+        mentions = []
+        covered = 0
+        for start, negative_end, entity in sorted(candidates, key=lambda c: (c[0], c[1])):
+            if start < covered:
+                continue
+            mentions.append(EntityMention(entity, start, -negative_end, text[start:-negative_end]))
+            covered = -negative_end
+        return mentions
+
+    def first(self, text: str) -> Optional[EntityMention]:
+        mentions = self.extract(text)
+        return mentions[0] if mentions else None
+
+
+def _alloy_patterns(alloy: str) -> List[str]:
+    """
+    Designations named by an alloy list entry, e.g.
+    "Inconel 600, 625, X-750" -> Inconel, Inconel 600, Inconel 625, Inconel X-750
+    "Grade 5 (Ti6Al4V) - Aerospace" -> Ti6Al4V
+    "W-Re (W-3%Re, W-25%Re)" -> W-Re;  "Pure Tungsten (min. 99.95%)" -> none
+    """
+    text = alloy.split(' - ')[0].strip()
+    lowered = text.lower()
+    if not text or lowered in _GENERIC_ALLOYS or lowered.startswith(('pure ', 'all ')):
+        return []
+
+    head, _, inner = text.partition('(')
+    head = head.strip()
+    inner = inner.rstrip(') ').strip()
+    designations = []
+
+    # Parentheses hold either a designation (Ti6Al4V, Nitinol) or a composition (W-3%Re)
+    if inner and '%' not in inner and not re.search(r"\d\.\d", inner):
+        designations.extend(item.strip() for item in inner.split(',') if len(item.strip()) >= 3)
+    if re.match(r"grade\s+\d", head, re.I):
+        return designations
+
+    items = [item.strip() for item in head.split(',') if item.strip()]
+    if not items:
+        return designations
+    first = re.sub(r"\s+(alloys|[\d.]+%\+?)$", "", items[0], flags=re.I)
+    family, _, grade = first.partition(' ')
+    designations.append(family)
+    if grade:
+        # Family with grades: "Monel 400, K-500", "Nickel 200/201"; ratios like 90:10 are skipped
+        grades = [g for item in [grade] + items[1:] for g in item.split('/')]
+        designations.extend(f"{family} {g.strip()}" for g in grades if g.strip() and ':' not in g)
+    return designations
+
+
+def material_patterns(
+    materials: Dict[str, Dict],
+    capability_keywords: Iterable[str],
+) -> List[Tuple[str, Entity]]:
+    """Patterns for every material, symbol, alloy, capability keyword and synonym."""
+    capability_keywords = set(capability_keywords)
+    symbols = {m['symbol'].lower(): material_id for material_id, m in materials.items()}
+    # Keyword -> MATERIALS id that lists it (e.g. inconel -> nickel)
+    owners: Dict[str, str] = {material_id: material_id for material_id in materials}
+
+    patterns = []
+    for material_id, material in materials.items():
+        own = Entity(material_id, material_id)
+        patterns.append((material['name'], own))
+        patterns.append((material_id, own))
+        patterns.append((material['symbol'], own))
+        for alloy in material.get('alloys', []):
+            for designation in _alloy_patterns(alloy):
+                base = designation.lower().split()[0]
+                if base in capability_keywords:
+                    owners.setdefault(base, material_id)
+                    patterns.append((designation, Entity(base, material_id)))
+                    continue
+                # W-Re is tungsten, Mo-Re molybdenum: the leading element decides
+                leading = re.split(r"[-\s]", base)[0]
+                owner = symbols.get(leading, material_id)
+                patterns.append((designation, Entity(owner, owner)))
+
+    for keyword in capability_keywords:
+        patterns.append((keyword, Entity(keyword, owners.get(keyword))))
+    for synonym, keyword in SYNONYMS.items():
+        patterns.append((synonym, Entity(keyword, owners.get(keyword))))
+    return patterns
+
+
+def get_entity_extractor() -> EntityExtractor:
+    """The extractor compiled into the current catalog snapshot."""
+    from app.services.material_catalog import get_catalog
+
+    return get_catalog().extractor
+
+
+def extract_entities(text: str) -> List[EntityMention]:
+    """Material mentions in `text`, in order of appearance."""
+    return get_entity_extractor().extract(text)
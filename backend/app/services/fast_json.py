@@ -0,0 +1,102 @@
+"""Fast JSON - Opt-in request/response fast path for large payloads.
+
+FastAPI's default path parses the body with `json.loads`, validates the
+resulting Python objects, then validates the endpoint's return value again
+through `response_model` and encodes it with `jsonable_encoder` + stdlib
+`json`. For large RFQs and chat histories that is several full passes over
+the payload. Routes opt in to a shorter path:
+
+- `json_body(Model)`: a dependency that validates the raw request bytes in
+  one pass (pydantic-core's JSON parser, cached `TypeAdapter`), with the same
+  422 errors as FastAPI for invalid fields (a malformed or empty body is one
+  `json_invalid` error at `body`). Pass `openapi_extra=json_body_openapi(Model)`
+  to keep the body documented.
+- `model_response(model)`: serializes a model the server built itself
+  straight to JSON bytes, without re-validating it. Document the shape with
+  `responses={200: {"model": Model}}` instead of `response_model`.
+- `FastJSONResponse`: orjson-based response class for plain dicts/lists
+  (falls back to the stdlib encoder if orjson is not installed).
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def get_adapter(tp: Any) -> TypeAdapter:
+    """Cached TypeAdapter; building one compiles a validator, so do it once per type."""
+    return TypeAdapter(tp)
+
+
+def parse_json(tp: Any, data: bytes) -> Any:
+    """Validate raw JSON bytes as `tp`. Raises pydantic.ValidationError."""
+    return get_adapter(tp).validate_json(data)
+
+
+def json_body(tp: Any) -> Callable:
+    """Dependency that validates the request body as `tp` straight from bytes."""
+    async def dependency(request: Request) -> Any:
+        body = await request.body()
+        try:
+            return parse_json(tp, body)
+        except ValidationError as e:
+            errors = e.errors()
+            for error in errors:
+                error["loc"] = ("body", *error["loc"])
+            raise RequestValidationError(errors, body=body)
+    return dependency
+
+
+def json_body_openapi(tp: Any) -> Dict[str, Any]:
+    """`openapi_extra` documenting a `json_body(tp)` request body."""
+    schema = get_adapter(tp).json_schema()
+    defs = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_refs(schema, defs)}},
+        }
+    }
+
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    # The operation schema cannot point at pydantic's local "$defs", so
+    # substitute them in place (request models here are not recursive)
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if ref and ref.startswith("#/$defs/"):
+            return _inline_refs(defs[ref[len("#/$defs/"):]], defs)
+        return {key: _inline_refs(value, defs) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(value, defs) for value in node]
+    return node
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain Python data (dicts, lists, datetimes, enums) to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialized with orjson when it is available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a trusted model to JSON bytes, skipping response_model re-validation."""
+    body = type(model).__pydantic_serializer__.to_json(model)
+    return Response(content=body, status_code=status_code, media_type="application/json")
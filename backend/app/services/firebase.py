@@ -1,16 +1,96 @@
-"""Firebase Service - Handles Firestore and Storage operations."""
+"""Firebase Service - Handles Firestore and Storage operations.
+
+The Admin SDK is imported and initialized on first use, off the event loop
+(`ensure_firebase`); the startup warm-up triggers it in the background so
+the server can listen before the slow SDK import has finished.
+"""
 import os
-from typing import Optional, Dict, Any
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable
 from datetime import datetime
 
+from app.services.metrics import span
+from app.services.firestore_queries import (
+    ACTIVE_SUPPLIERS,
+    SUPPLIERS_BY_CAPABILITY,
+    build_query,
+    chunk_values,
+)
+
 # Firebase Admin SDK (initialize when credentials are available)
 _db = None
 _storage = None
+_initialized = False
+_init_task: Optional[asyncio.Future] = None
+
+# The Admin SDK client is synchronous. Every call runs on a bounded, dedicated
+# thread pool so a slow round trip never stalls the event loop.
+FIRESTORE_MAX_WORKERS = int(os.getenv("FIRESTORE_MAX_WORKERS", "16"))
+FIRESTORE_TIMEOUT = float(os.getenv("FIRESTORE_TIMEOUT", "10"))
+# Storage transfers move whole design files, so they get their own, much longer limit
+STORAGE_TRANSFER_TIMEOUT = float(os.getenv("STORAGE_TRANSFER_TIMEOUT", "600"))
+# Extra time the event loop waits beyond an SDK timeout, so the SDK's own timeout fires first
+# and frees the worker thread (transfers: per-request timeouts over many requests)
+TIMEOUT_MARGIN = 30
+RPC_TIMEOUT_MARGIN = 2
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get (or lazily create) the Firestore I/O thread pool."""
+    global _executor
+    
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=FIRESTORE_MAX_WORKERS,
+            thread_name_prefix="firestore",
+        )
+    return _executor
+
+
+async def _run(fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+    """
+    Run a blocking Firestore call off the event loop.
+    
+    Raises asyncio.TimeoutError when the call does not finish within
+    `timeout` seconds (defaults to FIRESTORE_TIMEOUT).
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    # functools.partial hides the wrapped function's name
+    name = getattr(fn, '__name__', None) or getattr(getattr(fn, 'func', None), '__name__', 'call')
+    with span(f"firestore.{name}"):
+        return await asyncio.wait_for(
+            loop.run_in_executor(_get_executor(), call),
+            timeout or FIRESTORE_TIMEOUT,
+        )
+
+
+async def _call(method: Callable, *args, timeout: float = FIRESTORE_TIMEOUT, **kwargs):
+    """
+    Run a single Firestore/Storage SDK call off the event loop.
+
+    The SDK gets `timeout=` itself, so a stuck RPC is cancelled and its
+    worker thread freed; the await gives up shortly after that.
+    """
+    call = functools.partial(method, *args, timeout=timeout, **kwargs)
+    return await _run(call, timeout=timeout + RPC_TIMEOUT_MARGIN)
+
+
+def shutdown_firebase():
+    """Release the Firestore I/O thread pool."""
+    global _executor
+    
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
 
 
 def initialize_firebase():
     """Initialize Firebase Admin SDK."""
-    global _db, _storage
+    global _db, _storage, _initialized
     
     try:
         import firebase_admin
@@ -37,20 +117,35 @@ def initialize_firebase():
     except Exception as e:
         print(f"Firebase initialization error: {e}")
         print("Running in mock mode")
+    finally:
+        _initialized = True
+
+
+async def ensure_firebase():
+    """
+    The Firestore client (None in mock mode), initializing the SDK off the
+    event loop on first use. Concurrent callers share one initialization.
+    """
+    global _init_task
+    
+    if _initialized or _db is not None:
+        return _db
+    if _init_task is None or _init_task.done():
+        _init_task = asyncio.ensure_future(asyncio.to_thread(initialize_firebase))
+    await asyncio.shield(_init_task)
+    return _db
 
 
 async def save_rfq(rfq_session) -> str:
     """Save an RFQ session to Firestore."""
-    global _db
-    
-    if _db is None:
+    if await ensure_firebase() is None:
         # Mock mode - just return the session ID
         print(f"[MOCK] Saving RFQ: {rfq_session.id}")
         return rfq_session.id
     
     try:
         doc_ref = _db.collection('rfq_sessions').document(rfq_session.id)
-        doc_ref.set({
+        await _call(doc_ref.set, {
             'id': rfq_session.id,
             'items': [item.dict() for item in rfq_session.items],
             'status': rfq_session.status.value,
@@ -61,21 +156,20 @@ async def save_rfq(rfq_session) -> str:
         })
         return rfq_session.id
     except Exception as e:
+        # Callers must not acknowledge an RFQ that was not persisted
         print(f"Error saving RFQ: {e}")
-        return rfq_session.id
+        raise
 
 
 async def get_rfq(rfq_id: str) -> Optional[Dict[str, Any]]:
     """Get an RFQ by ID."""
-    global _db
-    
-    if _db is None:
+    if await ensure_firebase() is None:
         # Mock mode
         return None
     
     try:
         doc_ref = _db.collection('rfq_sessions').document(rfq_id)
-        doc = doc_ref.get()
+        doc = await _call(doc_ref.get)
         if doc.exists:
             return doc.to_dict()
         return None
@@ -86,16 +180,14 @@ async def get_rfq(rfq_id: str) -> Optional[Dict[str, Any]]:
 
 async def update_rfq_status(rfq_id: str, status) -> bool:
     """Update the status of an RFQ."""
-    global _db
-    
-    if _db is None:
+    if await ensure_firebase() is None:
         # Mock mode
         print(f"[MOCK] Updating RFQ {rfq_id} status to {status}")
         return True
     
     try:
         doc_ref = _db.collection('rfq_sessions').document(rfq_id)
-        doc_ref.update({
+        await _call(doc_ref.update, {
             'status': status.value,
             'updated_at': datetime.now(),
         })
@@ -105,13 +197,48 @@ async def update_rfq_status(rfq_id: str, status) -> bool:
         return False
 
 
+async def update_rfq_pipeline(rfq_id: str, pipeline: Dict[str, Any]) -> bool:
+    """Record submit-pipeline stage timings and failures on an RFQ."""
+    if await ensure_firebase() is None:
+        # Mock mode
+        print(f"[MOCK] RFQ {rfq_id} pipeline: {pipeline}")
+        return True
+    
+    try:
+        doc_ref = _db.collection('rfq_sessions').document(rfq_id)
+        await _call(doc_ref.update, {
+            'pipeline': pipeline,
+            'updated_at': datetime.now(),
+        })
+        return True
+    except Exception as e:
+        print(f"Error recording RFQ pipeline: {e}")
+        return False
+
+
 async def get_suppliers(capabilities: list = None) -> list:
-    """Get suppliers, optionally filtered by capabilities."""
-    global _db
+    """
+    Get suppliers, optionally filtered by capabilities.
     
-    if _db is None:
+    With capabilities, the filter runs in Firestore (array-contains-any,
+    chunked to the query limit) and only scoring fields are returned.
+    The filter is case-sensitive: requested capabilities are lowercased, so
+    stored ones must be lowercase too (the Supplier model lowercases them).
+    Returns [] if the read fails.
+    """
+    try:
+        return await load_suppliers(capabilities)
+    except Exception as e:
+        print(f"Error getting suppliers: {e}")
+        return []
+
+
+async def load_suppliers(capabilities: list = None) -> list:
+    """Same as get_suppliers, but a failed read raises instead of looking like an empty collection."""
+    capabilities = [cap.lower() for cap in capabilities or ()]
+    if await ensure_firebase() is None:
         # Mock mode - return sample suppliers
-        return [
+        suppliers = [
             {
                 'id': 'sup_001',
                 'name': 'Supplier A',
@@ -131,38 +258,225 @@ async def get_suppliers(capabilities: list = None) -> list:
                 'price_tier': 'budget',
             },
         ]
-    
-    try:
-        query = _db.collection('suppliers').where('active', '==', True)
-        docs = query.stream()
-        suppliers = [doc.to_dict() for doc in docs]
-        
         if capabilities:
-            # Filter by capabilities
             suppliers = [
-                s for s in suppliers 
+                s for s in suppliers
                 if any(cap in s.get('capabilities', []) for cap in capabilities)
             ]
-        
         return suppliers
+    
+    # The stream itself has FIRESTORE_TIMEOUT; wait a little longer for it
+    limit = FIRESTORE_TIMEOUT + RPC_TIMEOUT_MARGIN
+    if not capabilities:
+        query = build_query(_db, ACTIVE_SUPPLIERS, [True])
+        return await _run(_stream_query, query, timeout=limit)
+    
+    # One query per chunk of capabilities, run concurrently
+    chunks = chunk_values(capabilities)
+    results = await asyncio.gather(*[
+        _run(_stream_query, build_query(_db, SUPPLIERS_BY_CAPABILITY, [True, chunk]), timeout=limit)
+        for chunk in chunks
+    ])
+    
+    # A supplier can match several chunks; keep the first copy
+    suppliers = {}
+    for chunk_suppliers in results:
+        for supplier in chunk_suppliers:
+            suppliers.setdefault(supplier['id'], supplier)
+    return list(suppliers.values())
+
+
+async def get_supplier(supplier_id: str) -> Optional[Dict[str, Any]]:
+    """Get one supplier document (None if missing or the read fails)."""
+    if await ensure_firebase() is None:
+        # Mock mode - look it up among the sample suppliers
+        return next((s for s in await load_suppliers() if s['id'] == supplier_id), None)
+
+    try:
+        doc = await _call(_db.collection('suppliers').document(supplier_id).get)
+        if doc.exists:
+            return {**doc.to_dict(), 'id': doc.id}
+        return None
     except Exception as e:
-        print(f"Error getting suppliers: {e}")
-        return []
+        print(f"Error getting supplier {supplier_id}: {e}")
+        return None
+
+
+def _stream_query(query) -> list:
+    """Materialize a query's documents (runs on the Firestore pool)."""
+    documents = []
+    for doc in query.stream(timeout=FIRESTORE_TIMEOUT):
+        data = doc.to_dict()
+        data.setdefault('id', doc.id)
+        documents.append(data)
+    return documents
 
 
 async def save_supplier_quote(quote_data: dict) -> str:
     """Save a supplier quote."""
-    global _db
-    
-    if _db is None:
+    if await ensure_firebase() is None:
         print(f"[MOCK] Saving quote: {quote_data}")
         return "quote_mock_id"
     
     try:
-        doc_ref = _db.collection('quotes').add(quote_data)
+        doc_ref = await _call(_db.collection('quotes').add, quote_data)
         return doc_ref[1].id
     except Exception as e:
         print(f"Error saving quote: {e}")
         return ""
 
 
+async def open_bulk_writer(
+    initial_ops_per_second: int,
+    max_ops_per_second: int,
+    on_written: Callable[[str], None],
+    on_failed: Callable[[str, int, str, int], bool],
+):
+    """
+    Open a Firestore BulkWriter for a large import (None in mock mode).
+
+    Writes go out 20 per commit, batches in parallel, throttled from
+    `initial_ops_per_second` up by 50% every 5 minutes to `max_ops_per_second`.
+    `on_written(doc_id)` is called for each committed document and
+    `on_failed(doc_id, code, message, attempts)` for each failed attempt,
+    returning whether to retry it. Both run on the writer's threads.
+    """
+    if await ensure_firebase() is None:
+        return None
+
+    from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions
+
+    writer = _db.bulk_writer(options=BulkWriterOptions(
+        initial_ops_per_second=initial_ops_per_second,
+        max_ops_per_second=max_ops_per_second,
+    ))
+    writer.on_write_result(lambda reference, result, _writer: on_written(reference.id))
+    writer.on_write_error(lambda failure, _writer: on_failed(
+        failure.operation.reference.id, failure.code, failure.message, failure.attempts,
+    ))
+    return writer
+
+
+def _bulk_set(writer, collection: str, documents: list):
+    """Queue set() writes (blocks while the writer's rate limit is saturated)."""
+    col = _db.collection(collection)
+    for doc_id, data in documents:
+        writer.set(col.document(doc_id), data)
+
+
+async def bulk_set(writer, collection: str, documents: list, timeout: Optional[float] = None):
+    """Queue `(doc_id, data)` upserts on a BulkWriter from open_bulk_writer."""
+    await _run(_bulk_set, writer, collection, documents, timeout=timeout)
+
+
+def _close_bulk_writer(writer):
+    # close() refuses new operations before flushing, and retries are re-queued as
+    # new operations; flush first so pending retries can still go out
+    writer.flush()
+    writer.close()
+
+
+async def close_bulk_writer(writer, timeout: Optional[float] = None):
+    """Wait until every queued write, including retries, has succeeded or failed."""
+    await _run(_close_bulk_writer, writer, timeout=timeout)
+
+
+async def probe_firestore() -> str:
+    """Health probe: one document read ("mock" when Firestore is not configured)."""
+    if await ensure_firebase() is None:
+        return "mock"
+    await _call(_db.collection('_health').document('probe').get)
+    return "ok"
+
+
+async def probe_storage() -> str:
+    """Health probe: bucket metadata ("mock" when Storage is not configured)."""
+    await ensure_firebase()
+    if _storage is None:
+        return "mock"
+    if not await _call(_storage.exists):
+        raise RuntimeError("Storage bucket does not exist")
+    return "ok"
+
+
+def has_storage() -> bool:
+    """
+    True when a Cloud Storage bucket is configured (otherwise files stay
+    local). Only meaningful once `ensure_firebase` has run.
+    """
+    return _storage is not None
+
+
+async def storage_blob_exists(name: str) -> bool:
+    """Check whether an object exists in the Storage bucket."""
+    blob = _storage.blob(name)
+    return await _call(blob.exists)
+
+
+async def upload_storage_blob(
+    name: str,
+    path: str,
+    content_type: Optional[str] = None,
+    metadata: Optional[Dict[str, str]] = None,
+    chunk_size: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> bool:
+    """
+    Upload a local file to the Storage bucket without reading it into memory.
+    
+    With `chunk_size` set (a multiple of 256 KB) the client uses a resumable
+    upload and sends the file chunk by chunk. The object is only created if
+    it does not exist yet; returns False when it already did. `timeout`
+    (default STORAGE_TRANSFER_TIMEOUT) applies to each request the client makes.
+    """
+    from google.api_core.exceptions import PreconditionFailed
+    
+    timeout = timeout or STORAGE_TRANSFER_TIMEOUT
+    blob = _storage.blob(name, chunk_size=chunk_size)
+    if metadata:
+        blob.metadata = metadata
+    upload = functools.partial(
+        blob.upload_from_filename,
+        path,
+        content_type=content_type,
+        if_generation_match=0,
+        timeout=timeout,
+    )
+    try:
+        await _run(upload, timeout=timeout + TIMEOUT_MARGIN)
+        return True
+    except PreconditionFailed:
+        return False
+
+
+async def download_storage_blob(name: str, path: str, timeout: Optional[float] = None) -> bool:
+    """Download an object from the Storage bucket to a local file (streamed to disk)."""
+    from google.api_core.exceptions import NotFound
+    
+    timeout = timeout or STORAGE_TRANSFER_TIMEOUT
+    blob = _storage.blob(name)
+    download = functools.partial(blob.download_to_filename, path, timeout=timeout)
+    try:
+        await _run(download, timeout=timeout + TIMEOUT_MARGIN)
+        return True
+    except NotFound:
+        return False
+
+
+async def update_rfq_design_analysis(rfq_id: str, analysis: Dict[str, Any]) -> bool:
+    """Attach design file analysis results to an RFQ."""
+    if await ensure_firebase() is None:
+        # Mock mode
+        print(f"[MOCK] RFQ {rfq_id} design analysis: {list(analysis)}")
+        return True
+    
+    try:
+        doc_ref = _db.collection('rfq_sessions').document(rfq_id)
+        await _call(doc_ref.update, {
+            'design_analysis': analysis,
+            'updated_at': datetime.now(),
+        })
+        return True
+    except Exception as e:
+        print(f"Error recording design analysis: {e}")
+        return False
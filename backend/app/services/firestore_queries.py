@@ -0,0 +1,104 @@
+"""Firestore Queries - Declarative query definitions and their composite indexes.
+
+Every Firestore query the backend runs is declared here once. The services
+build their queries from these definitions, and
+`scripts/generate_firestore_indexes.py` derives the composite indexes in
+`firestore.indexes.json` from the same list, so the two cannot drift.
+"""
+from typing import NamedTuple, Optional, Tuple, List, Dict, Any, Sequence
+
+# Firestore caps the number of values in one array-contains-any / in filter
+ARRAY_CONTAINS_ANY_LIMIT = 30
+
+# Fields needed to score and contact a supplier
+SUPPLIER_SCORING_FIELDS = (
+    'id',
+    'name',
+    'email',
+    'capabilities',
+    'certifications',
+    'avg_lead_time',
+    'price_tier',
+    'reliability_score',
+)
+
+_ARRAY_OPERATORS = ('array_contains', 'array_contains_any')
+
+
+class QueryDefinition(NamedTuple):
+    """A Firestore query shape: filters (field, operator), ordering and projection."""
+    collection: str
+    filters: Tuple[Tuple[str, str], ...]
+    order_by: Tuple[Tuple[str, str], ...] = ()
+    fields: Tuple[str, ...] = ()
+
+
+ACTIVE_SUPPLIERS = QueryDefinition(
+    collection='suppliers',
+    filters=(('active', '=='),),
+)
+
+SUPPLIERS_BY_CAPABILITY = QueryDefinition(
+    collection='suppliers',
+    filters=(('active', '=='), ('capabilities', 'array_contains_any')),
+    fields=SUPPLIER_SCORING_FIELDS,
+)
+
+QUERIES: List[QueryDefinition] = [
+    ACTIVE_SUPPLIERS,
+    SUPPLIERS_BY_CAPABILITY,
+]
+
+
+def build_query(db, definition: QueryDefinition, values: Sequence[Any]):
+    """Build a Firestore query from a definition and one value per filter."""
+    query = db.collection(definition.collection)
+    for (field, op), value in zip(definition.filters, values):
+        query = query.where(field, op, value)
+    for field, direction in definition.order_by:
+        query = query.order_by(field, direction=direction)
+    if definition.fields:
+        query = query.select(list(definition.fields))
+    return query
+
+
+def chunk_values(values: Sequence[Any], size: int = ARRAY_CONTAINS_ANY_LIMIT) -> List[List[Any]]:
+    """Split filter values into chunks that respect Firestore's disjunction limit."""
+    unique = list(dict.fromkeys(values))
+    return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+
+def composite_index(definition: QueryDefinition) -> Optional[Dict[str, Any]]:
+    """
+    The composite index a query needs, or None if single-field indexes suffice.
+
+    Equality filters come first, then the array filter, then ordering, which
+    is the field order Firestore expects.
+    """
+    equality = [(f, op) for f, op in definition.filters if op == '==']
+    array = [(f, op) for f, op in definition.filters if op in _ARRAY_OPERATORS]
+    ranges = [(f, op) for f, op in definition.filters if (f, op) not in equality + array]
+
+    fields = [{'fieldPath': f, 'order': 'ASCENDING'} for f, _ in equality]
+    fields += [{'fieldPath': f, 'arrayConfig': 'CONTAINS'} for f, _ in array]
+    fields += [{'fieldPath': f, 'order': 'ASCENDING'} for f, _ in ranges]
+    fields += [{'fieldPath': f, 'order': direction} for f, direction in definition.order_by]
+
+    if len(fields) < 2:
+        return None
+
+    return {
+        'collectionGroup': definition.collection,
+        'queryScope': 'COLLECTION',
+        'fields': fields,
+    }
+
+
+def composite_indexes(queries: Sequence[QueryDefinition] = QUERIES) -> List[Dict[str, Any]]:
+    """All composite indexes needed by the declared queries, deduplicated."""
+    indexes = []
+    for definition in queries:
+        index = composite_index(definition)
+        if index is not None and index not in indexes:
+            indexes.append(index)
+    return indexes
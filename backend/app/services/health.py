@@ -0,0 +1,117 @@
+"""Health - Cached dependency state for /health.
+
+Dependencies are checked two ways and /health only ever reads the cache:
+
+- Active probes, run every HEALTH_PROBE_INTERVAL seconds in the background
+  (Firestore: a single document read).
+- Passive reports from real traffic (`report`), for dependencies that cannot
+  be probed for free: LLM providers (a probe would be a billed completion)
+  and SendGrid.
+
+A dependency is "ok", "error" (last check/call failed), "mock" (not
+configured; the service runs without it) or "unknown" (no traffic yet).
+"""
+import os
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "30"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))
+
+_state: Dict[str, Dict[str, Any]] = {}
+_probes: Dict[str, Callable[[], Awaitable[str]]] = {}
+_probe_task: Optional[asyncio.Task] = None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def report(dependency: str, ok: bool, error: Optional[str] = None, **details):
+    """Record the outcome of a real call to a dependency."""
+    entry = _state.setdefault(dependency, {"consecutive_failures": 0})
+    entry.update(details)
+    entry["checked_at"] = _now()
+    if ok:
+        entry["status"] = "ok"
+        entry["consecutive_failures"] = 0
+        entry.pop("error", None)
+    else:
+        entry["status"] = "error"
+        entry["consecutive_failures"] = entry.get("consecutive_failures", 0) + 1
+        entry["error"] = (error or "failed")[:300]
+
+
+def set_status(dependency: str, status: str, **details):
+    """Set a dependency's state directly (e.g. "mock" when it is not configured)."""
+    _state[dependency] = {"status": status, "checked_at": _now(), "consecutive_failures": 0, **details}
+
+
+def register_probe(dependency: str, probe: Callable[[], Awaitable[str]]):
+    """
+    Add an active probe. It returns a status ("ok", "mock") or raises; it is
+    run with HEALTH_PROBE_TIMEOUT.
+    """
+    _probes[dependency] = probe
+
+
+async def run_probes():
+    """Run every probe once, concurrently."""
+    async def run(dependency: str, probe: Callable[[], Awaitable[str]]):
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(probe(), HEALTH_PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            report(dependency, False, f"probe timed out after {HEALTH_PROBE_TIMEOUT:.0f}s")
+            return
+        except Exception as e:
+            report(dependency, False, str(e) or type(e).__name__)
+            return
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        if status == "ok":
+            report(dependency, True, latency_ms=latency_ms)
+        else:
+            set_status(dependency, status)
+
+    await asyncio.gather(*(run(name, probe) for name, probe in _probes.items()))
+
+
+async def _probe_loop():
+    while True:
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL)
+        await run_probes()
+
+
+async def start_health_probes():
+    """Probe once now (so /health is meaningful from the start), then periodically."""
+    global _probe_task
+
+    await run_probes()
+    if HEALTH_PROBE_INTERVAL > 0:
+        _probe_task = asyncio.create_task(_probe_loop())
+
+
+async def stop_health_probes():
+    global _probe_task
+
+    if _probe_task is not None:
+        _probe_task.cancel()
+        try:
+            await _probe_task
+        except asyncio.CancelledError:
+            pass
+        _probe_task = None
+
+
+def get_dependency_health() -> Dict[str, Dict[str, Any]]:
+    """Cached state of every known dependency."""
+    return {name: dict(entry) for name, entry in _state.items()}
+
+
+def overall_status() -> str:
+    """"healthy" unless a dependency's last check failed ("degraded")."""
+    if any(entry.get("status") == "error" for entry in _state.values()):
+        return "degraded"
+    return "healthy"
@@ -0,0 +1,185 @@
+"""HTTP Cache - Precomputed, validated responses for read-only endpoints.
+
+A cached entry holds the serialized JSON body plus its gzip and brotli
+encodings and a strong ETag, all computed once per data version. Requests
+are answered from the entry: `If-None-Match` gets a bodyless 304, other
+requests get the best encoding the client accepts, with `Cache-Control`
+and `Vary` headers a CDN can honor. Entries are rebuilt only when the
+version passed by the endpoint changes (e.g. the catalog snapshot version).
+
+Compression runs on the event loop when an entry is built, so per-query
+keys (every new search is a miss) use cheap levels; only `static` entries,
+a handful built once per data version, get the slow maximum levels.
+"""
+import os
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "60"))
+HTTP_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", "600"))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "2048"))
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+# (gzip level, brotli quality) for per-query entries and for static ones
+FAST_COMPRESSION = (6, 5)
+BEST_COMPRESSION = (9, 11)
+
+
+class CachedBody:
+    """One serialized response and its precompressed variants."""
+
+    def __init__(self, version: Any, data: Any, static: bool = False):
+        self.version = version
+        self.identity = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        digest = hashlib.sha256(self.identity).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+
+        # Each content-coding is a different representation, so it gets its own strong ETag
+        self.encodings: Dict[str, Tuple[bytes, str]] = {}
+        if len(self.identity) >= MIN_COMPRESS_BYTES:
+            gzip_level, brotli_quality = BEST_COMPRESSION if static else FAST_COMPRESSION
+            self.encodings["gzip"] = (gzip.compress(self.identity, compresslevel=gzip_level, mtime=0), f'"{digest}-gz"')
+            if brotli is not None:
+                self.encodings["br"] = (brotli.compress(self.identity, quality=brotli_quality), f'"{digest}-br"')
+
+    def matches(self, if_none_match: str) -> bool:
+        """True if any entity tag in an If-None-Match header names this body."""
+        if if_none_match.strip() == "*":
+            return True
+        base = self.etag[1:-1]
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            tag = tag.strip('"')
+            if tag == base or tag.startswith(base + "-"):
+                return True
+        return False
+
+    def select(self, accept_encoding: str) -> Tuple[bytes, str, Optional[str]]:
+        """(body, etag, content-encoding) for the client's Accept-Encoding."""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and accepted.get(encoding, 0) > 0:
+                body, etag = self.encodings[encoding]
+                return body, etag, encoding
+        return self.identity, self.etag, None
+
+
+def data_version(data: Any) -> str:
+    """A version for in-code data: a hash of its JSON, so any edit invalidates cached responses."""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if "*" in accepted:
+        for name in ("br", "gzip"):
+            accepted.setdefault(name, accepted["*"])
+    return accepted
+
+
+class HttpCache:
+    """LRU of CachedBody entries by key (endpoint + parameters)."""
+
+    def __init__(self, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Any, CachedBody]" = OrderedDict()
+        self.hits = 0
+        self.builds = 0
+        self.not_modified = 0
+
+    def get(self, key: Any, version: Any, build: Callable[[], Any], static: bool = False) -> CachedBody:
+        """The entry for `key` at `version`, building it (outside the lock) if needed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = CachedBody(version, build(), static)
+        with self._lock:
+            self.builds += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "builds": self.builds,
+            "not_modified": self.not_modified,
+        }
+
+
+_cache = HttpCache()
+
+
+def cached_json_response(
+    request: Request,
+    key: Any,
+    version: Any,
+    build: Callable[[], Any],
+    max_age: int = HTTP_CACHE_MAX_AGE,
+    static: bool = False,
+) -> Response:
+    """
+    Serve `build()` as JSON through the cache.
+
+    `key` identifies the resource (include every parameter that changes the
+    body); `version` must change whenever the underlying data does. Set
+    `static` for a fixed, small set of keys worth compressing at the
+    highest levels.
+    """
+    entry = _cache.get(key, version, build, static)
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={HTTP_CACHE_STALE_WHILE_REVALIDATE}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entry.matches(if_none_match):
+        _cache.not_modified += 1
+        _, etag, _ = entry.select(request.headers.get("accept-encoding", ""))
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+
+    body, etag, encoding = entry.select(request.headers.get("accept-encoding", ""))
+    headers["ETag"] = etag
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def get_http_cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
@@ -1,7 +1,25 @@
 """LLM Service - Handles AI chat responses using OpenAI or Anthropic."""
 import os
-from typing import List, Optional, Dict, Any
+import re
+import json
+import time
+import hashlib
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
+
+import anyio
+
 from app.models.chat import ChatResponse, ChatResponseType, Message
+from app.services.llm_clients import OPENAI, ANTHROPIC, ensure_llm_clients, get_llm_client, get_active_provider
+from app.services.response_cache import cache_get, cache_set
+from app.services.admission import admit
+from app.services.metrics import observe_stage, span
+from app.services.health import report
+from app.services.conversation import (
+    LLM_INPUT_TOKEN_BUDGET,
+    LLM_SUMMARY_MAX_TOKENS,
+    count_tokens,
+    fit_conversation,
+)
 
 # System prompt for the material assistant
 SYSTEM_PROMPT = """You are the Bimo Tech Material Assistant, an expert in advanced materials and refractory metals.
@@ -29,125 +47,375 @@ Always be helpful and professional. If a customer seems ready to order, suggest
 
 Keep responses concise but informative."""
 
+SUMMARY_PROMPT = """Summarize this conversation between a customer and the Bimo Tech Material Assistant for the assistant's own reference.
+Keep the materials, grades, forms, dimensions, quantities, applications and any RFQ decisions. Be brief and factual."""
+
+
+OPENAI_MODEL = "gpt-4-turbo-preview"
+ANTHROPIC_MODEL = "claude-3-sonnet-20240229"
+MAX_TOKENS = 500
+# Admission client that background conversation summaries queue as
+SUMMARY_CLIENT = "conversation-summaries"
+
+# Trailing messages that make up the response cache key
+LLM_CACHE_WINDOW = int(os.getenv("LLM_CACHE_WINDOW", "4"))
+
+
+def _normalize(text: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", text).strip().lower().rstrip("?!. ")
+
+
+def response_cache_key(
+    provider: str,
+    messages: List[Message],
+    material_context: Optional[Dict[str, Any]]
+) -> str:
+    """Hash of model, system prompt, material context and the trailing conversation window."""
+    model = OPENAI_MODEL if provider == OPENAI else ANTHROPIC_MODEL
+    window = messages[-LLM_CACHE_WINDOW:] if LLM_CACHE_WINDOW > 0 else messages
+    key = json.dumps({
+        "model": model,
+        "system": SYSTEM_PROMPT,
+        "material": material_context,
+        "messages": [[msg.role.value, _normalize(msg.content)] for msg in window],
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
 
 async def get_chat_response(
     messages: List[Message],
     context: Optional[Dict[str, Any]] = None,
-    material_context: Optional[Dict[str, Any]] = None
+    material_context: Optional[Dict[str, Any]] = None,
+    client_id: Optional[str] = None
 ) -> ChatResponse:
-    """Generate a chat response using the LLM."""
+    """
+    Generate a chat response using the LLM (served from cache when possible).
+    
+    Provider calls go through admission control; when it sheds the request
+    the keyword fallback answers instead.
+    """
     
     # Try OpenAI first, then Anthropic, then fallback
-    openai_key = os.getenv("OPENAI_API_KEY")
-    anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-    
-    if openai_key:
-        return await _get_openai_response(messages, context, material_context)
-    elif anthropic_key:
-        return await _get_anthropic_response(messages, context, material_context)
-    else:
+    await ensure_llm_clients()
+    provider = get_active_provider()
+    if provider is None:
+        return _get_fallback_response(messages, material_context)
+    
+    cache_key = response_cache_key(provider, messages, material_context)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return ChatResponse.model_validate_json(cached)
+    
+    async with admit(client_id) as admitted:
+        if not admitted:
+            return _get_fallback_response(messages, material_context)
+        if provider == OPENAI:
+            response = await _get_openai_response(messages, context, material_context)
+        else:
+            response = await _get_anthropic_response(messages, context, material_context)
+    
+    # Provider failed: answer with the keyword fallback, which is never cached
+    if response is None:
         return _get_fallback_response(messages, material_context)
+    
+    await cache_set(cache_key, response.model_dump_json())
+    return response
+
+
+async def stream_chat_response(
+    messages: List[Message],
+    context: Optional[Dict[str, Any]] = None,
+    material_context: Optional[Dict[str, Any]] = None,
+    client_id: Optional[str] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream a chat response as ("token", text) events, then one ("done", ChatResponse).
+    
+    Closing or cancelling the generator (e.g. when the client disconnects)
+    closes the upstream provider stream, so generation stops being billed.
+    The admission slot is held for the whole stream; a shed request streams
+    the keyword fallback.
+    """
+    await ensure_llm_clients()
+    provider = get_active_provider()
+    
+    cache_key = None
+    if provider is not None:
+        cache_key = response_cache_key(provider, messages, material_context)
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            response = ChatResponse.model_validate_json(cached)
+            yield "token", response.response
+            yield "done", response
+            return
+    
+    parts = []
+    streamed_completely = False
+    if provider is not None:
+        async with admit(client_id) as admitted:
+            tokens = None
+            if admitted and provider == OPENAI:
+                tokens = _stream_openai(messages, material_context)
+            elif admitted:
+                tokens = _stream_anthropic(messages, material_context)
+            
+            if tokens is not None:
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    async for text in tokens:
+                        if not parts:
+                            observe_stage("llm.first_token", time.perf_counter() - start, provider)
+                        parts.append(text)
+                        yield "token", text
+                    streamed_completely = True
+                    outcome = "ok"
+                    report("llm", True, provider=provider)
+                except Exception as e:
+                    print(f"{provider} streaming error: {e}")
+                    report("llm", False, str(e), provider=provider)
+                finally:
+                    with anyio.CancelScope(shield=True):
+                        await tokens.aclose()
+                    observe_stage("llm.stream", time.perf_counter() - start, provider, outcome)
+    
+    # Nothing streamed (no provider, shed, or it failed up front): keyword fallback
+    if not parts:
+        fallback = _get_fallback_response(messages, material_context)
+        yield "token", fallback.response
+        yield "done", fallback
+        return
+    
+    response = ChatResponse(
+        response="".join(parts),
+        type=_response_type(material_context),
+        data=material_context,
+    )
+    if streamed_completely:
+        await cache_set(cache_key, response.model_dump_json())
+    yield "done", response
+
+
+async def _summarize(previous: Optional[str], messages: List[Message]) -> str:
+    """Fold older turns into the running conversation summary."""
+    transcript = "\n".join(f"{msg.role.value}: {msg.content}" for msg in messages)
+    if previous:
+        transcript = f"Summary so far:\n{previous}\n\nNew turns:\n{transcript}"
+    
+    # Summaries take a provider slot like chats do, queued as one shared client so they
+    # cannot crowd out requests; a shed summary is retried on the next turn
+    async with admit(SUMMARY_CLIENT) as admitted:
+        if not admitted:
+            raise RuntimeError("summary shed by admission control")
+        return await _call_summary_provider(transcript)
+
+
+async def _call_summary_provider(transcript: str) -> str:
+    provider = get_active_provider()
+    if provider == OPENAI:
+        with span("llm.summary", OPENAI):
+            response = await get_llm_client(OPENAI).chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[{"role": "system", "content": SUMMARY_PROMPT}, {"role": "user", "content": transcript}],
+                temperature=0,
+                max_tokens=LLM_SUMMARY_MAX_TOKENS,
+            )
+        return response.choices[0].message.content
+    if provider == ANTHROPIC:
+        with span("llm.summary", ANTHROPIC):
+            response = await get_llm_client(ANTHROPIC).messages.create(
+                model=ANTHROPIC_MODEL,
+                max_tokens=LLM_SUMMARY_MAX_TOKENS,
+                system=SUMMARY_PROMPT,
+                messages=[{"role": "user", "content": transcript}],
+            )
+        return response.content[0].text
+    raise RuntimeError("No LLM provider configured")
+
+
+def _fit_to_budget(
+    messages: List[Message],
+    material_context: Optional[Dict[str, Any]]
+) -> Tuple[Optional[str], List[Message]]:
+    """Recent turns verbatim plus a summary of older ones, within LLM_INPUT_TOKEN_BUDGET."""
+    reserved = count_tokens(SYSTEM_PROMPT) + MAX_TOKENS
+    if material_context:
+        reserved += count_tokens(str(material_context))
+    summarize = _summarize if get_active_provider() is not None else None
+    return fit_conversation(messages, max(LLM_INPUT_TOKEN_BUDGET - reserved, 0), summarize)
+
+
+def _build_openai_messages(
+    messages: List[Message],
+    material_context: Optional[Dict[str, Any]]
+) -> List[Dict[str, str]]:
+    """Build the OpenAI message list: system prompt, material context, summary, recent history."""
+    summary, messages = _fit_to_budget(messages, material_context)
+    openai_messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    
+    # Add material context if available
+    if material_context:
+        openai_messages.append({
+            "role": "system",
+            "content": f"Relevant material information: {material_context}"
+        })
+    
+    if summary:
+        openai_messages.append({
+            "role": "system",
+            "content": f"Summary of the earlier conversation: {summary}"
+        })
+    
+    # Add conversation history
+    for msg in messages:
+        openai_messages.append({
+            "role": msg.role.value,
+            "content": msg.content
+        })
+    
+    return openai_messages
+
+
+def _build_anthropic_request(
+    messages: List[Message],
+    material_context: Optional[Dict[str, Any]]
+) -> Tuple[str, List[Dict[str, str]]]:
+    """Build the Anthropic system prompt and message list."""
+    summary, messages = _fit_to_budget(messages, material_context)
+    system = SYSTEM_PROMPT
+    if material_context:
+        system += f"\n\nRelevant material information: {material_context}"
+    if summary:
+        system += f"\n\nSummary of the earlier conversation: {summary}"
+    
+    # Convert messages
+    anthropic_messages = []
+    for msg in messages:
+        anthropic_messages.append({
+            "role": msg.role.value if msg.role.value != "system" else "user",
+            "content": msg.content
+        })
+    
+    return system, anthropic_messages
+
+
+def _response_type(material_context: Optional[Dict[str, Any]]) -> ChatResponseType:
+    """Determine response type based on content."""
+    if material_context:
+        return ChatResponseType.PRODUCT_SUGGESTION
+    return ChatResponseType.TEXT
 
 
 async def _get_openai_response(
     messages: List[Message],
     context: Optional[Dict[str, Any]],
     material_context: Optional[Dict[str, Any]]
-) -> ChatResponse:
-    """Get response from OpenAI."""
+) -> Optional[ChatResponse]:
+    """Get response from OpenAI (None on error)."""
     try:
-        from openai import AsyncOpenAI
+        client = get_llm_client(OPENAI)
         
-        client = AsyncOpenAI()
-        
-        # Build messages for OpenAI
-        openai_messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        
-        # Add material context if available
-        if material_context:
-            openai_messages.append({
-                "role": "system",
-                "content": f"Relevant material information: {material_context}"
-            })
-        
-        # Add conversation history
-        for msg in messages:
-            openai_messages.append({
-                "role": msg.role.value,
-                "content": msg.content
-            })
-        
-        response = await client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=openai_messages,
-            temperature=0.7,
-            max_tokens=500,
-        )
+        openai_messages = _build_openai_messages(messages, material_context)
+        with span("llm.complete", OPENAI):
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=openai_messages,
+                temperature=0.7,
+                max_tokens=MAX_TOKENS,
+            )
+        report("llm", True, provider=OPENAI)
         
         content = response.choices[0].message.content
         
-        # Determine response type based on content
-        response_type = ChatResponseType.TEXT
-        if material_context:
-            response_type = ChatResponseType.PRODUCT_SUGGESTION
-        
         return ChatResponse(
             response=content,
-            type=response_type,
+            type=_response_type(material_context),
             data=material_context,
         )
         
     except Exception as e:
         print(f"OpenAI error: {e}")
-        return _get_fallback_response(messages, material_context)
+        report("llm", False, str(e), provider=OPENAI)
+        return None
+
+
+async def _stream_openai(
+    messages: List[Message],
+    material_context: Optional[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """Yield OpenAI completion tokens as they arrive."""
+    client = get_llm_client(OPENAI)
+    stream = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=_build_openai_messages(messages, material_context),
+        temperature=0.7,
+        max_tokens=MAX_TOKENS,
+        stream=True,
+    )
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        with anyio.CancelScope(shield=True):
+            await stream.close()
 
 
 async def _get_anthropic_response(
     messages: List[Message],
     context: Optional[Dict[str, Any]],
     material_context: Optional[Dict[str, Any]]
-) -> ChatResponse:
-    """Get response from Anthropic Claude."""
+) -> Optional[ChatResponse]:
+    """Get response from Anthropic Claude (None on error)."""
     try:
-        from anthropic import AsyncAnthropic
-        
-        client = AsyncAnthropic()
-        
-        # Build prompt
-        system = SYSTEM_PROMPT
-        if material_context:
-            system += f"\n\nRelevant material information: {material_context}"
+        client = get_llm_client(ANTHROPIC)
+        system, anthropic_messages = _build_anthropic_request(messages, material_context)
         
-        # Convert messages
-        anthropic_messages = []
-        for msg in messages:
-            anthropic_messages.append({
-                "role": msg.role.value if msg.role.value != "system" else "user",
-                "content": msg.content
-            })
-        
-        response = await client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=500,
-            system=system,
-            messages=anthropic_messages,
-        )
+        with span("llm.complete", ANTHROPIC):
+            response = await client.messages.create(
+                model=ANTHROPIC_MODEL,
+                max_tokens=MAX_TOKENS,
+                system=system,
+                messages=anthropic_messages,
+            )
+        report("llm", True, provider=ANTHROPIC)
         
         content = response.content[0].text
         
-        response_type = ChatResponseType.TEXT
-        if material_context:
-            response_type = ChatResponseType.PRODUCT_SUGGESTION
-        
         return ChatResponse(
             response=content,
-            type=response_type,
+            type=_response_type(material_context),
             data=material_context,
         )
         
     except Exception as e:
         print(f"Anthropic error: {e}")
-        return _get_fallback_response(messages, material_context)
+        report("llm", False, str(e), provider=ANTHROPIC)
+        return None
+
+
+async def _stream_anthropic(
+    messages: List[Message],
+    material_context: Optional[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """Yield Anthropic text deltas as they arrive."""
+    client = get_llm_client(ANTHROPIC)
+    system, anthropic_messages = _build_anthropic_request(messages, material_context)
+    stream = await client.messages.create(
+        model=ANTHROPIC_MODEL,
+        max_tokens=MAX_TOKENS,
+        system=system,
+        messages=anthropic_messages,
+        stream=True,
+    )
+    try:
+        async for event in stream:
+            if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                yield event.delta.text
+    finally:
+        with anyio.CancelScope(shield=True):
+            await stream.close()
 
 
 def _get_fallback_response(
@@ -0,0 +1,148 @@
+"""LLM Clients - Shared provider clients with pooled, instrumented connections.
+
+Provider clients are created once on top of a tuned keep-alive httpx pool
+and closed on shutdown. Importing the provider SDKs takes about a second, so
+the clients are created in the startup warm-up, off the event loop
+(`ensure_llm_clients`), rather than before the server starts listening.
+Each pool counts requests and newly opened connections, so connection
+reuse can be observed on /health.
+"""
+import os
+import asyncio
+import threading
+from typing import Optional, Dict, Any
+
+import httpx
+
+from app.services.health import set_status
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+OPENAI = "openai"
+ANTHROPIC = "anthropic"
+
+
+class ConnectionStats:
+    """Request and connection counters for one HTTP pool."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def on_request(self, request: httpx.Request):
+        # httpcore reports connection lifecycle events through the trace extension
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else None,
+        }
+
+
+_clients: Dict[str, Any] = {}
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+_stats: Dict[str, ConnectionStats] = {}
+_initialized = False
+_init_lock = threading.Lock()
+_init_task: Optional[asyncio.Future] = None
+
+
+def _http_client(provider: str) -> httpx.AsyncClient:
+    stats = _stats.setdefault(provider, ConnectionStats())
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        event_hooks={"request": [stats.on_request]},
+    )
+    _http_clients[provider] = client
+    return client
+
+
+def initialize_llm_clients():
+    """Create a client for every provider with an API key configured."""
+    global _initialized
+
+    with _init_lock:
+        if _initialized:
+            return
+
+        openai_key = os.getenv("OPENAI_API_KEY")
+        anthropic_key = os.getenv("ANTHROPIC_API_KEY")
+
+        try:
+            if openai_key and OPENAI not in _clients:
+                from openai import AsyncOpenAI
+                _clients[OPENAI] = AsyncOpenAI(api_key=openai_key, http_client=_http_client(OPENAI))
+
+            if anthropic_key and ANTHROPIC not in _clients:
+                from anthropic import AsyncAnthropic
+                _clients[ANTHROPIC] = AsyncAnthropic(api_key=anthropic_key, http_client=_http_client(ANTHROPIC))
+        except Exception as e:
+            print(f"LLM client initialization error: {e}")
+
+        _initialized = True
+    provider = get_active_provider()
+    set_status("llm", "unknown" if provider else "mock", provider=provider)
+
+
+async def ensure_llm_clients():
+    """
+    Create the clients off the event loop if that has not happened yet.
+    Concurrent callers (and the startup warm-up) share one initialization.
+    """
+    global _init_task
+
+    if _initialized:
+        return
+    if _init_task is None or (_init_task.done() and not _initialized):
+        _init_task = asyncio.ensure_future(asyncio.to_thread(initialize_llm_clients))
+    await asyncio.shield(_init_task)
+
+
+def get_llm_client(provider: str):
+    """Get the shared client for a provider, or None if it is not configured."""
+    if not _initialized:
+        initialize_llm_clients()
+    return _clients.get(provider)
+
+
+def get_active_provider() -> Optional[str]:
+    """The provider chat uses: OpenAI first, then Anthropic, else None (fallback)."""
+    if not _initialized:
+        initialize_llm_clients()
+    for provider in (OPENAI, ANTHROPIC):
+        if provider in _clients:
+            return provider
+    return None
+
+
+async def close_llm_clients():
+    """Close provider clients and their connection pools."""
+    global _initialized, _init_task
+
+    for client in _http_clients.values():
+        await client.aclose()
+    _http_clients.clear()
+    _clients.clear()
+    _initialized = False
+    _init_task = None
+
+
+def get_connection_stats() -> Dict[str, Any]:
+    """Per-provider request / new-connection counts and reuse ratio."""
+    return {provider: stats.as_dict() for provider, stats in _stats.items()}
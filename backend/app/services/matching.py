@@ -1,7 +1,9 @@
 """Supplier Matching Service - Matches RFQ items to appropriate suppliers."""
 from typing import List, Dict, Any
 from app.models.rfq import RFQSession, SupplierMatch
-from app.services.firebase import get_suppliers
+from app.services.scoring import get_scoring_engine
+from app.services.entity_extractor import get_entity_extractor
+from app.services.metrics import span
 
 
 # Material to capability mapping
@@ -22,13 +24,12 @@ MATERIAL_CAPABILITIES = {
 
 
 def extract_material_keyword(material_name: str) -> str:
-    """Extract the primary material keyword from a material name."""
-    material_lower = material_name.lower()
-    
-    for keyword in MATERIAL_CAPABILITIES.keys():
-        if keyword in material_lower:
-            return keyword
+    """Extract the primary (first mentioned) material keyword from a material name."""
+    mention = get_entity_extractor().first(material_name)
+    if mention is not None:
+        return mention.entity.keyword
     
+    material_lower = material_name.lower()
     return material_lower.split()[0] if material_lower else 'general'
 
 
@@ -38,47 +39,30 @@ async def match_suppliers_for_rfq(rfq: RFQSession) -> List[Dict[str, List[Suppli
     
     Returns a mapping of item_id to list of matched suppliers.
     """
-    # Get all active suppliers
-    all_suppliers = await get_suppliers()
+    requirements = []
+    for item in rfq.items:
+        material_keyword = extract_material_keyword(item.material)
+        requirements.append(MATERIAL_CAPABILITIES.get(material_keyword, [material_keyword]))
+    
+    # Vectorized scoring of the capability index's candidates
+    engine = await get_scoring_engine(cap for required in requirements for cap in required)
+    
+    with span("matching"):
+        # Capability overlap ratio, EN9100/ISO9001 bonuses, capped at 1.0; top 3
+        ranked = engine.top_matches(requirements, k=3)
     
     matches = {}
     
-    for item in rfq.items:
-        item_matches = []
-        material_keyword = extract_material_keyword(item.material)
-        required_capabilities = MATERIAL_CAPABILITIES.get(material_keyword, [material_keyword])
-        
-        for supplier in all_suppliers:
-            supplier_caps = [c.lower() for c in supplier.get('capabilities', [])]
-            
-            # Calculate capability score
-            matching_caps = sum(1 for cap in required_capabilities if cap in supplier_caps)
-            if matching_caps == 0:
-                continue
-            
-            capability_score = matching_caps / len(required_capabilities)
-            
-            # Adjust score based on certifications if specified
-            # (e.g., aerospace items prefer EN9100 certified suppliers)
-            certs = supplier.get('certifications', [])
-            if 'EN9100' in certs:
-                capability_score *= 1.1
-            if 'ISO9001' in certs:
-                capability_score *= 1.05
-            
-            # Cap at 1.0
-            capability_score = min(capability_score, 1.0)
-            
-            item_matches.append(SupplierMatch(
+    for item, item_ranked in zip(rfq.items, ranked):
+        matches[item.id] = [
+            SupplierMatch(
                 supplier_id=supplier['id'],
-                capability_score=capability_score,
+                capability_score=score,
                 estimated_lead_time=supplier.get('avg_lead_time'),
                 price_tier=supplier.get('price_tier'),
-            ))
-        
-        # Sort by capability score (descending) and take top 3
-        item_matches.sort(key=lambda x: x.capability_score, reverse=True)
-        matches[item.id] = item_matches[:3]
+            )
+            for supplier, score in item_ranked
+        ]
     
     return matches
 
@@ -99,40 +83,17 @@ async def get_recommended_suppliers(
     Returns:
         List of recommended suppliers with scores
     """
-    all_suppliers = await get_suppliers()
     material_keyword = extract_material_keyword(material)
     required_caps = MATERIAL_CAPABILITIES.get(material_keyword, [material_keyword])
+    engine = await get_scoring_engine(required_caps)
     
     recommendations = []
     
-    for supplier in all_suppliers:
-        supplier_caps = [c.lower() for c in supplier.get('capabilities', [])]
-        
-        # Check capability match
-        matching_caps = sum(1 for cap in required_caps if cap in supplier_caps)
-        if matching_caps == 0:
-            continue
-        
-        # Calculate base score
-        score = matching_caps / len(required_caps)
-        
-        # Adjust for urgency
-        if urgency == 'rush':
-            lead_time = supplier.get('avg_lead_time', 30)
-            if lead_time <= 7:
-                score *= 1.2
-            elif lead_time <= 14:
-                score *= 1.0
-            else:
-                score *= 0.8
-        
-        # Adjust for reliability
-        reliability = supplier.get('reliability_score', 0.8)
-        score *= reliability
-        
+    # Overlap ratio, urgency multiplier from lead time, reliability; top 5
+    for supplier, score, matching_caps in engine.top_recommendations(required_caps, urgency, k=5):
         recommendations.append({
             'supplier': supplier,
-            'score': min(score, 1.0),
+            'score': score,
             'reasons': [
                 f"Matches {matching_caps}/{len(required_caps)} required capabilities",
                 f"Average lead time: {supplier.get('avg_lead_time', 'N/A')} days",
@@ -140,9 +101,4 @@ async def get_recommended_suppliers(
             ]
         })
     
-    # Sort by score
-    recommendations.sort(key=lambda x: x['score'], reverse=True)
-    
-    return recommendations[:5]
-
-
+    return recommendations
@@ -0,0 +1,421 @@
+"""Material Catalog - Materials and products compiled from the frontend data.
+
+`python -m scripts.compile_catalog` parses src/data/materials.ts and
+src/data/products.ts into one versioned snapshot file that also carries the
+precomputed search indexes and entity automaton. The backend loads it with
+a single read at startup (nothing is re-indexed) and polls it for changes:
+a new snapshot is swapped in as one reference, so a request sees either
+the old catalog or the new one, never a mix.
+
+Snapshot layout: a magic line, a JSON header line (format, version,
+counts), then the zlib-compressed JSON payload.
+"""
+import os
+import re
+import json
+import zlib
+import asyncio
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.services.search_index import SearchIndex
+from app.services.entity_extractor import EntityExtractor, material_patterns
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+CATALOG_SNAPSHOT_PATH = Path(os.getenv("CATALOG_SNAPSHOT_PATH", str(BACKEND_DIR / "catalog.snapshot")))
+FRONTEND_DATA_DIR = Path(os.getenv("FRONTEND_DATA_DIR", str(BACKEND_DIR.parent / "src" / "data")))
+CATALOG_RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", "10"))
+
+SNAPSHOT_MAGIC = b"BIMOTECH-CATALOG"
+SNAPSHOT_FORMAT = 1
+SOURCE_FILES = ("materials.ts", "products.ts")
+
+# Relative weight of each searchable field
+SEARCH_FIELD_WEIGHTS = {
+    'name': 3.0,
+    'symbol': 3.0,
+    'alloys': 2.0,
+    'applications': 1.5,
+    'forms': 1.0,
+    'description': 0.5,
+}
+
+# Fields that name a material (used to correct typos when grounding chat)
+NAME_FIELD_WEIGHTS = {'name': 3.0, 'symbol': 3.0, 'alloys': 2.0}
+
+# "Tantalum (Ta)": a refractory-metal product that names an element
+_ELEMENT_PRODUCT_RE = re.compile(r"^([A-Z][a-z]+) \(([A-Z][a-z]?)\)$")
+
+# Forms and alloys of element products; products.ts has no fields for them
+ELEMENT_PRODUCT_DETAILS = {
+    'tantalum': {
+        'forms': ['Sheets', 'Rods', 'Wires', 'Tubes', 'Fasteners'],
+        'alloys': ['Pure Ta', 'Ta-2.5W', 'Ta-10W', 'Ta-Nb'],
+    },
+    'niobium': {
+        'forms': ['Sheets', 'Rods', 'Wires', 'Tubes'],
+        'alloys': ['Pure Nb', 'Nb-Ti', 'Nb-Zr', 'NbC'],
+    },
+}
+
+
+class CatalogError(Exception):
+    """The snapshot is missing, corrupt or in an unsupported format."""
+
+
+# ============================================================================
+# TypeScript data -> Python
+# ============================================================================
+
+_TS_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>[\[\]{}:,])
+""", re.S | re.X)
+
+
+def _ts_string(token: str) -> str:
+    body = token[1:-1]
+    return re.sub(r"\\(.)", lambda m: {'n': '\n', 't': '\t'}.get(m.group(1), m.group(1)), body)
+
+
+def parse_ts_literal(source: str, export: str) -> Any:
+    """Parse the object/array literal assigned to `export const <export>` (data only)."""
+    match = re.search(rf"export const {re.escape(export)}\b[^=]*=\s*", source)
+    if match is None:
+        raise CatalogError(f"'export const {export}' not found")
+
+    tokens: List[Tuple[str, str]] = []
+    depth = 0
+    position = match.end()
+    while True:
+        token = _TS_TOKEN_RE.match(source, position)
+        if token is None:
+            raise CatalogError(f"Unsupported syntax in '{export}' near: {source[position:position + 40]!r}")
+        position = token.end()
+        kind = token.lastgroup
+        if kind == 'space':
+            continue
+        tokens.append((kind, token.group()))
+        if kind == 'punct' and token.group() in '[{':
+            depth += 1
+        elif kind == 'punct' and token.group() in ']}':
+            depth -= 1
+            if depth == 0:
+                break
+
+    parts = []
+    for i, (kind, value) in enumerate(tokens):
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else ''
+        if kind == 'string':
+            parts.append(json.dumps(_ts_string(value), ensure_ascii=False))
+        elif kind == 'name':
+            if following == ':':
+                parts.append(json.dumps(value))
+            elif value in ('true', 'false', 'null'):
+                parts.append(value)
+            else:
+                raise CatalogError(f"Unsupported identifier '{value}' in '{export}'")
+        elif value == ',' and following in (']', '}'):
+            continue  # trailing comma
+        else:
+            parts.append(value)
+    return json.loads("".join(parts))
+
+
+def _snake_case(key: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
+
+
+def _material_from_frontend(material: Dict[str, Any]) -> Dict[str, Any]:
+    """Backend material shape from a materials.ts entry."""
+    return {
+        'id': material['id'],
+        'name': material['name'],
+        'symbol': material['symbol'],
+        'description': material['description'],
+        'properties': {_snake_case(k): v for k, v in material.get('properties', {}).items()},
+        'forms': [product['name'] for product in material.get('products', [])],
+        'alloys': material.get('alloys', []),
+        'applications': material.get('applications', []),
+        'standards': material.get('standards', []),
+        'kind': 'material',
+    }
+
+
+def _material_from_product(product: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A material entry for element products ("Tantalum (Ta)") without a materials.ts page."""
+    match = _ELEMENT_PRODUCT_RE.match(product['name'])
+    if match is None or product.get('category') != 'Refractory Metals':
+        return None
+    name, symbol = match.groups()
+    details = ELEMENT_PRODUCT_DETAILS.get(name.lower(), {})
+    return {
+        'id': name.lower(),
+        'name': name,
+        'symbol': symbol,
+        'description': product['shortDescription'],
+        'properties': {
+            _snake_case(spec['key'].replace(' ', '')): f"{spec['value']} {spec.get('unit', '')}".strip()
+            for spec in product.get('specifications', [])
+        },
+        'forms': list(details.get('forms', [])),
+        'alloys': list(details.get('alloys', [])),
+        'applications': product.get('applications', []),
+        'standards': [],
+        'kind': 'material',
+    }
+
+
+def _material_fields(material: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        'name': f"{material['name']} {material['id']}",
+        'symbol': material['symbol'],
+        'alloys': ' '.join(material.get('alloys', [])),
+        'applications': ' '.join(material.get('applications', [])),
+        'forms': ' '.join(material.get('forms', [])),
+        'description': material.get('description', ''),
+    }
+
+
+def _product_fields(product: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        'name': product['name'],
+        'symbol': '',
+        'alloys': product.get('category', ''),
+        'applications': ' '.join(product.get('applications', [])),
+        'forms': '',
+        'description': f"{product.get('shortDescription', '')} {product.get('fullDescription', '')}",
+    }
+
+
+def source_version(data_dir: Path = FRONTEND_DATA_DIR) -> str:
+    """Content hash of everything a snapshot is compiled from."""
+    from app.services.matching import MATERIAL_CAPABILITIES
+    from app.services.entity_extractor import SYNONYMS
+
+    digest = hashlib.sha256(json.dumps(
+        [SNAPSHOT_FORMAT, SEARCH_FIELD_WEIGHTS, NAME_FIELD_WEIGHTS, MATERIAL_CAPABILITIES, SYNONYMS,
+         ELEMENT_PRODUCT_DETAILS],
+        sort_keys=True,
+    ).encode())
+    for name in SOURCE_FILES:
+        digest.update((data_dir / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def compile_catalog(data_dir: Path = FRONTEND_DATA_DIR) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Parse the frontend catalog and precompute indexes. Returns (header, payload)."""
+    from app.services.matching import MATERIAL_CAPABILITIES
+
+    frontend_materials = parse_ts_literal((data_dir / "materials.ts").read_text(encoding="utf-8"), "materials")
+    products = parse_ts_literal((data_dir / "products.ts").read_text(encoding="utf-8"), "products")
+
+    materials = {m['id']: _material_from_frontend(m) for m in frontend_materials}
+    for product in products:
+        derived = _material_from_product(product)
+        if derived is not None and derived['id'] not in materials:
+            materials[derived['id']] = derived
+    for product in products:
+        product['kind'] = 'product'
+
+    search_index = SearchIndex(
+        [(m, _material_fields(m)) for m in materials.values()]
+        + [(p, _product_fields(p)) for p in products],
+        SEARCH_FIELD_WEIGHTS,
+    )
+    name_index = SearchIndex([(m, _material_fields(m)) for m in materials.values()], NAME_FIELD_WEIGHTS)
+    extractor = EntityExtractor(material_patterns(materials, MATERIAL_CAPABILITIES))
+
+    header = {
+        'format': SNAPSHOT_FORMAT,
+        'version': source_version(data_dir),
+        'compiled_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'materials': len(materials),
+        'products': len(products),
+    }
+    payload = {
+        'materials': list(materials.values()),
+        'products': products,
+        'search_index': search_index.to_state(),
+        'name_index': name_index.to_state(),
+        'entities': extractor.to_state(),
+    }
+    return header, payload
+
+
+# ============================================================================
+# Snapshot file
+# ============================================================================
+
+def write_snapshot(path: Path, header: Dict[str, Any], payload: Dict[str, Any]):
+    """Write atomically: readers see the old file or the new one, never a partial write."""
+    body = zlib.compress(json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8'), 9)
+    data = SNAPSHOT_MAGIC + b"\n" + json.dumps(header, sort_keys=True).encode('utf-8') + b"\n" + body
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_snapshot_header(data: bytes) -> Tuple[Dict[str, Any], int]:
+    """Parse the header; returns (header, offset of the payload)."""
+    magic_end = data.find(b"\n")
+    header_end = data.find(b"\n", magic_end + 1)
+    if data[:magic_end] != SNAPSHOT_MAGIC or header_end < 0:
+        raise CatalogError("Not a catalog snapshot")
+    header = json.loads(data[magic_end + 1:header_end])
+    if header.get('format') != SNAPSHOT_FORMAT:
+        raise CatalogError(f"Unsupported snapshot format {header.get('format')} (expected {SNAPSHOT_FORMAT})")
+    return header, header_end + 1
+
+
+class CatalogSnapshot:
+    """An immutable catalog: materials, products and their search structures."""
+
+    def __init__(self, header: Dict[str, Any], payload: Dict[str, Any], source: str):
+        self.version: str = header['version']
+        self.compiled_at: str = header['compiled_at']
+        self.source = source
+        self.materials: Dict[str, Dict[str, Any]] = {m['id']: m for m in payload['materials']}
+        self.products: List[Dict[str, Any]] = payload['products']
+        material_list = list(self.materials.values())
+        self.search_index = SearchIndex.from_state(payload['search_index'], material_list + self.products)
+        self.name_index = SearchIndex.from_state(payload['name_index'], material_list)
+        self.extractor = EntityExtractor.from_state(payload['entities'])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, source: str) -> "CatalogSnapshot":
+        header, offset = read_snapshot_header(data)
+        try:
+            payload = json.loads(zlib.decompress(data[offset:]))
+        except (zlib.error, ValueError) as e:
+            raise CatalogError(f"Corrupt catalog snapshot: {e}") from e
+        return cls(header, payload, source)
+
+    @classmethod
+    def from_sources(cls, data_dir: Path = FRONTEND_DATA_DIR) -> "CatalogSnapshot":
+        header, payload = compile_catalog(data_dir)
+        # Round-trip through JSON so the result matches a loaded snapshot exactly
+        return cls(header, json.loads(json.dumps(payload)), str(data_dir))
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'compiled_at': self.compiled_at,
+            'source': self.source,
+            'materials': len(self.materials),
+            'products': len(self.products),
+        }
+
+
+# ============================================================================
+# Loading and hot reload
+# ============================================================================
+
+_catalog: Optional[CatalogSnapshot] = None
+_file_state: Optional[Tuple[int, int]] = None
+_watch_task: Optional[asyncio.Task] = None
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+
+def load_catalog(path: Path = CATALOG_SNAPSHOT_PATH) -> CatalogSnapshot:
+    """
+    Load the snapshot (one read) and make it current.
+
+    Without a snapshot file (e.g. a fresh checkout) the frontend sources are
+    compiled in-process instead.
+    """
+    global _catalog, _file_state
+
+    state = _stat(path)
+    if state is not None:
+        catalog = CatalogSnapshot.from_bytes(path.read_bytes(), str(path))
+    elif (FRONTEND_DATA_DIR / SOURCE_FILES[0]).exists():
+        print(f"Catalog snapshot {path} not found; compiling {FRONTEND_DATA_DIR}")
+        catalog = CatalogSnapshot.from_sources()
+    else:
+        raise CatalogError(f"No catalog snapshot at {path}; run python -m scripts.compile_catalog")
+
+    _catalog, _file_state = catalog, state
+    return catalog
+
+
+def get_catalog() -> CatalogSnapshot:
+    """The current catalog snapshot (loaded on first use)."""
+    if _catalog is None:
+        return load_catalog()
+    return _catalog
+
+
+async def reload_catalog() -> bool:
+    """Swap in the snapshot file if it changed. A bad file leaves the current catalog in place."""
+    global _file_state
+
+    state = _stat(CATALOG_SNAPSHOT_PATH)
+    if state is None or state == _file_state:
+        return False
+    previous = _catalog.version if _catalog is not None else None
+    try:
+        catalog = await asyncio.to_thread(load_catalog)
+    except Exception as e:
+        # Don't retry this file until it changes again
+        _file_state = state
+        print(f"Catalog reload failed, keeping version {previous}: {e}")
+        return False
+    print(f"Catalog reloaded: {previous} -> {catalog.version}")
+    return True
+
+
+async def _watch_loop():
+    while True:
+        await asyncio.sleep(CATALOG_RELOAD_INTERVAL)
+        await reload_catalog()
+
+
+async def start_material_catalog():
+    """Load the catalog and watch the snapshot file for updates."""
+    global _watch_task
+
+    catalog = await asyncio.to_thread(load_catalog)
+    print(f"Material catalog {catalog.version}: {len(catalog.materials)} materials, "
+          f"{len(catalog.products)} products")
+    if CATALOG_RELOAD_INTERVAL > 0:
+        _watch_task = asyncio.create_task(_watch_loop())
+
+
+async def stop_material_catalog():
+    global _watch_task
+
+    if _watch_task is not None:
+        _watch_task.cancel()
+        try:
+            await _watch_task
+        except asyncio.CancelledError:
+            pass
+        _watch_task = None
+
+
+def get_material_catalog_info() -> Optional[Dict[str, Any]]:
+    return _catalog.info() if _catalog is not None else None
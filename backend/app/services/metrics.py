@@ -0,0 +1,146 @@
+"""Metrics - Latency histograms and service gauges in Prometheus text format.
+
+- `RequestMetricsMiddleware` times every HTTP request by method, route
+  template (not the raw path, to keep cardinality bounded) and status. For
+  streamed responses the time runs until the last byte is sent.
+- `span(stage, provider=...)` times one unit of work (a Firestore call, a
+  search, matching, an LLM call, an email send) into
+  `bimo_stage_duration_seconds`, labelled ok/error by whether it raised.
+- `register_stats(name, fn)` exposes a service's stats dict (queue depth,
+  cache hits, ...) as gauges, read at scrape time.
+
+`render_metrics()` produces the /metrics payload.
+"""
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+# Sub-millisecond search up to multi-second LLM calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+REGISTRY = CollectorRegistry()
+
+REQUEST_DURATION = Histogram(
+    "bimo_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+STAGE_DURATION = Histogram(
+    "bimo_stage_duration_seconds",
+    "Latency of instrumented stages (Firestore, search, matching, LLM, email)",
+    ["stage", "provider", "outcome"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+# labels() does a lock + dict lookup; cache the children per label set
+_stage_children: Dict[Tuple[str, str, str], Any] = {}
+
+
+def observe_stage(stage: str, seconds: float, provider: str = "", outcome: str = "ok"):
+    key = (stage, provider, outcome)
+    child = _stage_children.get(key)
+    if child is None:
+        child = _stage_children[key] = STAGE_DURATION.labels(stage, provider, outcome)
+    child.observe(seconds)
+
+
+class span:
+    """Time a block as `stage`: `with span("search"):` (also fine inside async code)."""
+
+    __slots__ = ("stage", "provider", "start")
+
+    def __init__(self, stage: str, provider: str = ""):
+        self.stage = stage
+        self.provider = provider
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "ok" if exc_type is None else "error"
+        observe_stage(self.stage, time.perf_counter() - self.start, self.provider, outcome)
+        return False
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware (does not buffer streaming responses)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.labels(scope["method"], template, status).observe(time.perf_counter() - start)
+
+
+class _StatsCollector:
+    """Numeric values of registered stats dicts as `bimo_<name>_<key>` gauges."""
+
+    def __init__(self):
+        self.sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def collect(self):
+        for name, fn in self.sources.items():
+            try:
+                stats = fn() or {}
+            except Exception as e:
+                print(f"Metrics source {name} failed: {e}")
+                continue
+            for key, value in _flatten(stats):
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    yield GaugeMetricFamily(f"bimo_{name}_{key}", f"{name} {key}", value=value)
+
+    def describe(self):
+        return []
+
+
+def _flatten(stats: Dict[str, Any], prefix: str = ""):
+    for key, value in stats.items():
+        key = f"{prefix}{key}".replace("-", "_").replace(".", "_")
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{key}_")
+        else:
+            yield key, value
+
+
+_stats_collector = _StatsCollector()
+REGISTRY.register(_stats_collector)
+
+
+def register_stats(name: str, fn: Callable[[], Dict[str, Any]]):
+    """Expose `fn()`'s numeric values as gauges named bimo_<name>_<key>."""
+    _stats_collector.sources[name] = fn
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """(body, content type) for the /metrics endpoint."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
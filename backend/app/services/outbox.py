@@ -0,0 +1,322 @@
+"""Outbox Service - Durable email outbox backed by a local SQLite journal.
+
+Request handlers append messages to the outbox and return immediately. A
+background worker drains it in batches, retrying failures with exponential
+backoff and moving messages that keep failing to a dead-letter state.
+Messages claimed by a worker that crashed are recovered when their lease
+expires (or at the next startup), so delivery is at-least-once.
+"""
+import os
+import json
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Tuple
+
+OUTBOX_PATH = os.getenv("EMAIL_OUTBOX_PATH", "email_outbox.db")
+BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE = float(os.getenv("EMAIL_OUTBOX_BACKOFF_BASE", "2"))
+BACKOFF_MAX = float(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX", "900"))
+POLL_INTERVAL = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "1"))
+LEASE_SECONDS = 120.0
+SEND_TIMEOUT = 30.0
+SENT_RETENTION_SECONDS = 7 * 24 * 3600
+
+# Statuses
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class OutboxMessage:
+    """A claimed outbox entry."""
+
+    def __init__(self, id: int, kind: str, payload: Dict[str, Any], attempts: int):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+
+
+class EmailOutbox:
+    """SQLite-backed message journal. All methods are blocking."""
+
+    def __init__(self, path: str = OUTBOX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL + NORMAL survives process crashes without an fsync per append
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def append(self, kind: str, payload: Dict[str, Any]) -> int:
+        """Append a message; returns its outbox id."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (kind, payload, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload, default=str), PENDING, now, now, now),
+            )
+            return cursor.lastrowid
+
+    def claim(self, limit: int = BATCH_SIZE, lease_seconds: float = LEASE_SECONDS) -> List[OutboxMessage]:
+        """Lease up to `limit` due messages (including ones whose lease expired)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, kind, payload, attempts FROM outbox "
+                    "WHERE (status = ? AND next_attempt_at <= ?) "
+                    "   OR (status = ? AND lease_until < ?) "
+                    "ORDER BY next_attempt_at, id LIMIT ?",
+                    (PENDING, now, SENDING, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = ?, lease_until = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    [(SENDING, now + lease_seconds, now, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return [
+            OutboxMessage(row[0], row[1], json.loads(row[2]), row[3] + 1)
+            for row in rows
+        ]
+
+    def mark_sent(self, ids: List[int]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, lease_until = NULL, last_error = NULL, "
+                "updated_at = ? WHERE id = ?",
+                [(SENT, now, message_id) for message_id in ids],
+            )
+
+    def mark_failed(self, message: OutboxMessage, error: str) -> str:
+        """Schedule a retry with exponential backoff, or dead-letter. Returns the new status."""
+        now = time.time()
+        if message.attempts >= MAX_ATTEMPTS:
+            status, next_attempt_at = DEAD, now
+        else:
+            delay = min(BACKOFF_BASE ** message.attempts, BACKOFF_MAX)
+            status, next_attempt_at = PENDING, now + delay * random.uniform(0.8, 1.2)
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, next_attempt_at = ?, lease_until = NULL, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (status, next_attempt_at, error[:1000], now, message.id),
+            )
+        return status
+
+    def recover(self) -> int:
+        """Return messages left in 'sending' by a crashed worker to the queue."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, lease_until = NULL, next_attempt_at = ?, "
+                "updated_at = ? WHERE status = ?",
+                (PENDING, now, now, SENDING),
+            )
+            return cursor.rowcount
+
+    def purge_sent(self, older_than: float = SENT_RETENTION_SECONDS) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status = ? AND updated_at < ?",
+                (SENT, time.time() - older_than),
+            )
+            return cursor.rowcount
+
+    def requeue_dead(self) -> int:
+        """Move dead-lettered messages back to the queue (manual replay)."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ?, "
+                "updated_at = ? WHERE status = ?",
+                (PENDING, now, now, DEAD),
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+        counts = {PENDING: 0, SENDING: 0, SENT: 0, DEAD: 0}
+        counts.update(dict(rows))
+        return counts
+
+
+# Delivery handlers by message kind; they must raise on failure.
+# Batch handlers take every claimed payload of their kind at once and return
+# one result per payload (None for success, an exception for failure).
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+BatchHandler = Callable[[List[Dict[str, Any]]], Awaitable[List[Optional[BaseException]]]]
+_handlers: Dict[str, Tuple[Callable, bool]] = {}
+
+_outbox: Optional[EmailOutbox] = None
+_worker_task: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+
+
+def register_handler(kind: str, handler: Callable, batch: bool = False):
+    """Register the coroutine that delivers messages of `kind`."""
+    _handlers[kind] = (handler, batch)
+
+
+def get_outbox() -> EmailOutbox:
+    """Get (or open) the shared outbox."""
+    global _outbox
+
+    if _outbox is None:
+        _outbox = EmailOutbox()
+    return _outbox
+
+
+async def enqueue(kind: str, payload: Dict[str, Any]) -> int:
+    """Durably append a message and wake the worker."""
+    message_id = await asyncio.to_thread(get_outbox().append, kind, payload)
+    if _wakeup is not None:
+        _wakeup.set()
+    return message_id
+
+
+async def _deliver(kind: str, messages: List[OutboxMessage]) -> List[Optional[BaseException]]:
+    """Deliver all claimed messages of one kind; one result per message."""
+    if kind not in _handlers:
+        error = RuntimeError(f"No outbox handler for '{kind}'")
+        return [error] * len(messages)
+
+    handler, batch = _handlers[kind]
+    if not batch:
+        return await asyncio.gather(
+            *[asyncio.wait_for(handler(m.payload), SEND_TIMEOUT) for m in messages],
+            return_exceptions=True,
+        )
+
+    try:
+        return await asyncio.wait_for(handler([m.payload for m in messages]), SEND_TIMEOUT)
+    except Exception as e:
+        return [e] * len(messages)
+
+
+async def drain_once(limit: int = BATCH_SIZE) -> Tuple[int, int]:
+    """Claim and deliver one batch. Returns (sent, failed)."""
+    outbox = get_outbox()
+    batch = await asyncio.to_thread(outbox.claim, limit)
+    if not batch:
+        return 0, 0
+
+    by_kind: Dict[str, List[OutboxMessage]] = {}
+    for message in batch:
+        by_kind.setdefault(message.kind, []).append(message)
+    kind_results = await asyncio.gather(
+        *[_deliver(kind, messages) for kind, messages in by_kind.items()]
+    )
+
+    sent_ids = []
+    failed = 0
+    for messages, results in zip(by_kind.values(), kind_results):
+        for message, result in zip(messages, results):
+            if isinstance(result, BaseException):
+                failed += 1
+                status = await asyncio.to_thread(outbox.mark_failed, message, str(result) or type(result).__name__)
+                print(f"Outbox message {message.id} ({message.kind}) failed "
+                      f"[attempt {message.attempts}, now {status}]: {result}")
+            else:
+                sent_ids.append(message.id)
+
+    if sent_ids:
+        await asyncio.to_thread(outbox.mark_sent, sent_ids)
+    return len(sent_ids), failed
+
+
+async def _worker_loop():
+    last_purge = 0.0
+    while True:
+        # Clear before claiming, so a message enqueued during the drain wakes the next round
+        _wakeup.clear()
+        try:
+            sent, failed = await drain_once()
+        except Exception as e:
+            print(f"Outbox worker error: {e}")
+            sent, failed = 0, 0
+
+        if time.monotonic() - last_purge > 3600:
+            await asyncio.to_thread(get_outbox().purge_sent)
+            last_purge = time.monotonic()
+
+        # Full batch: keep draining. Otherwise sleep until woken or the next poll.
+        if sent + failed >= BATCH_SIZE:
+            continue
+        try:
+            await asyncio.wait_for(_wakeup.wait(), POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def start_outbox_worker():
+    """Recover unfinished messages and start draining the outbox."""
+    global _worker_task, _wakeup
+
+    recovered = await asyncio.to_thread(get_outbox().recover)
+    if recovered:
+        print(f"Outbox: recovered {recovered} unfinished message(s)")
+
+    _wakeup = asyncio.Event()
+    _worker_task = asyncio.create_task(_worker_loop())
+
+
+async def stop_outbox_worker():
+    """Stop the worker; undelivered messages stay in the journal."""
+    global _worker_task, _wakeup, _outbox
+
+    if _worker_task is not None:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+        _worker_task = None
+    _wakeup = None
+
+    if _outbox is not None:
+        _outbox.close()
+        _outbox = None
+
+
+def get_outbox_stats() -> Dict[str, Any]:
+    """Message counts by status. Blocking (a SQLite query)."""
+    return get_outbox().counts()
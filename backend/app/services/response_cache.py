@@ -0,0 +1,255 @@
+"""Response Cache - LRU + TTL cache for LLM chat responses.
+
+Entries live in memory under a byte budget, evicted least-recently-used
+first and expired after a TTL. An optional SQLite disk tier
+(`LLM_CACHE_PATH`) persists entries so a restarted worker starts warm.
+Values are serialized ChatResponse JSON; their size counts against the budget.
+The disk tier has its own lock, so memory lookups on the event loop never
+wait behind SQLite, and it is trimmed every DISK_TRIM_INTERVAL writes.
+"""
+import os
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")  # unset: memory only
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "100000"))
+DISK_TRIM_INTERVAL = 1000
+
+
+class ResponseCache:
+    """In-memory LRU/TTL cache bounded by total value size, with an optional disk tier."""
+
+    def __init__(self, max_bytes: int = LLM_CACHE_MAX_BYTES, ttl: float = LLM_CACHE_TTL, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (value, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self._disk_writes = 0
+        if path:
+            self._disk = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute("PRAGMA synchronous=NORMAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS response_cache_accessed ON response_cache (accessed_at)"
+            )
+
+    @property
+    def has_disk(self) -> bool:
+        return self._disk is not None
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key) + len(value.encode("utf-8"))
+
+    def _remove_locked(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= self._size(key, value)
+
+    def _put_locked(self, key: str, value: str, expires_at: float):
+        if key in self._entries:
+            self._remove_locked(key)
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, expires_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove_locked(oldest)
+            self.evictions += 1
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """Memory-tier lookup (never blocks on I/O)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                self._remove_locked(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_disk(self, key: str) -> Optional[str]:
+        """Disk-tier lookup; promotes hits to memory. Blocking."""
+        if self._disk is None:
+            return None
+        now = time.time()
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._disk.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self._put_locked(key, row[0], row[1])
+            self.disk_hits += 1
+        return row[0]
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def set_memory(self, key: str, value: str) -> float:
+        """Store in memory; returns the expiry timestamp."""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._put_locked(key, value, expires_at)
+        return expires_at
+
+    def set_disk(self, key: str, value: str, expires_at: float):
+        """Write through to the disk tier, trimming it every DISK_TRIM_INTERVAL writes. Blocking."""
+        if self._disk is None:
+            return
+        now = time.time()
+        with self._disk_lock:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._disk_writes += 1
+            if self._disk_writes % DISK_TRIM_INTERVAL == 0:
+                self._trim_disk_locked(now)
+
+    def _trim_disk_locked(self, now: float):
+        """Drop expired entries, then all but the LLM_CACHE_DISK_MAX_ENTRIES most recently used."""
+        self._disk.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        self._disk.execute(
+            "DELETE FROM response_cache WHERE key NOT IN ("
+            "SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT ?)",
+            (LLM_CACHE_DISK_MAX_ENTRIES,),
+        )
+
+    def warm(self) -> int:
+        """Load the most recently used disk entries into memory. Blocking."""
+        if self._disk is None:
+            return 0
+        loaded = 0
+        budget = self.max_bytes
+        warmed = []
+        with self._disk_lock:
+            # Trim whatever the previous run left over before reading it back
+            now = time.time()
+            self._trim_disk_locked(now)
+            rows = self._disk.execute(
+                "SELECT key, value, expires_at FROM response_cache WHERE expires_at > ? "
+                "ORDER BY accessed_at DESC",
+                (now,),
+            )
+            for key, value, expires_at in rows:
+                size = self._size(key, value)
+                if size > budget:
+                    break
+                budget -= size
+                warmed.append((key, value, expires_at))
+        with self._lock:
+            # Oldest first so the most recently used end up at the LRU tail
+            for key, value, expires_at in reversed(warmed):
+                self._put_locked(key, value, expires_at)
+                loaded += 1
+        return loaded
+
+    def close(self):
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.close()
+            self._disk = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.disk_hits) / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "disk": self._disk is not None,
+        }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the shared cache, or None when LLM_CACHE_ENABLED=false."""
+    global _cache
+
+    if _cache is None and LLM_CACHE_ENABLED:
+        _cache = ResponseCache(path=LLM_CACHE_PATH)
+    return _cache
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """Look up memory, then disk; counts a miss if neither has it."""
+    cache = get_response_cache()
+    if cache is None:
+        return None
+    value = cache.get_memory(key)
+    if value is None and cache.has_disk:
+        value = await asyncio.to_thread(cache.get_disk, key)
+    if value is None:
+        cache.record_miss()
+    return value
+
+
+async def cache_set(key: str, value: str):
+    """Store in memory and write through to disk."""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    expires_at = cache.set_memory(key, value)
+    if cache.has_disk:
+        await asyncio.to_thread(cache.set_disk, key, value, expires_at)
+
+
+async def start_response_cache():
+    """Open the cache and warm it from the disk tier."""
+    cache = get_response_cache()
+    if cache is not None and cache.has_disk:
+        loaded = await asyncio.to_thread(cache.warm)
+        print(f"LLM response cache warmed with {loaded} entries")
+
+
+def close_response_cache():
+    global _cache
+
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def get_response_cache_stats() -> Optional[Dict[str, Any]]:
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,126 @@
+"""RFQ Pipeline Service - Staged, concurrent RFQ submission.
+
+Stages:
+1. persist  - save the RFQ (the customer waits only for this)
+2. match    - supplier matching, started concurrently with persist
+3. notify_suppliers / confirm_customer - fan-out, run as tracked background work
+4. analyze_designs - design file analysis (process pool), attached to the RFQ
+
+Per-stage timings and failures are written to the RFQ document under
+`pipeline` once the fan-out finishes.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, Set, Awaitable
+
+from app.models.rfq import RFQSession
+from app.services.firebase import save_rfq, update_rfq_pipeline
+from app.services.matching import match_suppliers_for_rfq
+from app.services.email import send_rfq_to_suppliers, send_confirmation_to_customer
+from app.services.design_analysis import attach_design_analysis
+
+# Background fan-outs still in flight (kept referenced until they finish)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class StageRecorder:
+    """Collects timing and outcome for each pipeline stage."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    async def run(self, name: str, awaitable: Awaitable):
+        """Await a stage, recording its duration and any failure (then re-raise)."""
+        started_at = datetime.now()
+        start = time.perf_counter()
+        try:
+            result = await awaitable
+        except BaseException as e:
+            self.stages[name] = {
+                'status': 'cancelled' if isinstance(e, asyncio.CancelledError) else 'failed',
+                'started_at': started_at,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+                'error': str(e) or type(e).__name__,
+            }
+            raise
+        self.stages[name] = {
+            'status': 'ok',
+            'started_at': started_at,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+        return result
+
+
+async def submit_rfq_pipeline(rfq: RFQSession) -> str:
+    """
+    Run the submit pipeline; return as soon as the RFQ is saved.
+
+    Matching starts alongside persistence. Supplier emails and the customer
+    confirmation continue in the background after this returns.
+    Raises if the RFQ could not be saved.
+    """
+    recorder = StageRecorder()
+    match_task = asyncio.create_task(recorder.run('match', match_suppliers_for_rfq(rfq)))
+
+    try:
+        rfq_id = await recorder.run('persist', save_rfq(rfq))
+    except BaseException:
+        match_task.cancel()
+        raise
+
+    task = asyncio.create_task(_fan_out(rfq, rfq_id, match_task, recorder))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+    return rfq_id
+
+
+async def _fan_out(rfq: RFQSession, rfq_id: str, match_task: asyncio.Task, recorder: StageRecorder):
+    """Send supplier and customer emails, then record the pipeline on the RFQ."""
+    async def notify_suppliers():
+        matches = await match_task
+        await recorder.run('notify_suppliers', send_rfq_to_suppliers(rfq, matches))
+
+    confirm_customer = recorder.run('confirm_customer', send_confirmation_to_customer(
+        email=rfq.contact_email,
+        rfq_id=rfq_id,
+        item_count=len(rfq.items),
+    ))
+
+    stages = [notify_suppliers(), confirm_customer]
+    if rfq.design_files:
+        stages.append(recorder.run('analyze_designs', attach_design_analysis(rfq_id, rfq.design_files)))
+    
+    # Failures are already recorded per stage; one stage failing must not stop the others
+    results = await asyncio.gather(*stages, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"RFQ {rfq_id} pipeline stage failed: {result}")
+
+    if 'notify_suppliers' not in recorder.stages and 'match' in recorder.stages:
+        recorder.stages['notify_suppliers'] = {'status': 'skipped', 'error': 'matching failed'}
+
+    await update_rfq_pipeline(rfq_id, {
+        'stages': recorder.stages,
+        'completed_at': datetime.now(),
+    })
+
+
+def get_pending_count() -> int:
+    """Number of fan-outs still running."""
+    return len(_background_tasks)
+
+
+async def drain_pipeline(timeout: float = 30.0):
+    """Wait for in-flight fan-outs (on shutdown), cancelling any that overrun."""
+    if not _background_tasks:
+        return
+
+    done, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        # Let them unwind before the outbox and the Firestore executor close under them
+        await asyncio.gather(*pending, return_exceptions=True)
+        print(f"Cancelled {len(pending)} unfinished RFQ fan-out(s) on shutdown")
@@ -0,0 +1,144 @@
+"""Scoring Service - Vectorized supplier scoring for RFQ matching.
+
+Candidates come from the capability index: only suppliers that cover at
+least one required capability are scored, with NumPy over their overlap
+counts and scoring columns, and top-k selection uses argpartition. The
+index is updated incrementally as the catalog changes, so there is nothing
+to rebuild between requests. Scores are computed with the same float
+operations, in the same order, as the per-supplier loop they replace, so
+rankings are identical.
+
+Match scores only depend on (overlap, EN9100, ISO9001), so they are looked
+up from a small per-requirement table instead of being recomputed per cell.
+"""
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+import numpy as np
+
+from app.services import firebase, supplier_catalog
+from app.services.capability_index import CapabilityIndex, get_capability_index
+
+EN9100_MULTIPLIER = 1.1
+ISO9001_MULTIPLIER = 1.05
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, highest first.
+
+    Candidates are in catalog order, so ties are broken by position, matching
+    a stable sort. Entries of -inf are skipped.
+    """
+    candidates = np.flatnonzero(scores > -np.inf)
+    if len(candidates) > k:
+        values = scores[candidates]
+        threshold = values[np.argpartition(-values, k - 1)[:k]].min()
+        candidates = candidates[values >= threshold]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+class SupplierScoringEngine:
+    """Scores requirement sets against the candidates from a capability index."""
+
+    def __init__(self, index: CapabilityIndex):
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def top_matches(
+        self,
+        requirements: List[List[str]],
+        k: int = 3
+    ) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """
+        Score every requirement set in an RFQ and return the top k per set.
+
+        Capability score = overlap ratio, x1.1 for EN9100, x1.05 for ISO9001,
+        capped at 1.0. Returns (supplier, score) pairs per requirement.
+        """
+        # Items that share a material share a requirement set; score each once
+        keys = [tuple(cap.lower() for cap in required) for required in requirements]
+        ranked: Dict[Tuple[str, ...], List[Tuple[Dict[str, Any], float]]] = {}
+
+        for key in dict.fromkeys(keys):
+            found = self.index.candidates(key)
+            scores = _match_score_table(len(key))[found.overlap * 4 + found.certification_codes]
+            ranked[key] = [(found.suppliers[i], float(scores[i])) for i in _top_k(scores, k)]
+
+        return [ranked[key] for key in keys]
+
+    def top_recommendations(
+        self,
+        required: List[str],
+        urgency: Optional[str] = None,
+        k: int = 5
+    ) -> List[Tuple[Dict[str, Any], float, int]]:
+        """
+        Rank suppliers for a single requirement set.
+
+        Score = overlap ratio, x urgency multiplier from lead time when rushed,
+        x reliability, capped at 1.0. Returns (supplier, score, overlap).
+        """
+        key = tuple(cap.lower() for cap in required)
+        found = self.index.candidates(key)
+        scores = found.overlap / len(key) if key else np.zeros(0)
+
+        if urgency == 'rush':
+            multiplier = np.where(
+                found.lead_time <= 7, 1.2, np.where(found.lead_time <= 14, 1.0, 0.8)
+            )
+            scores = scores * multiplier
+
+        scores = np.minimum(scores * found.reliability, 1.0)
+
+        return [(found.suppliers[i], float(scores[i]), int(found.overlap[i])) for i in _top_k(scores, k)]
+
+
+def _match_score_table(size: int) -> np.ndarray:
+    """
+    Match score for every (overlap, EN9100, ISO9001) combination.
+
+    Indexed by overlap * 4 + en9100 * 2 + iso9001; zero overlap is -inf
+    (not a candidate).
+    """
+    table = np.full(4 * (size + 1), -np.inf)
+    for overlap in range(1, size + 1):
+        for en9100 in (0, 1):
+            for iso9001 in (0, 1):
+                score = overlap / size
+                if en9100:
+                    score *= EN9100_MULTIPLIER
+                if iso9001:
+                    score *= ISO9001_MULTIPLIER
+                table[overlap * 4 + en9100 * 2 + iso9001] = min(score, 1.0)
+    return table
+
+
+_engine: Optional[SupplierScoringEngine] = None
+
+
+async def get_scoring_engine(capabilities: Iterable[str] = ()) -> SupplierScoringEngine:
+    """
+    Get the engine over the shared capability index.
+
+    Until the supplier replica has loaded (Firestore was unreachable at
+    startup and the listener has not delivered yet), returns a one-off
+    engine over just the suppliers having any of `capabilities`, read with
+    a filtered, projected query instead of the whole collection.
+    """
+    global _engine
+
+    if not supplier_catalog.is_loaded():
+        index = CapabilityIndex()
+        capabilities = sorted({cap.lower() for cap in capabilities})
+        if capabilities:
+            suppliers = await firebase.get_suppliers(capabilities=capabilities)
+            index.apply_changes({s['id']: s for s in suppliers}, [])
+        return SupplierScoringEngine(index)
+
+    if _engine is None:
+        _engine = SupplierScoringEngine(get_capability_index())
+
+    return _engine
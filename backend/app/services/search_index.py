@@ -0,0 +1,215 @@
+"""Search Index - Typo-tolerant ranked full-text search over small catalogs.
+
+Documents are tokenized per field into an inverted index with precomputed
+BM25F term weights (field-weighted, length-normalized). Query terms are
+expanded to catalog terms by exact match, prefix ("tung") and trigram
+similarity confirmed by edit distance ("tungstn", "molybdneum"), so a
+query costs a few dictionary lookups rather than a scan of the catalog.
+The index is immutable; rebuild it when the catalog changes.
+"""
+import re
+import math
+import heapq
+from bisect import bisect_left
+from typing import Dict, Any, List, Tuple, Iterable, Optional, NamedTuple
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Fuzzy matching
+MIN_FUZZY_LENGTH = 4
+MIN_PREFIX_LENGTH = 3
+MIN_TRIGRAM_SIMILARITY = 0.45
+PREFIX_WEIGHT = 0.8
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+
+STOP_WORDS = frozenset("""
+a about an and any are as at be by can could do does for from get have how i
+if in is it its me my need of on or our please that the their there this to
+us we what when where which who will with would you your
+""".split())
+
+
+class SearchHit(NamedTuple):
+    """A ranked result: the document payload and its score."""
+    document: Dict[str, Any]
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms; compounds like "w-re" or "99.95" are also split into parts."""
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        terms.append(token)
+        if "-" in token or "." in token:
+            terms.extend(part for part in re.split(r"[-.]", token) if part)
+    return terms
+
+
+def _trigrams(term: str) -> List[str]:
+    padded = f"${term}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Immutable BM25F index with prefix and trigram typo tolerance."""
+
+    def __init__(self, documents: Iterable[Tuple[Dict[str, Any], Dict[str, str]]], field_weights: Dict[str, float]):
+        """
+        documents: (payload, {field: text}) pairs in catalog order.
+        field_weights: relative weight of each field.
+        """
+        self._documents: List[Dict[str, Any]] = []
+        field_terms: List[Dict[str, List[str]]] = []
+        for payload, fields in documents:
+            self._documents.append(payload)
+            field_terms.append({
+                field: tokenize(text) for field, text in fields.items() if field in field_weights
+            })
+
+        n = len(self._documents)
+        average_length = {
+            field: (sum(len(terms.get(field, ())) for terms in field_terms) / n) or 1.0 if n else 1.0
+            for field in field_weights
+        }
+
+        # term -> {doc: length-normalized, field-weighted term frequency}
+        frequencies: Dict[str, Dict[int, float]] = {}
+        for doc, terms_by_field in enumerate(field_terms):
+            for field, terms in terms_by_field.items():
+                norm = 1 - B + B * len(terms) / average_length[field]
+                for term in terms:
+                    postings = frequencies.setdefault(term, {})
+                    postings[doc] = postings.get(doc, 0.0) + field_weights[field] / norm
+
+        # term -> [(doc, BM25F weight)]
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for term, postings in frequencies.items():
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            self._postings[term] = [
+                (doc, idf * tf * (K1 + 1) / (tf + K1)) for doc, tf in postings.items()
+            ]
+
+        self._vocabulary = sorted(self._postings)
+        self._trigram_index: Dict[str, List[str]] = {}
+        for term in self._vocabulary:
+            if len(term) >= MIN_FUZZY_LENGTH - 1:
+                for gram in set(_trigrams(term)):
+                    self._trigram_index.setdefault(gram, []).append(term)
+
+        # Query term -> expansions, bounded by the vocabulary a catalog can produce
+        self._expansion_cache: Dict[str, List[Tuple[str, float]]] = {}
+
+    def to_state(self) -> Dict[str, Any]:
+        """Precomputed structures, JSON-serializable (documents excluded)."""
+        return {
+            "documents": len(self._documents),
+            "postings": {
+                term: [value for doc, weight in postings for value in (doc, round(weight, 6))]
+                for term, postings in self._postings.items()
+            },
+            "trigrams": self._trigram_index,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], documents: List[Dict[str, Any]]) -> "SearchIndex":
+        """Restore an index from `to_state()` output without re-tokenizing the catalog."""
+        if state["documents"] != len(documents):
+            raise ValueError("Search index state does not match the documents")
+        index = cls.__new__(cls)
+        index._documents = list(documents)
+        index._postings = {
+            term: list(zip(flat[0::2], flat[1::2])) for term, flat in state["postings"].items()
+        }
+        index._vocabulary = sorted(index._postings)
+        index._trigram_index = state["trigrams"]
+        index._expansion_cache = {}
+        return index
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def expand(self, term: str) -> List[Tuple[str, float]]:
+        """Catalog terms matching a query term, with a similarity weight in (0, 1]."""
+        cached = self._expansion_cache.get(term)
+        if cached is not None:
+            return cached
+
+        matches: Dict[str, float] = {}
+        if term in self._postings:
+            matches[term] = 1.0
+
+        if len(term) >= MIN_PREFIX_LENGTH:
+            i = bisect_left(self._vocabulary, term)
+            while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+                matches.setdefault(self._vocabulary[i], PREFIX_WEIGHT)
+                i += 1
+
+        if len(term) >= MIN_FUZZY_LENGTH and term not in self._postings:
+            grams = _trigrams(term)
+            shared: Dict[str, int] = {}
+            for gram in set(grams):
+                for candidate in self._trigram_index.get(gram, ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+            max_edits = 1 if len(term) < 7 else 2
+            for candidate, count in shared.items():
+                if candidate in matches:
+                    continue
+                similarity = 2 * count / (len(grams) + len(candidate) + 2)
+                if similarity < MIN_TRIGRAM_SIMILARITY:
+                    continue
+                distance = _edit_distance(term, candidate, max_edits)
+                if distance <= max_edits:
+                    matches[candidate] = similarity * (1 - distance / (len(term) + 1))
+
+        expansions = list(matches.items())
+        if len(self._expansion_cache) < 10000:
+            self._expansion_cache[term] = expansions
+        return expansions
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> Tuple[int, List[SearchHit]]:
+        """Rank documents for `query`. Returns (total matches, hits[offset:offset + limit])."""
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t not in STOP_WORDS]
+        scores: Dict[int, float] = {}
+        for term in terms:
+            # Best-matching expansion per document, so typo variants don't stack
+            best: Dict[int, float] = {}
+            for expansion, similarity in self.expand(term):
+                for doc, weight in self._postings[expansion]:
+                    score = similarity * weight
+                    if score > best.get(doc, 0.0):
+                        best[doc] = score
+            for doc, score in best.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+
+        # Ties keep catalog order
+        ranked = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        page = ranked[offset:] if limit > 0 else []
+        return len(scores), [SearchHit(self._documents[doc], round(score, 4)) for doc, score in page]
+
+    def best(self, query: str) -> Optional[Dict[str, Any]]:
+        """The top-ranked document, or None."""
+        _, hits = self.search(query, limit=1)
+        return hits[0].document if hits else None
@@ -0,0 +1,93 @@
+"""Startup - Phase timings for cold starts, and the background warm-up.
+
+On scale-to-zero hosting the first request waits for the whole startup, so
+the server starts listening as soon as the cheap, request-critical services
+are up (material catalog, caches, outbox). Slow SDK imports and remote loads
+(Firebase Admin, the LLM provider clients, the supplier replica) run
+afterwards as a background warm-up. A request that needs one of them sooner
+waits for that dependency only; each one initializes lazily on first use.
+
+Phases are timed from the moment app.main starts importing and reported on
+/health under "startup".
+"""
+import time
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Imported first by app.main, so this is (close to) the start of the app import
+_t0 = time.perf_counter()
+
+_phases: Dict[str, float] = {}
+_milestones: Dict[str, float] = {}
+_errors: Dict[str, str] = {}
+_warmup_task: Optional[asyncio.Task] = None
+
+Step = Tuple[str, Callable[[], Awaitable[Any]]]
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+@contextmanager
+def phase(name: str):
+    """Time a startup step: `with phase("material_catalog"): ...`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = _elapsed_ms(start)
+
+
+def mark(milestone: str):
+    """Record a milestone ("imported", "serving", "warm") as ms since the import started."""
+    _milestones[milestone] = _elapsed_ms(_t0)
+
+
+async def _run_chain(steps: List[Step]):
+    for name, step in steps:
+        try:
+            with phase(f"warmup.{name}"):
+                await step()
+        except Exception as e:
+            _errors[name] = str(e) or type(e).__name__
+            print(f"Warm-up step {name} failed: {e}")
+
+
+async def _warm_up(chains: Tuple[List[Step], ...]):
+    await asyncio.gather(*(_run_chain(chain) for chain in chains))
+    mark("warm")
+    print(f"Startup: serving after {_milestones.get('serving')}ms, warm after {_milestones['warm']}ms")
+
+
+def start_warmup(*chains: List[Step]):
+    """
+    Run warm-up steps in the background. Steps within a chain run in order
+    (e.g. Firebase before the supplier replica); chains run concurrently.
+    """
+    global _warmup_task
+
+    _warmup_task = asyncio.create_task(_warm_up(chains))
+
+
+async def stop_warmup():
+    """Cancel the warm-up if it is still running (shutdown during startup)."""
+    global _warmup_task
+
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+        try:
+            await _warmup_task
+        except asyncio.CancelledError:
+            pass
+    _warmup_task = None
+
+
+def get_startup_stats() -> Dict[str, Any]:
+    return {
+        "warm": "warm" in _milestones,
+        "milestones_ms": dict(_milestones),
+        "phases_ms": dict(_phases),
+        **({"errors": dict(_errors)} if _errors else {}),
+    }
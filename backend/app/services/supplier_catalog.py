@@ -0,0 +1,198 @@
+"""Supplier Catalog Service - Process-local replica of the suppliers collection.
+
+The replica is loaded once in the FastAPI lifespan hook and kept current by a
+Firestore snapshot listener (or by a polling diff in mock mode), so matching
+reads memory instead of streaming the whole collection on every request.
+"""
+import os
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+from app.services import firebase
+from app.services.firestore_queries import ACTIVE_SUPPLIERS, build_query
+
+POLL_INTERVAL = float(os.getenv("SUPPLIER_CATALOG_POLL_INTERVAL", "30"))
+
+# Replica state (guarded by _lock; the snapshot listener runs on its own thread)
+_lock = threading.Lock()
+_suppliers: Dict[str, Dict[str, Any]] = {}
+_loaded = False
+_version = 0
+_last_sync: Optional[float] = None
+_mode = "stopped"
+
+_listener = None
+_poll_task: Optional[asyncio.Task] = None
+_subscribers: List[Callable[[Dict[str, Dict[str, Any]], List[str]], None]] = []
+
+
+def subscribe(callback: Callable[[Dict[str, Dict[str, Any]], List[str]], None]):
+    """
+    Register a callback for catalog changes.
+
+    The callback receives (upserted suppliers by id, removed supplier ids).
+    It is called with the current contents immediately so it can build
+    its initial state.
+    """
+    with _lock:
+        _subscribers.append(callback)
+        if _suppliers:
+            callback(dict(_suppliers), [])
+
+
+def _apply_changes(upserts: Dict[str, Dict[str, Any]], removals: List[str]):
+    """Apply a diff to the replica and notify subscribers."""
+    with _lock:
+        _apply_changes_locked(upserts, removals)
+
+
+def _apply_changes_locked(upserts: Dict[str, Dict[str, Any]], removals: List[str]):
+    global _version, _last_sync, _loaded
+
+    _last_sync = time.monotonic()
+    _loaded = True
+    removals = [sid for sid in removals if sid in _suppliers]
+    if not upserts and not removals:
+        return
+
+    for supplier_id in removals:
+        del _suppliers[supplier_id]
+    _suppliers.update(upserts)
+    _version += 1
+
+    for callback in _subscribers:
+        try:
+            callback(upserts, removals)
+        except Exception as e:
+            print(f"Supplier catalog subscriber error: {e}")
+
+
+def _replace_all(suppliers: List[Dict[str, Any]], read_version: Optional[int] = None):
+    """
+    Replace the replica contents with a full read, as a diff.
+
+    An empty read empties the replica (failed reads raise before getting
+    here). `read_version` is the catalog version when the read started: if
+    the listener applied changes in the meantime, the read may predate them
+    (and bring back a removed supplier), so it is dropped.
+    """
+    incoming = {s['id']: s for s in suppliers if s.get('id')}
+    with _lock:
+        if read_version is not None and read_version != _version:
+            print("Supplier catalog: changed during a full read, keeping current replica")
+            return
+        upserts = {sid: s for sid, s in incoming.items() if _suppliers.get(sid) != s}
+        removals = [sid for sid in _suppliers if sid not in incoming]
+        _apply_changes_locked(upserts, removals)
+
+
+def _on_snapshot(col_snapshot, changes, read_time):
+    """Firestore snapshot listener callback (runs on a listener thread)."""
+    upserts = {}
+    removals = []
+
+    for change in changes:
+        doc = change.document
+        if change.type.name == 'REMOVED':
+            removals.append(doc.id)
+        else:
+            data = doc.to_dict()
+            data.setdefault('id', doc.id)
+            upserts[data['id']] = data
+
+    _apply_changes(upserts, removals)
+
+
+async def _poll_loop():
+    """Mock mode: diff the supplier list periodically."""
+    while True:
+        await asyncio.sleep(POLL_INTERVAL)
+        try:
+            await refresh_suppliers()
+        except Exception as e:
+            print(f"Supplier catalog poll error: {e}")
+
+
+async def start_supplier_catalog():
+    """Load the replica and start keeping it current."""
+    global _listener, _poll_task, _mode
+
+    try:
+        await refresh_suppliers()
+    except Exception as e:
+        # The listener's first snapshot (or the next poll) loads it instead
+        print(f"Supplier catalog: initial load failed: {e}")
+
+    if firebase._db is not None:
+        query = build_query(firebase._db, ACTIVE_SUPPLIERS, [True])
+        _listener = query.on_snapshot(_on_snapshot)
+        _mode = "listener"
+    else:
+        _poll_task = asyncio.create_task(_poll_loop())
+        _mode = "polling"
+
+    print(f"Supplier catalog loaded: {len(_suppliers)} suppliers ({_mode})")
+
+
+async def stop_supplier_catalog():
+    """Detach the listener / stop polling."""
+    global _listener, _poll_task, _mode
+
+    if _listener is not None:
+        _listener.unsubscribe()
+        _listener = None
+
+    if _poll_task is not None:
+        _poll_task.cancel()
+        try:
+            await _poll_task
+        except asyncio.CancelledError:
+            pass
+        _poll_task = None
+
+    _mode = "stopped"
+
+
+async def refresh_suppliers() -> int:
+    """Force a full reload from Firestore. Returns the catalog version; raises if the read fails."""
+    read_version = _version
+    _replace_all(await firebase.load_suppliers(), read_version)
+    return _version
+
+
+def is_loaded() -> bool:
+    """Whether the replica has been loaded from Firestore (by a read or the listener)."""
+    return _loaded
+
+
+def get_supplier(supplier_id: str) -> Optional[Dict[str, Any]]:
+    """Get a single supplier from memory."""
+    with _lock:
+        return _suppliers.get(supplier_id)
+
+
+def get_staleness_seconds() -> Optional[float]:
+    """
+    Seconds since the replica last heard from Firestore, or None if never loaded.
+
+    That is the last listener snapshot, poll or refresh. The listener only
+    delivers when something changes, so on a quiet collection this grows
+    even though nothing is missing; a stalled listener looks the same,
+    which is why it is not reported as 0.
+    """
+    if _last_sync is None:
+        return None
+    return time.monotonic() - _last_sync
+
+
+def get_catalog_stats() -> Dict[str, Any]:
+    """Replica size, version, sync mode and staleness."""
+    staleness = get_staleness_seconds()
+    return {
+        'mode': _mode,
+        'suppliers': len(_suppliers),
+        'version': _version,
+        'staleness_seconds': round(staleness, 3) if staleness is not None else None,
+    }
@@ -0,0 +1,144 @@
+"""
+Bulk ingestion benchmark.
+
+Imports a synthetic supplier CSV and quote JSONL (with some invalid and
+duplicate rows) into the in-memory Firestore through
+app.services.bulk_ingest, for each validation worker count, and compares
+with saving quotes one at a time through save_supplier_quote. The fake
+BulkWriter is not rate limited, so this measures the import pipeline, not
+Firestore's ramp-up.
+
+Usage (from backend/):
+    python -m benchmarks.bulk_ingest --rows 20000 --latency-ms 20 --workers 0,1,4
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import time
+from typing import AsyncIterator, List
+
+from app.services import bulk_ingest, firebase
+from app.services.matching import MATERIAL_CAPABILITIES
+from benchmarks.fake_firestore import CERTIFICATIONS, PRICE_TIERS, InMemoryFirestore
+
+CHUNK_SIZE = 64 * 1024
+SEQUENTIAL_ROWS = 200
+
+
+def make_suppliers_csv(rows: int, invalid: float, seed: int = 11) -> bytes:
+    rng = random.Random(seed)
+    capabilities = sorted({c for caps in MATERIAL_CAPABILITIES.values() for c in caps})
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["id", "name", "email", "capabilities", "certifications",
+                     "avg_lead_time", "price_tier", "reliability_score", "notes"])
+    for i in range(rows):
+        email = f"sales-{i}@distributor.example.com"
+        supplier_id = f"dist_{i:07d}"
+        roll = rng.random()
+        if roll < invalid / 2:
+            email = "not-an-email"
+        elif roll < invalid:
+            # Duplicate id of an earlier row
+            supplier_id = f"dist_{rng.randrange(max(i, 1)):07d}"
+        writer.writerow([
+            supplier_id,
+            f"Distributor {i}, Sp. z o.o.",
+            email,
+            ";".join(rng.sample(capabilities, rng.randint(1, 6))),
+            "|".join(rng.sample(CERTIFICATIONS, rng.randint(0, 3))),
+            rng.choice(["7", "14", "21", ""]),
+            rng.choice(PRICE_TIERS),
+            f"{rng.uniform(0.6, 1.0):.3f}",
+            "Ships \"as rolled\"\nor ground" if i % 97 == 0 else "",
+        ])
+    return out.getvalue().encode()
+
+
+def make_quotes_jsonl(rows: int, invalid: float, seed: int = 12) -> bytes:
+    rng = random.Random(seed)
+    lines = []
+    for i in range(rows):
+        quote = {
+            "supplier_id": f"dist_{rng.randrange(5000):07d}",
+            "rfq_id": f"BT-20260101-{i // 50:04d}",
+            "item_id": f"item_{i:07d}",
+            "unit_price": round(rng.uniform(5, 5000), 2),
+            "lead_time_days": rng.choice([7, 14, 21, 28]),
+            "moq": rng.choice(["1 pc", "10 kg", None]),
+        }
+        if rng.random() < invalid:
+            quote["unit_price"] = "call us"
+        lines.append(json.dumps(quote))
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def _chunks(data: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+async def run_import(kind: str, data: bytes, fmt: str, workers: int, latency_ms: float, failure_rate: float):
+    db = InMemoryFirestore(latency_ms, write_failure_rate=failure_rate)
+    firebase._db = db
+    bulk_ingest.INGEST_VALIDATION_WORKERS = workers
+    await bulk_ingest.stop_bulk_ingest()
+    # Start the worker processes before timing (a server keeps them between imports)
+    await bulk_ingest.ingest(kind, _chunks(data[:data.index(b"\n") + 1]), fmt, dry_run=True)
+
+    report = await bulk_ingest.ingest(kind, _chunks(data), fmt, max_errors=None)
+    stored = db.count(bulk_ingest.KINDS[kind][1])
+    assert stored == report["written"], (stored, report["written"])
+    assert report["written"] + report["failed"] == report["rows"], report
+    return report
+
+
+async def run_sequential(data: bytes, latency_ms: float) -> float:
+    """Docs/s saving quotes one add() round trip at a time (the old path)."""
+    firebase._db = InMemoryFirestore(latency_ms)
+    quotes = [json.loads(line) for line in data.splitlines()[:SEQUENTIAL_ROWS]]
+    start = time.perf_counter()
+    for quote in quotes:
+        await firebase.save_supplier_quote(quote)
+    return len(quotes) / (time.perf_counter() - start)
+
+
+async def run(rows: int, latency_ms: float, workers: List[int], invalid: float, failure_rate: float):
+    datasets = [
+        ("suppliers", "csv", make_suppliers_csv(rows, invalid)),
+        ("quotes", "jsonl", make_quotes_jsonl(rows, invalid)),
+    ]
+    print(f"{rows} rows per import, {invalid:.0%} invalid/duplicate, Firestore latency {latency_ms}ms, "
+          f"write failure rate {failure_rate:.0%}")
+    print(f"  {'kind':<10} {'workers':>7} {'written':>8} {'rejected':>8} {'seconds':>8} {'rows/s':>8}")
+    try:
+        for kind, fmt, data in datasets:
+            for count in workers:
+                report = await run_import(kind, data, fmt, count, latency_ms, failure_rate)
+                print(f"  {kind:<10} {count:>7} {report['written']:>8} {report['failed']:>8} "
+                      f"{report['elapsed_s']:>8.2f} {report['rows_per_second']:>8}")
+        sequential = await run_sequential(datasets[1][2], latency_ms)
+        print(f"  save_supplier_quote one at a time: {sequential:.0f} docs/s")
+    finally:
+        await bulk_ingest.stop_bulk_ingest()
+        firebase.shutdown_firebase()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingestion benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake Firestore round trip")
+    parser.add_argument("--workers", default="0,1,4", help="validation worker counts (0 = one thread)")
+    parser.add_argument("--invalid", type=float, default=0.02, help="share of invalid or duplicate rows")
+    parser.add_argument("--write-failure-rate", type=float, default=0.0,
+                        help="share of writes failing with UNAVAILABLE (retried)")
+    args = parser.parse_args()
+    workers = [int(w) for w in args.workers.split(",")]
+    asyncio.run(run(args.rows, args.latency_ms, workers, args.invalid, args.write_failure_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Supplier email fan-out benchmark.
+
+Sends one RFQ's supplier emails to a local fake SendGrid server, first one
+request per supplier in sequence (the old behaviour), then through the
+pooled multi-personalization transport.
+
+Usage (from backend/):
+    python -m benchmarks.email_fanout --suppliers 50 --latency-ms 80
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.email_transport import EmailMessage, SendGridTransport, _single_payload
+from benchmarks.fake_sendgrid import FakeSendGrid, serve
+
+
+async def run(suppliers: int, latency_ms: float, port: int):
+    fake = FakeSendGrid(latency_ms)
+    stop = await serve(fake.app, port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    messages = [
+        EmailMessage(
+            to=f"supplier-{i}@example.com",
+            subject="RFQ BT-20240101-ABCD - Quote Request",
+            content=f"Request for Quote: BT-20240101-ABCD\n\nItems for supplier {i}\n" * 5,
+        )
+        for i in range(suppliers)
+    ]
+
+    try:
+        # Before: a fresh client and one serial request per supplier
+        start = time.perf_counter()
+        for message in messages:
+            transport = SendGridTransport("fake-key", base_url=base_url, max_concurrency=1)
+            await transport._post(_single_payload(message))
+            await transport.close()
+        serial_ms = (time.perf_counter() - start) * 1000
+        serial_requests = len(fake.requests)
+
+        # After: pooled client, packed personalizations, concurrent requests
+        fake.requests.clear()
+        transport = SendGridTransport("fake-key", base_url=base_url)
+        start = time.perf_counter()
+        results = await transport.send(messages)
+        pooled_ms = (time.perf_counter() - start) * 1000
+        await transport.close()
+
+        assert all(r is None for r in results), results
+        assert fake.recipients == suppliers
+    finally:
+        await stop()
+
+    print(f"{suppliers} supplier emails, fake SendGrid latency {latency_ms}ms")
+    print(f"  serial  {serial_requests:>4} requests  {serial_ms:>9.1f}ms")
+    print(f"  pooled  {len(fake.requests):>4} requests  {pooled_ms:>9.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supplier email fan-out benchmark")
+    parser.add_argument("--suppliers", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+    asyncio.run(run(args.suppliers, args.latency_ms, args.port))
+
+
+if __name__ == "__main__":
+    main()
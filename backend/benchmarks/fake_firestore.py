@@ -0,0 +1,274 @@
+"""
+In-memory Firestore stand-in for load tests.
+
+Implements the part of the synchronous Admin SDK client the backend uses -
+documents (get/set/update), collection add, where/select/stream queries,
+snapshot listeners and the BulkWriter - over plain dicts, with an optional
+round-trip delay per call so the Firestore thread pool sees realistic
+blocking time.
+
+Install it before the app starts (initialize_firebase leaves it alone when
+no credentials are configured):
+
+    from app.services import firebase
+    firebase._db = InMemoryFirestore(latency_ms=5)
+"""
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.matching import MATERIAL_CAPABILITIES
+
+CERTIFICATIONS = ['ISO9001', 'EN9100', 'AS9100', 'ISO14001', 'ISO13485']
+PRICE_TIERS = ['budget', 'standard', 'premium']
+
+
+class _Snapshot:
+    def __init__(self, doc_id: str, data: Optional[Dict[str, Any]]):
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+
+class _DocumentRef:
+    def __init__(self, db: "InMemoryFirestore", collection: str, doc_id: str):
+        self._db = db
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self, timeout=None) -> _Snapshot:
+        self._db._delay()
+        with self._db._lock:
+            data = self._db._data.get(self._collection, {}).get(self.id)
+            return _Snapshot(self.id, dict(data) if data is not None else None)
+
+    def set(self, data: Dict[str, Any], timeout=None):
+        self._db._delay()
+        self._db._write(self._collection, self.id, dict(data))
+
+    def update(self, data: Dict[str, Any], timeout=None):
+        self._db._delay()
+        with self._db._lock:
+            current = self._db._data.get(self._collection, {}).get(self.id)
+            if current is None:
+                raise KeyError(f"No document to update: {self._collection}/{self.id}")
+            merged = {**current, **data}
+        self._db._write(self._collection, self.id, merged)
+
+
+class _Query:
+    def __init__(self, db: "InMemoryFirestore", collection: str,
+                 filters: Tuple = (), fields: Optional[List[str]] = None):
+        self._db = db
+        self._collection = collection
+        self._filters = filters
+        self._fields = fields
+
+    def where(self, field: str, op: str, value: Any) -> "_Query":
+        return _Query(self._db, self._collection, self._filters + ((field, op, value),), self._fields)
+
+    def select(self, fields: List[str]) -> "_Query":
+        return _Query(self._db, self._collection, self._filters, list(fields))
+
+    def _matches(self, data: Dict[str, Any]) -> bool:
+        for field, op, value in self._filters:
+            actual = data.get(field)
+            if op == '==' and actual != value:
+                return False
+            if op == 'array_contains' and value not in (actual or []):
+                return False
+            if op == 'array_contains_any' and not set(value) & set(actual or []):
+                return False
+            if op == 'in' and actual not in value:
+                return False
+        return True
+
+    def _project(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        if self._fields is None:
+            return dict(data)
+        return {f: data[f] for f in self._fields if f in data}
+
+    def stream(self, timeout=None):
+        self._db._delay()
+        with self._db._lock:
+            documents = list(self._db._data.get(self._collection, {}).items())
+        for doc_id, data in documents:
+            if self._matches(data):
+                yield _Snapshot(doc_id, self._project(data))
+
+    def on_snapshot(self, callback: Callable):
+        """Deliver the current result set, then every later change, on a background thread."""
+        return self._db._listen(self, callback)
+
+
+class _Collection(_Query):
+    def __init__(self, db: "InMemoryFirestore", name: str):
+        super().__init__(db, name)
+
+    def document(self, doc_id: Optional[str] = None) -> _DocumentRef:
+        return _DocumentRef(self._db, self._collection, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data: Dict[str, Any], timeout=None):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+
+class _Watch:
+    def __init__(self, db: "InMemoryFirestore", query: _Query, callback: Callable):
+        self._db = db
+        self.query = query
+        self.callback = callback
+        self.is_active = True
+
+    def unsubscribe(self):
+        self.is_active = False
+        with self._db._lock:
+            if self in self._db._watches:
+                self._db._watches.remove(self)
+
+
+class _BulkWriter:
+    """
+    BulkWriter stand-in: set() writes committed 20 at a time, commits in
+    parallel on a thread pool, one round trip each. Not rate limited. With
+    `write_failure_rate` on the client, writes fail with UNAVAILABLE at that
+    rate and are retried when the error callback says so.
+    """
+    BATCH_SIZE = 20
+
+    def __init__(self, db: "InMemoryFirestore", max_workers: int = 16):
+        self._db = db
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bulk-writer")
+        self._operations: List[SimpleNamespace] = []
+        self._futures = []
+        self._on_result: Callable = lambda reference, result, writer: None
+        self._on_error: Callable = lambda failure, writer: False
+
+    def on_write_result(self, callback: Callable):
+        self._on_result = callback
+
+    def on_write_error(self, callback: Callable):
+        self._on_error = callback
+
+    def set(self, reference: _DocumentRef, document_data: Dict[str, Any], merge=False):
+        self._operations.append(SimpleNamespace(reference=reference, document_data=document_data, attempts=0))
+        if len(self._operations) >= self.BATCH_SIZE:
+            self._send()
+
+    def _send(self):
+        operations, self._operations = self._operations, []
+        self._futures.append(self._pool.submit(self._commit, operations))
+
+    def _commit(self, operations: List[SimpleNamespace]):
+        while operations:
+            self._db._delay()
+            retry = []
+            for op in operations:
+                if self._db.write_failure_rate and random.random() < self._db.write_failure_rate:
+                    failure = SimpleNamespace(operation=op, code=14, message="injected failure", attempts=op.attempts)
+                    if self._on_error(failure, self):
+                        op.attempts += 1
+                        retry.append(op)
+                    continue
+                self._db._write(op.reference._collection, op.reference.id, dict(op.document_data))
+                self._on_result(op.reference, None, self)
+            operations = retry
+
+    def close(self):
+        if self._operations:
+            self._send()
+        for future in self._futures:
+            future.result()
+        self._pool.shutdown()
+
+
+def _change(kind: str, doc_id: str, data: Optional[Dict[str, Any]]):
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=_Snapshot(doc_id, data))
+
+
+class InMemoryFirestore:
+    """Dict-backed stand-in for `firestore.client()`."""
+
+    def __init__(self, latency_ms: float = 0.0, write_failure_rate: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.write_failure_rate = write_failure_rate
+        self._data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+        self._watches: List[_Watch] = []
+        self.calls = 0
+
+    def _delay(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def collection(self, name: str) -> _Collection:
+        return _Collection(self, name)
+
+    def bulk_writer(self, options=None) -> _BulkWriter:
+        return _BulkWriter(self)
+
+    def _write(self, collection: str, doc_id: str, data: Dict[str, Any]):
+        with self._lock:
+            existed = doc_id in self._data.get(collection, {})
+            self._data.setdefault(collection, {})[doc_id] = data
+            watches = [w for w in self._watches if w.query._collection == collection]
+        for watch in watches:
+            if watch.query._matches(data):
+                change = _change('MODIFIED' if existed else 'ADDED', doc_id, watch.query._project(data))
+            elif existed:
+                change = _change('REMOVED', doc_id, None)
+            else:
+                continue
+            self._notify(watch, [change])
+
+    def _listen(self, query: _Query, callback: Callable) -> _Watch:
+        watch = _Watch(self, query, callback)
+        with self._lock:
+            self._watches.append(watch)
+            initial = [
+                _change('ADDED', doc_id, query._project(data))
+                for doc_id, data in self._data.get(query._collection, {}).items()
+                if query._matches(data)
+            ]
+        self._notify(watch, initial)
+        return watch
+
+    def _notify(self, watch: _Watch, changes: List[Any]):
+        # The real SDK calls listeners from its own thread
+        threading.Thread(target=watch.callback, args=(None, changes, None), daemon=True).start()
+
+    def count(self, collection: str) -> int:
+        with self._lock:
+            return len(self._data.get(collection, {}))
+
+
+def seed_suppliers(db: InMemoryFirestore, count: int, seed: int = 7):
+    """Add `count` active suppliers with capabilities drawn from the matching table."""
+    rng = random.Random(seed)
+    capability_sets = list(MATERIAL_CAPABILITIES.values())
+    suppliers = db._data.setdefault('suppliers', {})
+    for i in range(count):
+        capabilities = set()
+        for caps in rng.sample(capability_sets, rng.randint(1, 4)):
+            capabilities.update(caps)
+        supplier_id = f"sup_{i:06d}"
+        suppliers[supplier_id] = {
+            'id': supplier_id,
+            'name': f"Supplier {i}",
+            'email': f"supplier-{i}@example.com",
+            'active': True,
+            'capabilities': sorted(capabilities),
+            'certifications': rng.sample(CERTIFICATIONS, rng.randint(0, 3)),
+            'avg_lead_time': rng.choice([7, 10, 14, 21, 28, 42]),
+            'price_tier': rng.choice(PRICE_TIERS),
+            'reliability_score': round(rng.uniform(0.6, 1.0), 3),
+        }
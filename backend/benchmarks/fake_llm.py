@@ -0,0 +1,134 @@
+"""
+Fake OpenAI-compatible chat completions server for tests and benchmarks.
+
+Answers POST /v1/chat/completions, plain or streamed (`stream: true`), with
+a canned reply of `--tokens` tokens: the first after `--first-token-ms`, the
+rest `--token-ms` apart (a plain request waits for the whole reply). Point
+the backend at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any
+OPENAI_API_KEY.
+
+Usage (from backend/):
+    python -m benchmarks.fake_llm --port 8026 --first-token-ms 300 --token-ms 20
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+REPLY_WORDS = (
+    "Tungsten plate is available in thicknesses from 0.1 to 50 mm with purity "
+    "above 99.95 percent. Typical lead time is two to three weeks. Would you "
+    "like to add it to your RFQ basket for a quote?"
+).split()
+
+
+class FakeLLM:
+    """In-process fake; `app` is an ASGI application."""
+
+    def __init__(self, first_token_ms: float = 300.0, token_ms: float = 20.0, tokens: int = 40):
+        self.first_token = first_token_ms / 1000
+        self.token_interval = token_ms / 1000
+        self.tokens = tokens
+        self.requests = 0
+        self.streams = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = Starlette(routes=[
+            Route("/v1/chat/completions", self._completions, methods=["POST"]),
+            Route("/stats", self._stats, methods=["GET"]),
+        ])
+
+    def _token(self, i: int) -> str:
+        return REPLY_WORDS[i % len(REPLY_WORDS)] + " "
+
+    async def _completions(self, request: Request):
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            return JSONResponse({"error": {"message": "unauthorized"}}, status_code=401)
+        payload = await request.json()
+        model = payload.get("model", "fake")
+        self.requests += 1
+        if payload.get("stream"):
+            self.streams += 1
+            return StreamingResponse(self._stream(model), media_type="text/event-stream")
+
+        self._enter()
+        try:
+            await asyncio.sleep(self.first_token + self.token_interval * (self.tokens - 1))
+        finally:
+            self.in_flight -= 1
+        content = "".join(self._token(i) for i in range(self.tokens)).strip()
+        return JSONResponse({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": self.tokens, "total_tokens": 100 + self.tokens},
+        })
+
+    async def _stream(self, model: str):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        def chunk(delta, finish_reason=None) -> str:
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        self._enter()
+        try:
+            await asyncio.sleep(self.first_token)
+            yield chunk({"role": "assistant", "content": ""})
+            for i in range(self.tokens):
+                if i:
+                    await asyncio.sleep(self.token_interval)
+                yield chunk({"content": self._token(i)})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+        finally:
+            self.in_flight -= 1
+
+    def _enter(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "streams": self.streams,
+            "max_in_flight": self.max_in_flight,
+        }
+
+    async def _stats(self, request: Request):
+        return JSONResponse(self.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server")
+    parser.add_argument("--port", type=int, default=8026)
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    parser.add_argument("--tokens", type=int, default=40)
+    args = parser.parse_args()
+
+    fake = FakeLLM(args.first_token_ms, args.token_ms, args.tokens)
+    uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Fake SendGrid v3 server for tests and benchmarks.
+
+Accepts POST /v3/mail/send, records every request, and answers 202 after a
+configurable latency. Point the backend at it with
+SENDGRID_API_URL=http://127.0.0.1:<port> and any SENDGRID_API_KEY.
+
+Usage (from backend/):
+    python -m benchmarks.fake_sendgrid --port 8025 --latency-ms 80
+"""
+import argparse
+import asyncio
+from typing import List, Dict, Any
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class FakeSendGrid:
+    """In-process fake; `app` is an ASGI application."""
+
+    def __init__(self, latency_ms: float = 0.0, fail_status: int = 0):
+        self.latency = latency_ms / 1000
+        self.fail_status = fail_status
+        self.requests: List[Dict[str, Any]] = []
+        self.app = Starlette(routes=[
+            Route("/v3/mail/send", self._send, methods=["POST"]),
+            Route("/stats", self._stats, methods=["GET"]),
+        ])
+
+    @property
+    def recipients(self) -> int:
+        return sum(len(r.get('personalizations', [])) for r in self.requests)
+
+    async def _send(self, request: Request):
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            return JSONResponse({"errors": [{"message": "unauthorized"}]}, status_code=401)
+        payload = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_status:
+            return JSONResponse({"errors": [{"message": "fake failure"}]}, status_code=self.fail_status)
+        self.requests.append(payload)
+        return Response(status_code=202)
+
+    async def _stats(self, request: Request):
+        return JSONResponse({"requests": len(self.requests), "recipients": self.recipients})
+
+
+async def serve(app, port: int):
+    """
+    Start an ASGI app on 127.0.0.1:port in the running loop.
+
+    Returns an async stop() callable.
+    """
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", lifespan="off",
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    async def stop():
+        server.should_exit = True
+        await task
+
+    return stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake SendGrid v3 server")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail-status", type=int, default=0,
+                        help="answer every send with this status (e.g. 500)")
+    args = parser.parse_args()
+
+    fake = FakeSendGrid(args.latency_ms, args.fail_status)
+    uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
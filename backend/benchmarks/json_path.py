@@ -0,0 +1,144 @@
+"""
+JSON request/response path benchmark.
+
+Posts a synthetic 500-item RFQ through two otherwise identical ASGI routes -
+FastAPI's default path (body parameter + response_model) and the opt-in fast
+path from app.services.fast_json (json_body + model_response) - and times the
+full request. Also times the stored-RFQ read path: a Firestore-style dict
+encoded with jsonable_encoder + stdlib json against FastJSONResponse.
+
+Usage (from backend/):
+    python -m benchmarks.json_path
+    python -m benchmarks.json_path --items 500 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi.encoders import jsonable_encoder
+
+from app.models.rfq import RFQSession, RFQStatus, RFQSubmitRequest
+from app.services.fast_json import FastJSONResponse, json_body, model_response
+
+MATERIALS = ['Tungsten', 'Molybdenum', 'TZM', 'Tantalum', 'Niobium', 'W-Re', 'Inconel 718', 'Ti6Al4V']
+FORMS = ['plate', 'rod', 'wire', 'powder', 'sheet', 'crucible']
+
+
+def make_rfq(items: int) -> Dict[str, Any]:
+    """A submit payload shaped like the frontend basket."""
+    return {
+        'session_id': 'bench-session',
+        'contact_email': 'buyer@example.com',
+        'design_files': [f'designs/part_{i}.step' for i in range(5)],
+        'items': [
+            {
+                'id': f'item_{i}',
+                'material': MATERIALS[i % len(MATERIALS)],
+                'form': FORMS[i % len(FORMS)],
+                'specification': f'ASTM B{380 + i % 20}, 99.95% purity, {1 + i % 10}mm thick',
+                'quantity': f'{1 + i % 50} pcs',
+                'notes': 'Surface finish Ra 0.8, certificate of conformity required',
+                'added_at': '2024-03-01T12:00:00Z',
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def _session(request: RFQSubmitRequest) -> RFQSession:
+    return RFQSession(
+        id=request.session_id,
+        items=request.items,
+        status=RFQStatus.SUBMITTED,
+        contact_email=request.contact_email,
+        design_files=request.design_files,
+    )
+
+
+def make_app() -> FastAPI:
+    """Both paths side by side; each echoes the RFQSession it built."""
+    app = FastAPI()
+
+    @app.post('/default', response_model=RFQSession)
+    async def default_path(request: RFQSubmitRequest):
+        return _session(request)
+
+    @app.post('/fast')
+    async def fast_path(request: RFQSubmitRequest = Depends(json_body(RFQSubmitRequest))):
+        return model_response(_session(request))
+
+    return app
+
+
+async def time_requests(send: Callable, count: int) -> List[float]:
+    await send()  # warm-up (builds validators / serializers)
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await send()
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    return sorted(timings)
+
+
+def time_calls(fn: Callable, count: int) -> List[float]:
+    fn()
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def report(label: str, timings: List[float]) -> float:
+    p50 = statistics.median(timings)
+    print(f"  {label:28} p50 {p50:>8.2f}ms   p99 {timings[int(len(timings) * 0.99)]:>8.2f}ms")
+    return p50
+
+
+async def run(args):
+    payload = make_rfq(args.items)
+    body = json.dumps(payload).encode()
+    headers = {'content-type': 'application/json'}
+    transport = httpx.ASGITransport(app=make_app())
+
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        default_body = (await client.post('/default', content=body, headers=headers)).json()
+        fast_body = (await client.post('/fast', content=body, headers=headers)).json()
+        assert default_body == fast_body, "paths disagree"
+
+        print(f"POST {args.items}-item RFQ ({len(body) / 1024:.0f} KB in), {args.requests} requests")
+        default = report("default (response_model)", await time_requests(
+            lambda: client.post('/default', content=body, headers=headers), args.requests))
+        fast = report("fast (json_body)", await time_requests(
+            lambda: client.post('/fast', content=body, headers=headers), args.requests))
+        print(f"  speedup {default / fast:.1f}x")
+
+    # A stored RFQ as Firestore returns it: plain dicts with datetimes
+    stored = {**payload, 'status': 'submitted', 'created_at': datetime.now(timezone.utc)}
+    for item in stored['items']:
+        item['added_at'] = datetime.now(timezone.utc)
+    print(f"GET stored {args.items}-item RFQ, encode only")
+    default = report("jsonable_encoder + json", time_calls(
+        lambda: json.dumps(jsonable_encoder(stored)).encode(), args.requests))
+    fast = report("FastJSONResponse", time_calls(
+        lambda: FastJSONResponse(stored).body, args.requests))
+    print(f"  speedup {default / fast:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Run app.main:app against the in-memory Firestore, for load tests.
+
+Started as a subprocess by benchmarks.load_test, which also points the app
+at the fake LLM and SendGrid servers through the environment. Can be run on
+its own to poke at a seeded local server:
+
+    python -m benchmarks.load_server --port 8030 --suppliers 2000
+"""
+import argparse
+
+import uvicorn
+
+from app.services import firebase
+from benchmarks.fake_firestore import InMemoryFirestore, seed_suppliers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend server on an in-memory Firestore")
+    parser.add_argument("--port", type=int, default=8030)
+    parser.add_argument("--suppliers", type=int, default=2000)
+    parser.add_argument("--firestore-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    db = InMemoryFirestore(args.firestore_latency_ms)
+    seed_suppliers(db, args.suppliers)
+    # No credentials are configured, so initialize_firebase leaves this in place
+    firebase._db = db
+
+    from app.main import app
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
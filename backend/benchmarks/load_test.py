@@ -0,0 +1,450 @@
+"""
+End-to-end load test.
+
+Starts app.main:app in a subprocess on the in-memory Firestore
+(benchmarks.load_server), pointed at a fake OpenAI-compatible LLM and a fake
+SendGrid served from this process, then drives a mix of chat, streamed chat,
+search, material, RFQ submit and RFQ status requests at a target rate.
+
+Arrivals are open-loop (Poisson at --rps) and latency is measured from each
+request's scheduled start, so a slow server shows up as latency rather than
+as a lower offered rate. Requests beyond --max-in-flight are counted as
+dropped. Reports throughput and p50/p95/p99 per route and saves everything,
+with the commit and server-side stats, as JSON; --compare prints the change
+against an earlier result from the same machine.
+
+By default the chat response cache and the per-client rate limit are off, so
+every chat reaches the fake LLM (--llm-cache / --rate-limit turn them on).
+
+Usage (from backend/):
+    python -m benchmarks.load_test --rps 50 --duration 30
+    python -m benchmarks.load_test --rps 50 --compare benchmarks/results/load-<commit>-<time>.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.services.material_catalog import get_catalog
+from benchmarks.fake_llm import FakeLLM
+from benchmarks.fake_sendgrid import FakeSendGrid, serve
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+DEFAULT_MIX = "chat=2,chat_stream=1,search=4,material=1,rfq_submit=1,rfq_status=1"
+RFQ_MATERIALS = [
+    'Tungsten plate', 'Molybdenum rod', 'TZM sheet', 'Tantalum crucible', 'Niobium wire',
+    'Rhenium powder', 'Inconel 718 bar', 'Ti6Al4V plate', 'Hastelloy C-276 tube', 'Zirconium foil',
+]
+CHAT_QUESTIONS = [
+    "What is the melting point of {}?",
+    "Do you have {} in stock for a prototype run?",
+    "Which thicknesses of {} can you supply?",
+    "I need a quote for {} parts, what lead time should I expect?",
+    "Is {} suitable for vacuum furnace components?",
+]
+
+
+class Workload:
+    """Builds randomized requests for each route."""
+
+    def __init__(self, rng: random.Random, clients: int):
+        catalog = get_catalog()
+        self.rng = rng
+        self.material_ids = list(catalog.materials)
+        self.material_names = [m.get('name', mid) for mid, m in catalog.materials.items()]
+        self.clients = [f"10.0.{i // 250}.{i % 250 + 1}" for i in range(clients)]
+        self.rfq_ids: List[str] = []
+
+    def headers(self) -> Dict[str, str]:
+        return {"X-Forwarded-For": self.rng.choice(self.clients)}
+
+    def _typo(self, word: str) -> str:
+        if len(word) < 5:
+            return word
+        i = self.rng.randrange(1, len(word) - 1)
+        return word[:i] + word[i + 1:]
+
+    def chat_body(self) -> Dict[str, Any]:
+        # A unique suffix keeps the LLM cache (when enabled) from answering everything
+        question = self.rng.choice(CHAT_QUESTIONS).format(self.rng.choice(self.material_names))
+        return {"messages": [{"role": "user", "content": f"{question} (ref {self.rng.randrange(10**6)})"}]}
+
+    def search_params(self) -> Dict[str, Any]:
+        name = self.rng.choice(self.material_names)
+        query = self._typo(name) if self.rng.random() < 0.3 else name
+        return {"q": query, "limit": 10}
+
+    def rfq_body(self) -> Dict[str, Any]:
+        return {
+            "session_id": f"load-{uuid.uuid4().hex[:12]}",
+            "contact_email": "buyer@example.com",
+            "items": [
+                {
+                    "id": f"item-{i}",
+                    "material": self.rng.choice(RFQ_MATERIALS),
+                    "quantity": f"{self.rng.randint(1, 500)} pcs",
+                }
+                for i in range(self.rng.randint(1, 5))
+            ],
+        }
+
+    def request(self, route: str) -> Tuple[str, str, Dict[str, Any]]:
+        """(method, path, httpx kwargs) for one request on `route`."""
+        headers = self.headers()
+        if route == "chat":
+            return "POST", "/api/v1/chat/", {"json": self.chat_body(), "headers": headers}
+        if route == "chat_stream":
+            return "POST", "/api/v1/chat/stream", {"json": self.chat_body(), "headers": headers}
+        if route == "search":
+            return "GET", "/api/v1/chat/search", {"params": self.search_params(), "headers": headers}
+        if route == "material":
+            return "GET", f"/api/v1/chat/materials/{self.rng.choice(self.material_ids)}", {"headers": headers}
+        if route == "rfq_submit":
+            return "POST", "/api/v1/rfq/submit", {"json": self.rfq_body(), "headers": headers}
+        if route == "rfq_status":
+            rfq_id = self.rng.choice(self.rfq_ids) if self.rfq_ids else "missing"
+            return "GET", f"/api/v1/rfq/{rfq_id}", {"headers": headers}
+        raise ValueError(f"Unknown route: {route}")
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.first_byte: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.dropped = 0
+
+    def error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of `values` (q in 0..100), in milliseconds."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Rank ceil(q% of n); round() would round half to even and skip ranks
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 2)
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+async def _one(client: httpx.AsyncClient, workload: Workload, route: str, scheduled: float,
+               stats: RouteStats, record: bool):
+    method, path, kwargs = workload.request(route)
+    try:
+        if route == "chat_stream":
+            async with client.stream(method, path, **kwargs) as response:
+                first = None
+                async for _ in response.aiter_bytes():
+                    if first is None:
+                        first = time.perf_counter()
+                status = response.status_code
+        else:
+            response = await client.request(method, path, **kwargs)
+            first = None
+            status = response.status_code
+    except httpx.HTTPError as e:
+        if record:
+            stats.error(type(e).__name__)
+        return
+    done = time.perf_counter()
+
+    ok = status < 400 or (route == "rfq_status" and status == 404 and not workload.rfq_ids)
+    if route == "rfq_submit" and status == 200:
+        workload.rfq_ids.append(response.json()["rfq_id"])
+        del workload.rfq_ids[:-1000]
+    if not record:
+        return
+    if not ok:
+        stats.error(str(status))
+        return
+    stats.latencies.append(done - scheduled)
+    if first is not None:
+        stats.first_byte.append(first - scheduled)
+
+
+async def drive(client: httpx.AsyncClient, workload: Workload, mix: Dict[str, float], rps: float,
+                duration: float, max_in_flight: int, stats: Dict[str, RouteStats], record: bool) -> float:
+    """Offer Poisson traffic for `duration` seconds; returns the elapsed time until the last response."""
+    routes, weights = list(mix), list(mix.values())
+    rng = workload.rng
+    tasks = set()
+    start = time.perf_counter()
+    scheduled = start
+    while scheduled - start < duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        route = rng.choices(routes, weights)[0]
+        if len(tasks) >= max_in_flight:
+            if record:
+                stats[route].dropped += 1
+        else:
+            task = asyncio.create_task(_one(client, workload, route, scheduled, stats[route], record))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        scheduled += rng.expovariate(rps)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _start_server(args, llm_port: int, sendgrid_port: int, workdir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.pop("ANTHROPIC_API_KEY", None)
+    env.pop("FIREBASE_CREDENTIALS_PATH", None)
+    env.update({
+        "OPENAI_API_KEY": "fake-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "SENDGRID_API_KEY": "fake-key",
+        "SENDGRID_API_URL": f"http://127.0.0.1:{sendgrid_port}",
+        "EMAIL_OUTBOX_PATH": os.path.join(workdir, "email_outbox.db"),
+        "DESIGN_STORAGE_DIR": os.path.join(workdir, "uploads"),
+        "PYTHONUNBUFFERED": "1",
+    })
+    if not args.llm_cache:
+        env["LLM_CACHE_ENABLED"] = "false"
+    if not args.rate_limit:
+        env["CHAT_RATE_PER_MINUTE"] = "0"
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.load_server",
+            "--port", str(args.port),
+            "--suppliers", str(args.suppliers),
+            "--firestore-latency-ms", str(args.firestore_latency_ms),
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=open(os.path.join(workdir, "server.log"), "w"),
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def _stop_server(server: subprocess.Popen):
+    # SIGINT lets uvicorn run the lifespan shutdown (drains the pipeline and outbox)
+    server.send_signal(signal.SIGINT)
+    try:
+        server.wait(30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def summarize(stats: Dict[str, RouteStats], elapsed: float) -> Dict[str, Any]:
+    routes = {}
+    for route, s in stats.items():
+        entry = {
+            "requests": len(s.latencies) + sum(s.errors.values()),
+            "ok": len(s.latencies),
+            "errors": s.errors,
+            "dropped": s.dropped,
+            "throughput_rps": round(len(s.latencies) / elapsed, 2),
+            "p50_ms": percentile(s.latencies, 50),
+            "p95_ms": percentile(s.latencies, 95),
+            "p99_ms": percentile(s.latencies, 99),
+            "max_ms": percentile(s.latencies, 100),
+        }
+        if s.first_byte:
+            entry["first_byte_p50_ms"] = percentile(s.first_byte, 50)
+            entry["first_byte_p95_ms"] = percentile(s.first_byte, 95)
+        routes[route] = entry
+    everything = [latency for s in stats.values() for latency in s.latencies]
+    totals = {
+        "requests": sum(r["requests"] for r in routes.values()),
+        "ok": len(everything),
+        "errors": sum(sum(s.errors.values()) for s in stats.values()),
+        "dropped": sum(s.dropped for s in stats.values()),
+        "throughput_rps": round(len(everything) / elapsed, 2),
+        "p50_ms": percentile(everything, 50),
+        "p95_ms": percentile(everything, 95),
+        "p99_ms": percentile(everything, 99),
+        "elapsed_s": round(elapsed, 2),
+    }
+    return {"totals": totals, "routes": routes}
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+
+def print_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    config = result["config"]
+    print(f"{config['rps']} rps offered for {config['duration']}s, commit {result['commit'] or 'unknown'}")
+    print(f"  {'route':<12} {'ok':>7} {'err':>5} {'drop':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(result["routes"].items()) + [("total", result["totals"])]
+    for route, r in rows:
+        errors = r["errors"] if isinstance(r["errors"], int) else sum(r["errors"].values())
+        print(f"  {route:<12} {r['ok']:>7} {errors:>5} {r['dropped']:>5} {r['throughput_rps']:>8.1f}"
+              f" {_fmt(r['p50_ms'])} {_fmt(r['p95_ms'])} {_fmt(r['p99_ms'])}")
+        if baseline is None:
+            continue
+        before = baseline["totals"] if route == "total" else baseline["routes"].get(route)
+        if not before:
+            continue
+        deltas = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before.get(key) and r.get(key) is not None:
+                deltas.append(f"{key} {100 * (r[key] - before[key]) / before[key]:+.1f}%")
+        print(f"  {'':<12} vs {baseline.get('commit') or 'baseline'}: " + ", ".join(deltas))
+
+
+async def run(args) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    workload = Workload(random.Random(args.seed), args.clients)
+
+    fake_llm = FakeLLM(args.llm_first_token_ms, args.llm_token_ms, args.llm_tokens)
+    fake_sendgrid = FakeSendGrid(args.sendgrid_latency_ms)
+    stop_llm = await serve(fake_llm.app, args.llm_port)
+    stop_sendgrid = await serve(fake_sendgrid.app, args.sendgrid_port)
+
+    workdir = tempfile.mkdtemp(prefix="bimo-load-")
+    server = _start_server(args, args.llm_port, args.sendgrid_port, workdir)
+    client = httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.port}",
+        timeout=httpx.Timeout(60.0),
+        limits=httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight),
+    )
+    try:
+        await _wait_ready(client, server)
+        if args.warmup > 0:
+            warmup_stats = {route: RouteStats() for route in mix}
+            await drive(client, workload, mix, args.rps, args.warmup, args.max_in_flight, warmup_stats, False)
+
+        stats = {route: RouteStats() for route in mix}
+        elapsed = await drive(client, workload, mix, args.rps, args.duration, args.max_in_flight, stats, True)
+        health = (await client.get("/health")).json()
+    except Exception:
+        print(f"Server log: {os.path.join(workdir, 'server.log')}")
+        raise
+    finally:
+        await client.aclose()
+        _stop_server(server)
+        await stop_llm()
+        await stop_sendgrid()
+
+    services = health.get("services", {})
+    return {
+        "benchmark": "load_test",
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": {"platform": platform.platform(), "cpus": os.cpu_count(), "python": platform.python_version()},
+        "config": {
+            "rps": args.rps,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": mix,
+            "max_in_flight": args.max_in_flight,
+            "clients": args.clients,
+            "suppliers": args.suppliers,
+            "firestore_latency_ms": args.firestore_latency_ms,
+            "llm_first_token_ms": args.llm_first_token_ms,
+            "llm_token_ms": args.llm_token_ms,
+            "llm_tokens": args.llm_tokens,
+            "sendgrid_latency_ms": args.sendgrid_latency_ms,
+            "llm_cache": args.llm_cache,
+            "rate_limit": args.rate_limit,
+            "seed": args.seed,
+        },
+        **summarize(stats, elapsed),
+        "server": {
+            "status": health.get("status"),
+            "chat_admission": services.get("chat_admission"),
+            "llm_connections": services.get("llm_connections"),
+            "rfq_pipeline": services.get("rfq_pipeline"),
+            "email_outbox": services.get("email_outbox"),
+        },
+        "fakes": {
+            "llm": fake_llm.stats(),
+            "sendgrid": {"requests": len(fake_sendgrid.requests), "recipients": fake_sendgrid.recipients},
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test with local stand-ins")
+    parser.add_argument("--rps", type=float, default=50.0, help="offered request rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds first")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route weights, e.g. search=4,chat=1")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=100, help="distinct client addresses")
+    parser.add_argument("--suppliers", type=int, default=2000)
+    parser.add_argument("--firestore-latency-ms", type=float, default=5.0)
+    parser.add_argument("--llm-first-token-ms", type=float, default=300.0)
+    parser.add_argument("--llm-token-ms", type=float, default=20.0)
+    parser.add_argument("--llm-tokens", type=int, default=40)
+    parser.add_argument("--sendgrid-latency-ms", type=float, default=80.0)
+    parser.add_argument("--llm-cache", action="store_true", help="keep the chat response cache on")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the per-client chat rate limit on")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8030)
+    parser.add_argument("--llm-port", type=int, default=8026)
+    parser.add_argument("--sendgrid-port", type=int, default=8025)
+    parser.add_argument("--output", help="result file (default benchmarks/results/load-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"load-{result['commit'] or 'unknown'}{'-dirty' if result['dirty'] else ''}"
+        f"-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(result, baseline)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
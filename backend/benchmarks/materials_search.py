@@ -0,0 +1,89 @@
+"""
+Materials search benchmark.
+
+Times loading the compiled catalog snapshot against compiling it from the
+frontend sources, then indexes its materials and products (optionally
+replicated to simulate a larger catalog) and times a mix of exact,
+prefix, typo and sentence queries.
+
+Usage (from backend/):
+    python -m benchmarks.materials_search
+    python -m benchmarks.materials_search --copies 50 --queries 20000
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, Any, List, Tuple
+
+from app.services.material_catalog import (
+    CATALOG_SNAPSHOT_PATH,
+    SEARCH_FIELD_WEIGHTS,
+    CatalogSnapshot,
+    _material_fields,
+    _product_fields,
+)
+from app.services.search_index import SearchIndex
+
+QUERIES = [
+    "tungsten", "tungstn", "molybdneum", "tung", "TZM", "W-Re", "Ti6Al4V",
+    "x-ray targets", "sputering target", "rocket nozzle", "high entropy alloy",
+    "What is the melting point of tantalum?", "niobium superconducting wire",
+    "Can I get a quote?", "inconel 718 powder", "hafnium",
+]
+
+
+def make_catalog(catalog: CatalogSnapshot, copies: int) -> List[Tuple[Dict[str, Any], Dict[str, str]]]:
+    base = ([(m, _material_fields(m)) for m in catalog.materials.values()]
+            + [(p, _product_fields(p)) for p in catalog.products])
+    documents = []
+    for copy in range(copies):
+        for payload, fields in base:
+            documents.append(({**payload, "id": f"{payload['id']}#{copy}"}, fields))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--copies", type=int, default=1,
+                        help="replicate the catalog to simulate a larger one")
+    parser.add_argument("--queries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = CatalogSnapshot.from_bytes(CATALOG_SNAPSHOT_PATH.read_bytes(), str(CATALOG_SNAPSHOT_PATH))
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    CatalogSnapshot.from_sources()
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    documents = make_catalog(catalog, args.copies)
+    start = time.perf_counter()
+    index = SearchIndex(documents, SEARCH_FIELD_WEIGHTS)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Warm the expansion cache once, then time steady-state queries
+    for query in QUERIES:
+        index.search(query)
+    timings = []
+    for i in range(args.queries):
+        query = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        index.search(query, limit=10)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+
+    print(f"catalog {catalog.version}: {len(catalog.materials)} materials, {len(catalog.products)} products")
+    print(f"  snapshot load {load_ms:>10.1f}ms")
+    print(f"  compile       {compile_ms:>10.1f}ms  (from src/data, no snapshot)")
+    print(f"{len(index)} documents, {args.queries} queries")
+    print(f"  index build   {build_ms:>10.1f}ms")
+    print(f"  query p50     {statistics.median(timings):>10.1f}us")
+    print(f"  query p99     {timings[int(len(timings) * 0.99)]:>10.1f}us")
+    print()
+    for query in QUERIES:
+        total, hits = index.search(query, limit=3)
+        print(f"  {query!r:45} {total:>4}  {[hit.document['id'] for hit in hits]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Scaling benchmarks for supplier matching and materials lookup.
+
+Calls the service functions themselves - match_suppliers_for_rfq,
+get_recommended_suppliers, search_materials and get_materials_by_capability -
+over synthetic data of growing size, and reports the median time per call and
+the peak memory allocated during one call (tracemalloc, which also sees NumPy
+buffers), plus the one-off cost of building the scoring engine.
+
+- Supplier catalogs: 1k-1M suppliers. Capability popularity and the number
+  of capabilities per supplier are skewed (most suppliers cover one or two
+  material families), certifications follow rough industry rates.
+- RFQs: 1-1000 items, materials drawn with a popularity skew, some not in
+  the capability table.
+- Materials catalogs: the real catalog replicated and varied (1x-1000x).
+
+Results are saved as JSON with the commit; --compare prints the change
+against an earlier run, so a new index or engine can be measured against
+the current implementation on the same machine.
+
+Usage (from backend/):
+    python -m benchmarks.scaling
+    python -m benchmarks.scaling --suppliers 1000,10000 --items 1,100 --copies 1,10
+    python -m benchmarks.scaling --compare benchmarks/results/scaling-<commit>-<time>.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.models.rfq import RFQItem, RFQSession
+from app.services import capability_index, material_catalog, scoring, supplier_catalog
+from app.services.material_catalog import (
+    NAME_FIELD_WEIGHTS,
+    SEARCH_FIELD_WEIGHTS,
+    CatalogSnapshot,
+    _material_fields,
+    _product_fields,
+)
+from app.services.matching import MATERIAL_CAPABILITIES, get_recommended_suppliers, match_suppliers_for_rfq
+from app.services.materials import get_materials_by_capability, search_materials
+from app.services.search_index import SearchIndex
+from benchmarks.load_test import RESULTS_DIR, _git
+
+DEFAULT_SUPPLIERS = "1000,10000,100000,1000000"
+DEFAULT_ITEMS = "1,10,100,1000"
+DEFAULT_COPIES = "1,10,100,1000"
+
+# Rough share of suppliers holding each certification
+CERTIFICATION_RATES = {'ISO9001': 0.7, 'ISO14001': 0.3, 'EN9100': 0.2, 'AS9100': 0.15, 'ISO13485': 0.05}
+LEAD_TIMES = [5, 7, 10, 14, 14, 21, 21, 28, 45, 60]
+RFQ_MATERIALS = [
+    'Tungsten plate', 'Molybdenum rod', 'Tantalum crucible', 'Titanium Ti6Al4V bar', 'Inconel 718 sheet',
+    'Niobium wire', 'Rhenium powder', 'Nickel 200 foil', 'Hastelloy C-276 tube', 'Zirconium 702 plate',
+    'Copper C101 bar', 'Stellite 6 rod', 'Stainless steel 316L', 'Aluminium 6061 plate',
+]
+SEARCH_QUERIES = [
+    "tungsten", "tungstn", "molybdneum", "tantalum", "TZM", "W-Re", "Ti6Al4V",
+    "x-ray targets", "sputering target", "rocket nozzle", "niobium superconducting wire",
+    "What is the melting point of tantalum?", "inconel 718 powder", "hafnium",
+]
+URGENCIES = ['standard', 'rush', 'flexible', None]
+
+
+def _zipf_choice(rng: random.Random, values: List[Any], s: float = 1.1) -> Any:
+    weights = [1 / (rank + 1) ** s for rank in range(len(values))]
+    return rng.choices(values, weights)[0]
+
+
+def make_suppliers(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic active suppliers with skewed capability and certification mixes."""
+    rng = random.Random(seed)
+    families = list(MATERIAL_CAPABILITIES.values())
+    # Share identical capability / certification lists between suppliers to keep 1M affordable
+    capability_lists: Dict[frozenset, List[str]] = {}
+    certification_lists: Dict[frozenset, List[str]] = {}
+    suppliers = []
+    for i in range(count):
+        caps = set()
+        for _ in range(min(len(families), int(rng.paretovariate(1.5)))):
+            caps.update(_zipf_choice(rng, families))
+        key = frozenset(caps)
+        certs = frozenset(c for c, rate in CERTIFICATION_RATES.items() if rng.random() < rate)
+        suppliers.append({
+            'id': f'sup_{i:07d}',
+            'name': f'Supplier {i}',
+            'email': f'supplier-{i}@example.com',
+            'capabilities': capability_lists.setdefault(key, sorted(key)),
+            'certifications': certification_lists.setdefault(certs, sorted(certs)),
+            'avg_lead_time': rng.choice(LEAD_TIMES),
+            'price_tier': rng.choices(['budget', 'standard', 'premium'], [3, 5, 2])[0],
+            'reliability_score': round(min(1.0, rng.betavariate(8, 2)), 2),
+        })
+    return suppliers
+
+
+def make_rfq(items: int, seed: int = 0) -> RFQSession:
+    rng = random.Random(seed)
+    return RFQSession(
+        id=f'bench-{items}',
+        items=[
+            RFQItem(id=f'item-{i}', material=_zipf_choice(rng, RFQ_MATERIALS, 0.8), quantity='10 pcs')
+            for i in range(items)
+        ],
+    )
+
+
+def make_catalog(base: CatalogSnapshot, copies: int, seed: int = 0) -> CatalogSnapshot:
+    """The real catalog replicated `copies` times; copies get shuffled application lists."""
+    rng = random.Random(seed)
+    applications = sorted({a for m in base.materials.values() for a in m.get('applications', [])})
+    materials, products = [], []
+    for copy in range(copies):
+        suffix = f"-{copy}" if copy else ""
+        for material in base.materials.values():
+            apps = material.get('applications', [])
+            if copy:
+                apps = rng.sample(applications, min(len(applications), max(1, len(apps))))
+            materials.append({**material, 'id': material['id'] + suffix, 'applications': apps})
+        for product in base.products:
+            products.append({**product, 'id': f"{product['id']}{suffix}"})
+
+    header = {'version': f"bench-{copies}", 'compiled_at': datetime.now().isoformat(timespec='seconds')}
+    payload = {
+        'materials': materials,
+        'products': products,
+        'search_index': SearchIndex(
+            [(m, _material_fields(m)) for m in materials] + [(p, _product_fields(p)) for p in products],
+            SEARCH_FIELD_WEIGHTS,
+        ).to_state(),
+        'name_index': SearchIndex([(m, _material_fields(m)) for m in materials], NAME_FIELD_WEIGHTS).to_state(),
+        # search_materials and get_materials_by_capability do not use the extractor
+        'entities': base.extractor.to_state(),
+    }
+    return CatalogSnapshot(header, payload, f"synthetic x{copies}")
+
+
+def load_suppliers(suppliers: List[Dict[str, Any]]):
+    """Replace the in-memory supplier replica (and everything derived from it)."""
+    with supplier_catalog._lock:
+        supplier_catalog._suppliers.clear()
+        supplier_catalog._subscribers.clear()
+    capability_index._index = None
+    scoring._engine = None
+    supplier_catalog._replace_all(suppliers)
+
+
+def measure(fn: Callable[[int], Any], min_time: float, max_calls: int) -> Dict[str, Any]:
+    """
+    Call fn(i) until `min_time` seconds or `max_calls` calls have passed; then
+    once more under tracemalloc for the peak allocation.
+    """
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_calls and (not timings or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn(len(timings))
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(len(timings))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": len(timings),
+        "p50_ms": round(statistics.median(timings) * 1000, 4),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_suppliers(sizes: List[int], item_counts: List[int], args, record: Callable):
+    loop = asyncio.new_event_loop()
+    try:
+        for size in sizes:
+            suppliers = make_suppliers(size, args.seed)
+            load_suppliers(suppliers)
+            del suppliers
+
+            start = time.perf_counter()
+            loop.run_until_complete(scoring.get_scoring_engine())
+            record("scoring_engine_build", {"suppliers": size},
+                   {"calls": 1, "p50_ms": round((time.perf_counter() - start) * 1000, 4)})
+
+            for items in item_counts:
+                rfq = make_rfq(items, args.seed)
+                record("match_suppliers_for_rfq", {"suppliers": size, "items": items}, measure(
+                    lambda i: loop.run_until_complete(match_suppliers_for_rfq(rfq)),
+                    args.min_time, args.max_calls,
+                ))
+
+            record("get_recommended_suppliers", {"suppliers": size}, measure(
+                lambda i: loop.run_until_complete(get_recommended_suppliers(
+                    RFQ_MATERIALS[i % len(RFQ_MATERIALS)], urgency=URGENCIES[i % len(URGENCIES)],
+                )),
+                args.min_time, args.max_calls,
+            ))
+            load_suppliers([])
+            gc.collect()
+    finally:
+        loop.close()
+
+
+def run_materials(copies_list: List[int], args, record: Callable):
+    base = material_catalog.get_catalog()
+    capabilities = sorted({
+        word for m in base.materials.values() for a in m.get('applications', []) for word in a.lower().split()[:1]
+    })
+    try:
+        for copies in copies_list:
+            catalog = make_catalog(base, copies, args.seed)
+            material_catalog._catalog = catalog
+            params = {"materials": len(catalog.materials), "products": len(catalog.products)}
+            # Warm the query expansion caches, as a running server would be
+            for query in SEARCH_QUERIES:
+                search_materials(query)
+
+            record("search_materials", params, measure(
+                lambda i: search_materials(SEARCH_QUERIES[i % len(SEARCH_QUERIES)]),
+                args.min_time, args.max_calls,
+            ))
+            record("get_materials_by_capability", params, measure(
+                lambda i: get_materials_by_capability(capabilities[i % len(capabilities)]),
+                args.min_time, args.max_calls,
+            ))
+    finally:
+        material_catalog._catalog = base
+
+
+def _sizes(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _key(row: Dict[str, Any]) -> str:
+    return row["function"] + " " + " ".join(f"{k}={v}" for k, v in row["params"].items())
+
+
+def print_report(rows: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None):
+    before = {_key(row): row for row in baseline["results"]} if baseline else {}
+    print(f"  {'function / size':<58} {'calls':>6} {'p50 ms':>10} {'peak KB':>10}")
+    for row in rows:
+        peak = row.get("peak_kb")
+        line = (f"  {_key(row):<58} {row['calls']:>6} {row['p50_ms']:>10.3f}"
+                f" {peak if peak is not None else '-':>10}")
+        old = before.get(_key(row))
+        if old and old.get("p50_ms"):
+            line += f"  {100 * (row['p50_ms'] - old['p50_ms']) / old['p50_ms']:+7.1f}% time"
+            if old.get("peak_kb") and peak is not None:
+                line += f" {100 * (peak - old['peak_kb']) / old['peak_kb']:+7.1f}% mem"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for matching and materials lookup")
+    parser.add_argument("--suppliers", default=DEFAULT_SUPPLIERS, help="supplier catalog sizes")
+    parser.add_argument("--items", default=DEFAULT_ITEMS, help="RFQ sizes")
+    parser.add_argument("--copies", default=DEFAULT_COPIES, help="materials catalog replication factors")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per measurement")
+    parser.add_argument("--max-calls", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default benchmarks/results/scaling-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    rows: List[Dict[str, Any]] = []
+
+    def record(function: str, params: Dict[str, Any], result: Dict[str, Any]):
+        rows.append({"function": function, "params": params, **result})
+        print(f"  {_key(rows[-1])}: {result['p50_ms']:.3f}ms", flush=True)
+
+    run_suppliers(_sizes(args.suppliers), _sizes(args.items), args, record)
+    run_materials(_sizes(args.copies), args, record)
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    dirty = bool(_git("status", "--porcelain", "--", "."))
+    result = {
+        "benchmark": "scaling",
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now().astimezone().isoformat(),
+        "config": {"suppliers": args.suppliers, "items": args.items, "copies": args.copies, "seed": args.seed},
+        "results": rows,
+    }
+    output = args.output or str(RESULTS_DIR / (
+        f"scaling-{commit or 'unknown'}{'-dirty' if dirty else ''}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    ))
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print()
+    print_report(rows, baseline)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
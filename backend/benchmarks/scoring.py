@@ -0,0 +1,130 @@
+"""
+Supplier scoring benchmark.
+
+Scores a synthetic RFQ against a synthetic supplier catalog with the
+vectorized engine (app.services.scoring) over the capability index and,
+optionally, the per-supplier Python loop it replaced, and checks both
+produce the same rankings. Also times applying a one-supplier change to
+the index.
+
+Usage (from backend/):
+    python -m benchmarks.scoring --suppliers 100000 --items 500
+    python -m benchmarks.scoring --suppliers 5000 --items 50 --reference
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, Any, List
+
+from app.services.matching import MATERIAL_CAPABILITIES
+from app.services.capability_index import CapabilityIndex
+from app.services.scoring import SupplierScoringEngine
+
+CERTIFICATIONS = ['ISO9001', 'EN9100', 'AS9100', 'ISO14001']
+
+
+def make_suppliers(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic suppliers with realistic capability/certification mixes."""
+    rng = random.Random(seed)
+    capabilities = sorted({c for caps in MATERIAL_CAPABILITIES.values() for c in caps})
+    suppliers = []
+    for i in range(count):
+        suppliers.append({
+            'id': f'sup_{i:07d}',
+            'capabilities': rng.sample(capabilities, rng.randint(1, 6)),
+            'certifications': [c for c in CERTIFICATIONS if rng.random() < 0.4],
+            'avg_lead_time': rng.choice([5, 7, 10, 14, 21, 28, 45]),
+            'price_tier': rng.choice(['budget', 'standard', 'premium']),
+            'reliability_score': round(rng.uniform(0.5, 1.0), 2),
+        })
+    return suppliers
+
+
+def make_requirements(count: int, seed: int = 0) -> List[List[str]]:
+    """Requirement sets for an RFQ of `count` items."""
+    rng = random.Random(seed)
+    keywords = list(MATERIAL_CAPABILITIES) + ['steel', 'aluminium']
+    requirements = []
+    for _ in range(count):
+        keyword = rng.choice(keywords)
+        requirements.append(MATERIAL_CAPABILITIES.get(keyword, [keyword]))
+    return requirements
+
+
+def reference_top_matches(suppliers, requirements, k=3):
+    """The per-supplier loop from matching.match_suppliers_for_rfq, before vectorization."""
+    results = []
+    for required in requirements:
+        item_matches = []
+        for row, supplier in enumerate(suppliers):
+            supplier_caps = [c.lower() for c in supplier.get('capabilities', [])]
+            matching_caps = sum(1 for cap in required if cap in supplier_caps)
+            if matching_caps == 0:
+                continue
+            score = matching_caps / len(required)
+            certs = supplier.get('certifications', [])
+            if 'EN9100' in certs:
+                score *= 1.1
+            if 'ISO9001' in certs:
+                score *= 1.05
+            item_matches.append((row, min(score, 1.0)))
+        item_matches.sort(key=lambda x: x[1], reverse=True)
+        results.append(item_matches[:k])
+    return results
+
+
+def build_index(suppliers: List[Dict[str, Any]]) -> CapabilityIndex:
+    index = CapabilityIndex()
+    index.apply_changes({s['id']: s for s in suppliers}, [])
+    return index
+
+
+def _timed(fn, *args, repeat: int = 1, **kwargs):
+    """Run fn `repeat` times; return the last result and the median time in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--suppliers", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reference", action="store_true",
+                        help="also run the pure-Python loop and compare results")
+    args = parser.parse_args()
+
+    suppliers = make_suppliers(args.suppliers)
+    requirements = make_requirements(args.items)
+
+    index, build_ms = _timed(build_index, suppliers)
+    engine = SupplierScoringEngine(index)
+    changed = {**suppliers[len(suppliers) // 2], 'capabilities': ['tungsten', 'medical']}
+    _, update_ms = _timed(index.apply_changes, {changed['id']: changed}, [], repeat=args.repeat)
+    ranked, score_ms = _timed(engine.top_matches, requirements, k=3, repeat=args.repeat)
+    _, recommend_ms = _timed(
+        engine.top_recommendations, requirements[0], 'rush', k=5, repeat=args.repeat
+    )
+
+    print(f"{args.suppliers} suppliers x {args.items} items")
+    print(f"  index build         {build_ms:>10.1f}ms")
+    print(f"  one-supplier update {update_ms:>10.3f}ms")
+    print(f"  top_matches (RFQ)   {score_ms:>10.1f}ms  (median of {args.repeat})")
+    print(f"  top_recommendations {recommend_ms:>10.1f}ms")
+
+    if args.reference:
+        suppliers[len(suppliers) // 2] = changed
+        expected, reference_ms = _timed(reference_top_matches, suppliers, requirements, k=3)
+        expected = [[(suppliers[row]['id'], score) for row, score in item] for item in expected]
+        ranked = [[(supplier['id'], score) for supplier, score in item] for item in ranked]
+        print(f"  python loop (RFQ)   {reference_ms:>10.1f}ms")
+        print(f"  identical rankings: {ranked == expected}")
+
+
+if __name__ == "__main__":
+    main()
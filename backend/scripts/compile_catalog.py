@@ -0,0 +1,54 @@
+"""
+Compile the frontend catalog (src/data/materials.ts, products.ts) into the
+backend's catalog snapshot, with precomputed search indexes.
+
+A running backend picks up the new snapshot within CATALOG_RELOAD_INTERVAL
+seconds; the file is replaced atomically.
+
+Usage (from backend/):
+    python -m scripts.compile_catalog [--check] [--output PATH]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from app.services.material_catalog import (
+    CATALOG_SNAPSHOT_PATH,
+    FRONTEND_DATA_DIR,
+    CatalogError,
+    compile_catalog,
+    read_snapshot_header,
+    source_version,
+    write_snapshot,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the material catalog snapshot")
+    parser.add_argument("--output", type=Path, default=CATALOG_SNAPSHOT_PATH)
+    parser.add_argument("--source", type=Path, default=FRONTEND_DATA_DIR,
+                        help="directory containing materials.ts and products.ts")
+    parser.add_argument("--check", action="store_true",
+                        help="exit non-zero if the snapshot is out of date")
+    args = parser.parse_args()
+
+    if args.check:
+        try:
+            header, _ = read_snapshot_header(args.output.read_bytes())
+        except (FileNotFoundError, CatalogError) as e:
+            print(f"{args.output} is missing or unreadable ({e}); run python -m scripts.compile_catalog")
+            sys.exit(1)
+        if header['version'] != source_version(args.source):
+            print(f"{args.output} is out of date; run python -m scripts.compile_catalog")
+            sys.exit(1)
+        print(f"{args.output} is up to date (version {header['version']})")
+        return
+
+    header, payload = compile_catalog(args.source)
+    write_snapshot(args.output, header, payload)
+    print(f"Wrote catalog {header['version']} ({header['materials']} materials, "
+          f"{header['products']} products, {args.output.stat().st_size} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
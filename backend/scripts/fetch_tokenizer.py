@@ -0,0 +1,18 @@
+"""
+Download the chat tokenizer's BPE file into TOKENIZER_CACHE_DIR, so the
+server loads it from disk at startup instead of fetching it at runtime.
+Run once at build / deploy time, with network access.
+
+Usage (from backend/):
+    python -m scripts.fetch_tokenizer
+"""
+from app.services.conversation import TOKENIZER_CACHE_DIR, TOKENIZER_ENCODING, load_encoding
+
+
+def main():
+    encoding = load_encoding()
+    print(f"{TOKENIZER_ENCODING} ({encoding.n_vocab} tokens) cached in {TOKENIZER_CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Generate firestore.indexes.json from the query definitions in
+app/services/firestore_queries.py.
+
+Usage (from backend/):
+    python -m scripts.generate_firestore_indexes [--check]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+from app.services.firestore_queries import composite_indexes
+
+INDEXES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "firestore.indexes.json"
+)
+
+
+def load_existing(path):
+    """Load the current index file (Firebase allows // comments in it)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        content = re.sub(r'^\s*//.*$', '', f.read(), flags=re.MULTILINE)
+    return json.loads(content) if content.strip() else {}
+
+
+def render(existing):
+    return json.dumps({
+        'indexes': composite_indexes(),
+        'fieldOverrides': existing.get('fieldOverrides', []),
+    }, indent=2) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Firestore composite indexes")
+    parser.add_argument("--check", action="store_true",
+                        help="exit non-zero if the index file is out of date")
+    args = parser.parse_args()
+
+    path = os.path.normpath(INDEXES_PATH)
+    existing = load_existing(path)
+    content = render(existing)
+
+    if args.check:
+        if existing.get('indexes') != composite_indexes():
+            print(f"{path} is out of date; run python -m scripts.generate_firestore_indexes")
+            sys.exit(1)
+        print(f"{path} is up to date")
+        return
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    print(f"Wrote {len(composite_indexes())} composite index(es) to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Bulk-import suppliers or supplier quotes from a CSV or JSONL file into
+Firestore (same pipeline as POST /api/v1/rfq/{suppliers,quotes}/bulk).
+
+Uses FIREBASE_CREDENTIALS_PATH like the server; without it nothing is
+written (mock mode). Every rejected row is listed in the error report, one
+JSON object per line. Exits non-zero if any row was rejected.
+
+Usage (from backend/):
+    python -m scripts.ingest suppliers distributor.csv [--dry-run] [--errors PATH]
+    python -m scripts.ingest quotes quotes.jsonl
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from app.services.bulk_ingest import KINDS, IngestError, detect_format, file_chunks, ingest, stop_bulk_ingest
+from app.services.firebase import shutdown_firebase
+
+
+async def run(args) -> dict:
+    try:
+        return await ingest(args.kind, file_chunks(args.path), args.format, dry_run=args.dry_run, max_errors=None)
+    finally:
+        await stop_bulk_ingest()
+        shutdown_firebase()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import suppliers or supplier quotes")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("path", type=Path, help="CSV or JSONL file")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="default: from the file extension")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    parser.add_argument("--errors", type=Path,
+                        help="error report path (default: <file>.errors.jsonl, when there are errors)")
+    args = parser.parse_args()
+
+    args.format = args.format or detect_format(filename=args.path.name)
+    if args.format is None:
+        parser.error(f"cannot tell the format of {args.path.name}; pass --format")
+
+    try:
+        report = asyncio.run(run(args))
+    except IngestError as e:
+        print(f"Import failed: {e.detail}")
+        sys.exit(1)
+
+    errors = report.pop("errors")
+    print(f"{report['kind']} ({report['mode']}): {report['rows']} rows, {report['written']} written, "
+          f"{report['failed']} rejected in {report['elapsed_s']}s ({report['rows_per_second']} rows/s)")
+    if errors:
+        path = args.errors or args.path.with_name(args.path.name + ".errors.jsonl")
+        with open(path, "w") as f:
+            for error in errors:
+                f.write(json.dumps(error) + "\n")
+        for error in errors[:10]:
+            print(f"  line {error['line']} ({error['stage']}): {'; '.join(error['errors'])}")
+        if len(errors) > 10:
+            print(f"  ... {len(errors) - 10} more")
+        print(f"Error report: {path}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Shared test setup: every external dependency runs in mock mode (no Firebase
+credentials, LLM or SendGrid keys), and on-disk state (email outbox, design
+uploads) goes to a temporary directory. The environment is set before the
+app is imported, since services read their settings at import time.
+"""
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="bimo-tests-")
+
+for _key in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "SENDGRID_API_KEY", "FIREBASE_CREDENTIALS_PATH"):
+    os.environ.pop(_key, None)
+os.environ.update({
+    "EMAIL_OUTBOX_PATH": os.path.join(_TMP, "email_outbox.db"),
+    "DESIGN_STORAGE_DIR": os.path.join(_TMP, "uploads"),
+    "LLM_CACHE_ENABLED": "false",
+    "CHAT_RATE_PER_MINUTE": "0",
+    "HEALTH_PROBE_INTERVAL": "0",
+    "INGEST_VALIDATION_WORKERS": "0",
+})
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services import llm_clients  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class _FailingCompletions:
+    async def create(self, **kwargs):
+        raise RuntimeError("provider unavailable")
+
+
+class _StreamingCompletions:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.closed = False
+
+    async def create(self, **kwargs):
+        assert kwargs.get("stream")
+        completions = self
+
+        class Stream:
+            def __aiter__(self):
+                return self._chunks()
+
+            async def _chunks(self):
+                for token in completions.tokens:
+                    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+            async def close(self):
+                completions.closed = True
+
+        return Stream()
+
+
+def _install_openai(monkeypatch, completions):
+    """Make OpenAI the active provider, backed by `completions`."""
+    # Let the real initialization run first, so it does not overwrite the stub later
+    llm_clients.initialize_llm_clients()
+    monkeypatch.setitem(llm_clients._clients, llm_clients.OPENAI, SimpleNamespace(
+        chat=SimpleNamespace(completions=completions),
+    ))
+    llm_clients.set_status("llm", "unknown", provider=llm_clients.OPENAI)
+    return completions
+
+
+@pytest.fixture
+def failing_llm(monkeypatch):
+    """An OpenAI client whose every call fails."""
+    return _install_openai(monkeypatch, _FailingCompletions())
+
+
+@pytest.fixture
+def streaming_llm(monkeypatch):
+    """An OpenAI client that streams three tokens."""
+    return _install_openai(monkeypatch, _StreamingCompletions(["Tungsten ", "melts at ", "3422 C."]))
@@ -0,0 +1,96 @@
+"""Chat admission control: per-client rate limits, fair queuing and shedding."""
+import asyncio
+
+from starlette.requests import Request
+
+from app.services import admission
+from app.services.admission import AdmissionController, RateLimiter, client_key
+
+QUESTION = {"messages": [{"role": "user", "content": "Do you sell tungsten?"}]}
+
+
+def _request(headers=None, peer=("203.0.113.9", 5000)):
+    return Request({
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": peer,
+    })
+
+
+def test_client_key_uses_the_address_the_proxy_appended():
+    forwarded = _request({"X-Forwarded-For": "198.51.100.7, 192.0.2.44"})
+    assert client_key(forwarded) == "192.0.2.44"
+    assert client_key(_request()) == "203.0.113.9"
+    assert client_key(_request(peer=None)) == "unknown"
+
+
+def test_token_bucket_refuses_with_retry_after(client, failing_llm, monkeypatch):
+    monkeypatch.setattr(admission, "_rate_limiter", RateLimiter(per_minute=6, burst=1))
+    headers = {"X-Forwarded-For": "192.0.2.1"}
+
+    assert client.post("/api/v1/chat/", json=QUESTION, headers=headers).status_code == 200
+    limited = client.post("/api/v1/chat/", json=QUESTION, headers=headers)
+    assert limited.status_code == 429
+    assert 9 <= int(limited.headers["Retry-After"]) <= 10
+
+    # Other clients have their own bucket
+    other = client.post("/api/v1/chat/", json=QUESTION, headers={"X-Forwarded-For": "192.0.2.2"})
+    assert other.status_code == 200
+    assert admission.get_rate_limiter().limited == 1
+
+
+def test_waiting_clients_are_served_round_robin():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, queue_size=10, queue_timeout=5)
+        order = []
+
+        async def call(client):
+            async with controller.admit(client) as admitted:
+                assert admitted
+                order.append(client)
+
+        assert await controller.acquire("holder")
+        tasks = [asyncio.create_task(call(c)) for c in ("a", "a", "a", "b")]
+        await asyncio.sleep(0)
+        assert controller.queued == 4
+        controller.release()
+        await asyncio.gather(*tasks)
+        return order, controller
+
+    order, controller = asyncio.run(run())
+    assert order == ["a", "b", "a", "a"]
+    assert controller.active == 0 and controller.queued == 0
+    assert controller.counts["waited"] == 4
+
+
+def test_full_queue_sheds_the_busiest_clients_newest_request():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, queue_size=2, queue_timeout=5)
+        assert await controller.acquire("holder")
+        a1, a2 = (asyncio.create_task(controller.acquire("a")) for _ in range(2))
+        await asyncio.sleep(0)
+        b = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0)
+        # The queue holds one request each for a and b; c would have as many as either
+        c = await controller.acquire("c")
+        controller.release()
+        controller.release()
+        controller.release()
+        return await asyncio.gather(a1, a2, b), c, controller
+
+    (a1, a2, b), c, controller = asyncio.run(run())
+    assert (a1, a2, b, c) == (True, False, True, False)
+    assert controller.counts["shed_queue_full"] == 2
+    assert controller.stats()["shed_rate"] > 0
+
+
+def test_request_waiting_past_the_timeout_is_shed():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, queue_size=10, queue_timeout=0.01)
+        assert await controller.acquire("holder")
+        return await controller.acquire("late"), controller
+
+    admitted, controller = asyncio.run(run())
+    assert admitted is False
+    assert controller.counts["shed_timeout"] == 1
+    assert controller.queued == 0 and controller.active == 1
@@ -0,0 +1,69 @@
+"""Bulk supplier / quote imports: per-line error reporting and the admin guard."""
+import asyncio
+
+from app.routers import rfq as rfq_router
+from app.services import bulk_ingest
+
+SUPPLIERS_CSV = (
+    "id,name,email,capabilities,notes\n"
+    "s1,Alpha Metals,sales@alpha.example.com,tungsten;molybdenum,\n"
+    's2,Beta,sales@beta.example.com,tantalum,"Ships ""as rolled""\n'
+    'or ground"\n'
+    "s3,Gamma,not-an-email,niobium,\n"
+    '"s4,Broken,"x"y@example.com,niobium,\n'
+    "s1,Alpha again,other@alpha.example.com,tungsten,\n"
+    "\n"
+    "s5,Delta,sales@delta.example.com,rhenium|tungsten,\n"
+)
+
+
+async def _chunks(data: bytes, size: int = 7):
+    # Small chunks, so records and quoted cells straddle chunk boundaries
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _ingest(kind, data, fmt, **kwargs):
+    return asyncio.run(bulk_ingest.ingest(kind, _chunks(data), fmt, dry_run=True, **kwargs))
+
+
+def test_csv_errors_carry_file_line_numbers():
+    report = _ingest("suppliers", SUPPLIERS_CSV.encode(), "csv")
+    assert (report["rows"], report["valid"], report["failed"]) == (6, 3, 3)
+    errors = {error["line"]: error for error in report["errors"]}
+    # The quoted note spans lines 3-4, so the rows after it start one line later
+    assert sorted(errors) == [5, 6, 7]
+    assert errors[5]["stage"] == "validation" and errors[5]["errors"][0].startswith("email:")
+    assert errors[6]["stage"] == "parse"
+    assert errors[7]["errors"] == ["duplicate of line 2 (s1)"]
+
+
+def test_jsonl_errors_and_report_limit():
+    lines = [
+        '{"supplier_id": "s1", "rfq_id": "BT-1", "item_id": "i1", "unit_price": 10}',
+        '{"supplier_id": "s1", "rfq_id": "BT-1", "item_id": "i2", "unit_price": "call us"}',
+        "[1, 2]",
+        "{not json",
+    ]
+    report = _ingest("quotes", ("\n".join(lines) + "\n").encode(), "jsonl", max_errors=2)
+    assert (report["rows"], report["valid"], report["failed"]) == (4, 1, 3)
+    assert [(error["line"], error["stage"]) for error in report["errors"]] == [(2, "validation"), (3, "parse")]
+    assert report["errors_truncated"] is True
+
+
+def test_bulk_endpoints_need_the_admin_token(client, monkeypatch):
+    url = "/api/v1/rfq/suppliers/bulk?dry_run=true"
+    body = SUPPLIERS_CSV.encode()
+    headers = {"Content-Type": "text/csv"}
+    monkeypatch.setattr(rfq_router, "ADMIN_API_TOKEN", "")
+    assert client.post(url, content=body, headers=headers).status_code == 404
+
+    monkeypatch.setattr(rfq_router, "ADMIN_API_TOKEN", "s3cret")
+    assert client.post(url, content=body, headers=headers).status_code == 401
+    wrong = {**headers, "Authorization": "Bearer guess"}
+    assert client.post(url, content=body, headers=wrong).status_code == 401
+    assert client.post("/api/v1/rfq/suppliers/refresh").status_code == 401
+
+    ok = client.post(url, content=body, headers={**headers, "Authorization": "Bearer s3cret"})
+    assert ok.status_code == 200
+    assert ok.json()["failed"] == 3
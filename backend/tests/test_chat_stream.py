@@ -0,0 +1,51 @@
+"""Server-sent chat stream: token events, the final response, fallback and cancellation."""
+import asyncio
+import json
+
+from app.models.chat import Message
+from app.services.llm import stream_chat_response
+
+QUESTION = {"messages": [{"role": "user", "content": "What is the melting point of tungsten?"}]}
+
+
+def _events(body: str):
+    """Parse an SSE body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_tokens_then_the_full_response(client, streaming_llm):
+    response = client.post("/api/v1/chat/stream", json=QUESTION)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(response.text)
+    assert [data["text"] for event, data in events if event == "token"] == ["Tungsten ", "melts at ", "3422 C."]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["response"] == "Tungsten melts at 3422 C."
+    assert streaming_llm.closed
+
+
+def test_stream_falls_back_when_the_provider_fails(client, failing_llm):
+    response = client.post("/api/v1/chat/stream", json=QUESTION)
+    assert response.status_code == 200
+
+    events = _events(response.text)
+    assert [event for event, _ in events] == ["token", "done"]
+    assert events[0][1]["text"] == events[1][1]["response"]
+    assert events[1][1]["response"]
+
+
+def test_closing_the_stream_closes_the_provider_stream(streaming_llm):
+    async def read_one_token():
+        events = stream_chat_response([Message(**QUESTION["messages"][0])], client_id="test")
+        first = await events.__anext__()
+        # What the server does when the client disconnects
+        await events.aclose()
+        return first
+
+    assert asyncio.run(read_one_token()) == ("token", "Tungsten ")
+    assert streaming_llm.closed
@@ -0,0 +1,66 @@
+"""Token counting and background conversation summaries."""
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.chat import Message, MessageRole
+from app.services import conversation, llm
+
+TURNS = [Message(role=MessageRole.USER, content="Do you stock tantalum foil?")]
+
+
+def test_token_counts_are_estimated_until_the_tokenizer_loads(monkeypatch):
+    monkeypatch.setattr(conversation, "_encoding", None)
+    assert conversation.count_tokens("x" * 10) == 3
+    assert conversation.truncate_to_tokens("x" * 10, 2) == "x" * 8
+
+
+def test_missing_tokenizer_fails_the_warm_up_step(monkeypatch):
+    def offline():
+        raise ConnectionError("no route to openaipublic.blob.core.windows.net")
+
+    monkeypatch.setattr(conversation, "load_encoding", offline)
+    with pytest.raises(RuntimeError, match="fetch_tokenizer"):
+        asyncio.run(conversation.start_tokenizer())
+
+
+@pytest.fixture
+def summary_provider(monkeypatch):
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Asked about Ta foil."))])
+
+    monkeypatch.setattr(llm, "get_active_provider", lambda: llm.OPENAI)
+    monkeypatch.setattr(llm, "get_llm_client", lambda provider: SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    return calls
+
+
+def _admission(monkeypatch, admitted):
+    clients = []
+
+    @asynccontextmanager
+    async def admit(client):
+        clients.append(client)
+        yield admitted
+
+    monkeypatch.setattr(llm, "admit", admit)
+    return clients
+
+
+def test_summaries_go_through_admission(summary_provider, monkeypatch):
+    clients = _admission(monkeypatch, True)
+    assert asyncio.run(llm._summarize(None, TURNS)) == "Asked about Ta foil."
+    assert clients == [llm.SUMMARY_CLIENT]
+    assert len(summary_provider) == 1
+
+
+def test_shed_summaries_do_not_call_the_provider(summary_provider, monkeypatch):
+    _admission(monkeypatch, False)
+    with pytest.raises(RuntimeError, match="shed"):
+        asyncio.run(llm._summarize("Earlier summary", TURNS))
+    assert summary_provider == []
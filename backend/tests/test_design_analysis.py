@@ -0,0 +1,41 @@
+"""Design analysis worker pool: runaway parses are killed, not waited out."""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.services import design_analysis
+from app.services.design_storage import get_design_store
+
+
+def test_timed_out_analysis_recycles_the_pool(monkeypatch):
+    digest = "ab" * 32
+    store = get_design_store()
+    store.designs_dir.mkdir(parents=True, exist_ok=True)
+    (store.designs_dir / digest).write_bytes(b"ISO-10303-21;")
+
+    pool = ThreadPoolExecutor(1)
+    recycled = []
+    monkeypatch.setattr(design_analysis, "_pool", pool)
+    monkeypatch.setattr(design_analysis, "DESIGN_ANALYSIS_TIMEOUT", 0.05)
+    monkeypatch.setattr(design_analysis, "analyze_file", lambda path, preview: time.sleep(0.5))
+    monkeypatch.setattr(design_analysis, "_recycle_pool", recycled.append)
+
+    result = asyncio.run(design_analysis._analyze(digest, f"designs/{digest}"))
+    assert result["status"] == "failed" and "timed out" in result["error"]
+    assert recycled == [pool]
+    pool.shutdown()
+
+
+def test_recycling_kills_busy_workers(monkeypatch):
+    pool = ProcessPoolExecutor(1)
+    monkeypatch.setattr(design_analysis, "_pool", pool)
+    future = pool.submit(time.sleep, 60)
+    while not future.running():
+        time.sleep(0.01)
+    processes = list(pool._processes.values())
+
+    design_analysis._recycle_pool(pool)
+    assert design_analysis._pool is None
+    for process in processes:
+        process.join(5)
+        assert not process.is_alive()
@@ -0,0 +1,93 @@
+"""Streaming, resumable, content-addressed design uploads."""
+import asyncio
+import hashlib
+
+import pytest
+
+from app.routers import rfq as rfq_router
+from app.services import design_storage, firebase
+
+STEP_FILE = b"ISO-10303-21;\nHEADER;\nENDSEC;\nDATA;\n" + b"#1=CARTESIAN_POINT('',(0.,0.,0.));\n" * 2000 + b"ENDSEC;\nEND-ISO-10303-21;\n"
+
+
+@pytest.fixture(autouse=True)
+def no_analysis(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(rfq_router, "schedule_analysis", scheduled.append)
+    return scheduled
+
+
+def test_resumable_upload_survives_a_restart(client, no_analysis):
+    created = client.post("/api/v1/rfq/uploads", json={
+        "filename": "bracket.step", "content_type": "application/step", "size": len(STEP_FILE),
+    })
+    assert created.status_code == 200
+    upload_id = created.json()["upload_id"]
+    url = f"/api/v1/rfq/uploads/{upload_id}"
+
+    half = len(STEP_FILE) // 2
+    first = client.patch(url, content=STEP_FILE[:half], headers={"Upload-Offset": "0"})
+    assert first.json() == {**first.json(), "complete": False, "offset": half}
+
+    # Forget the in-memory session: the staging file is the source of truth
+    design_storage.get_design_store()._sessions.clear()
+    assert client.get(url).json()["offset"] == half
+
+    stale = client.patch(url, content=STEP_FILE[half:], headers={"Upload-Offset": "0"})
+    assert stale.status_code == 409
+
+    done = client.patch(url, content=STEP_FILE[half:], headers={"Upload-Offset": str(half)})
+    assert done.status_code == 200
+    digest = hashlib.sha256(STEP_FILE).hexdigest()
+    assert done.json()["complete"] is True
+    assert done.json()["file_ref"] == f"designs/{digest}"
+    assert (design_storage.get_design_store().designs_dir / digest).read_bytes() == STEP_FILE
+    assert no_analysis == [f"designs/{digest}"]
+    assert client.get(url).status_code == 404
+
+
+def test_identical_uploads_are_stored_once(client):
+    store = design_storage.get_design_store()
+    deduplicated = store.deduplicated
+    data = STEP_FILE.replace(b"0.,0.,0.", b"1.,2.,3.")
+    files = {"file": ("part-a.step", data, "application/step")}
+    first = client.post("/api/v1/rfq/upload-design", files=files)
+    files = {"file": ("renamed.step", data, "application/step")}
+    second = client.post("/api/v1/rfq/upload-design", files=files)
+    assert first.status_code == second.status_code == 200
+    assert first.json()["file_ref"] == second.json()["file_ref"]
+    assert store.deduplicated == deduplicated + 1
+
+
+def test_upload_rejections(client):
+    assert client.post("/api/v1/rfq/uploads", json={"filename": "virus.exe", "size": 10}).status_code == 400
+    upload_id = client.post("/api/v1/rfq/uploads", json={"filename": "p.pdf", "content_type": "application/pdf", "size": 4}).json()["upload_id"]
+    too_big = client.patch(f"/api/v1/rfq/uploads/{upload_id}", content=b"%PDF-1.4", headers={"Upload-Offset": "0"})
+    assert too_big.status_code == 413
+    assert client.delete(f"/api/v1/rfq/uploads/{upload_id}").status_code == 200
+    assert client.get(f"/api/v1/rfq/uploads/{upload_id}").status_code == 404
+
+
+class _Blob:
+    calls = []
+
+    def __init__(self, name, chunk_size=None):
+        self.name = name
+
+    def upload_from_filename(self, path, **kwargs):
+        self.calls.append(("upload", kwargs["timeout"]))
+
+    def download_to_filename(self, path, **kwargs):
+        self.calls.append(("download", kwargs["timeout"]))
+
+
+def test_storage_transfers_pass_their_timeout_to_the_sdk(monkeypatch):
+    monkeypatch.setattr(firebase, "_storage", type("Bucket", (), {"blob": lambda self, *a, **k: _Blob(*a, **k)})())
+    _Blob.calls.clear()
+
+    async def transfer():
+        assert await firebase.upload_storage_blob("designs/x", "/tmp/x", timeout=900)
+        assert await firebase.download_storage_blob("designs/x", "/tmp/x")
+
+    asyncio.run(transfer())
+    assert _Blob.calls == [("upload", 900), ("download", firebase.STORAGE_TRANSFER_TIMEOUT)]
@@ -0,0 +1,28 @@
+"""Supplier RFQ emails pick up the supplier's contact."""
+import asyncio
+from types import SimpleNamespace
+
+from app.services import email, supplier_catalog
+
+ITEM = SimpleNamespace(id="item_1", material="Tungsten rod", form="rod", specification=None,
+                       quantity="10 kg", notes=None)
+
+
+def test_supplier_contact_is_read_from_firestore_before_the_replica_loads(monkeypatch):
+    monkeypatch.setattr(supplier_catalog, "_suppliers", {})
+    monkeypatch.setattr(supplier_catalog, "_loaded", False)
+    queued = []
+
+    async def enqueue(kind, payload):
+        queued.append((kind, payload))
+
+    monkeypatch.setattr(email, "enqueue", enqueue)
+    rfq = SimpleNamespace(items=[ITEM])
+    matches = {"item_1": [SimpleNamespace(supplier_id="sup_001")]}
+    asyncio.run(email.send_rfq_to_suppliers(rfq, matches))
+
+    [(kind, payload)] = queued
+    assert kind == email.SUPPLIER_RFQ
+    assert payload["supplier_id"] == "sup_001"
+    assert payload["email"] == "supplier-a@example.com"
+    assert "Tungsten rod" in payload["content"]
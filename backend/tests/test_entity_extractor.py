@@ -0,0 +1,56 @@
+"""Material mention extraction with the Aho-Corasick automaton."""
+import json
+
+from app.services import matching
+from app.services.entity_extractor import Entity, EntityExtractor, _alloy_patterns, extract_entities
+
+TUNGSTEN = Entity("tungsten", "tungsten")
+MOLY = Entity("molybdenum", "molybdenum")
+PATTERNS = [
+    ("Tungsten", TUNGSTEN),
+    ("W", TUNGSTEN),
+    ("W-Re", TUNGSTEN),
+    ("W-Re 26", TUNGSTEN),
+    ("Mo", MOLY),
+    ("moly", MOLY),
+]
+
+
+def _found(extractor, text):
+    return [(m.text, m.entity.keyword) for m in extractor.extract(text)]
+
+
+def test_longest_match_wins_and_offsets_point_into_the_original():
+    extractor = EntityExtractor(PATTERNS)
+    text = "Quote W-Re 26 wire and moly sheet"
+    assert _found(extractor, text) == [("W-Re 26", "tungsten"), ("moly", "molybdenum")]
+    mention = extractor.first(text)
+    assert text[mention.start:mention.end] == "W-Re 26"
+    # Separators are interchangeable
+    assert _found(extractor, "w re 26") == [("w re 26", "tungsten")]
+
+
+def test_symbols_need_exact_case_and_word_boundaries():
+    extractor = EntityExtractor(PATTERNS)
+    assert _found(extractor, "W and Mo bars") == [("W", "tungsten"), ("Mo", "molybdenum")]
+    assert _found(extractor, "we need mo bars with tungstenite") == []
+
+
+def test_compiled_state_round_trips():
+    extractor = EntityExtractor(PATTERNS)
+    restored = EntityExtractor.from_state(json.loads(json.dumps(extractor.to_state())))
+    text = "Mo, W-Re 26 and Tungsten"
+    assert restored.extract(text) == extractor.extract(text)
+    assert len(restored) == len(extractor)
+
+
+def test_alloy_entries_expand_to_designations():
+    assert _alloy_patterns("Inconel 600, 625, X-750") == ["Inconel", "Inconel 600", "Inconel 625", "Inconel X-750"]
+    assert _alloy_patterns("Grade 5 (Ti6Al4V) - Aerospace") == ["Ti6Al4V"]
+    assert _alloy_patterns("W-Re (W-3%Re, W-25%Re)") == ["W-Re"]
+    assert _alloy_patterns("Pure Tungsten (min. 99.95%)") == []
+
+
+def test_catalog_extractor_grounds_rfq_item_names(client):
+    assert [m.entity.keyword for m in extract_entities("Wolfram rods and Inconel 718 plate")] == ["tungsten", "inconel"]
+    assert matching.extract_material_keyword("TZM plate 2 mm") == "molybdenum"
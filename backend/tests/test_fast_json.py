@@ -0,0 +1,89 @@
+"""Fast JSON path: single-pass body validation with FastAPI's 422s, direct model encoding."""
+import json
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.models.chat import ChatResponse
+from app.services.fast_json import dumps, json_body, json_body_openapi, model_response
+
+
+class Line(BaseModel):
+    name: str
+    qty: int
+
+
+class Order(BaseModel):
+    lines: List[Line]
+    note: Optional[str] = None
+
+
+def _app():
+    app = FastAPI()
+
+    @app.post("/default")
+    async def default(order: Order):
+        return {"lines": len(order.lines)}
+
+    @app.post("/fast", openapi_extra=json_body_openapi(Order))
+    async def fast(order: Order = Depends(json_body(Order))):
+        return {"lines": len(order.lines)}
+
+    return app
+
+
+@pytest.mark.parametrize("body", [
+    {"lines": [{"name": "rod", "qty": 2}]},
+    {"lines": [{"name": "rod", "qty": "two"}]},
+    {"lines": [{"qty": 1}], "note": 5},
+])
+def test_validation_matches_fastapis_default_path(body):
+    client = TestClient(_app())
+    default = client.post("/default", json=body)
+    fast = client.post("/fast", json=body)
+    assert (fast.status_code, fast.json()) == (default.status_code, default.json())
+
+
+def test_malformed_json_is_a_422_at_the_body():
+    response = TestClient(_app()).post("/fast", content=b'{"lines": [', headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["type"] == "json_invalid"
+    assert error["loc"] == ["body"]
+
+
+def test_body_schema_is_documented_without_local_refs():
+    operation = _app().openapi()["paths"]["/fast"]["post"]
+    schema = operation["requestBody"]["content"]["application/json"]["schema"]
+    assert schema["required"] == ["lines"]
+    assert schema["properties"]["lines"]["items"]["required"] == ["name", "qty"]
+    assert "$ref" not in json.dumps(schema)
+
+
+def test_rfq_submit_reports_the_invalid_field(client):
+    response = client.post("/api/v1/rfq/submit", json={
+        "session_id": "s1",
+        "items": [{"id": "i1", "material": "Tungsten"}],
+        "contact_email": "buyer@example.com",
+    })
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "items", 0, "quantity"]]
+
+
+def test_dumps_and_model_response_encode_without_revalidating():
+    class Tier(str, Enum):
+        BUDGET = "budget"
+
+    data = {"at": datetime(2026, 1, 2, 3, 4, 5), "tier": Tier.BUDGET, 7: "seven"}
+    assert json.loads(dumps(data)) == {"at": "2026-01-02T03:04:05", "tier": "budget", "7": "seven"}
+
+    model = ChatResponse(response="Tungsten melts at 3422 C.")
+    response = model_response(model, status_code=201)
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == json.loads(model.model_dump_json())
@@ -0,0 +1,36 @@
+"""Firestore calls carry their own SDK timeout, not just an await limit."""
+import asyncio
+from types import SimpleNamespace
+
+from app.models.rfq import RFQSession
+from app.services import firebase
+
+
+class _Document:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def set(self, data, timeout=None):
+        self.calls.append(("set", timeout))
+
+    def update(self, data, timeout=None):
+        self.calls.append(("update", timeout))
+
+    def get(self, timeout=None):
+        self.calls.append(("get", timeout))
+        return SimpleNamespace(exists=True, to_dict=lambda: {"id": "BT-1"})
+
+
+def test_document_calls_pass_the_firestore_timeout(monkeypatch):
+    calls = []
+    db = SimpleNamespace(collection=lambda name: SimpleNamespace(document=lambda doc_id: _Document(calls)))
+    monkeypatch.setattr(firebase, "_db", db)
+
+    async def run():
+        await firebase.save_rfq(RFQSession(id="BT-1", items=[]))
+        assert await firebase.get_rfq("BT-1") == {"id": "BT-1"}
+        assert await firebase.update_rfq_pipeline("BT-1", {"email": "queued"})
+
+    asyncio.run(run())
+    assert calls == [("set", firebase.FIRESTORE_TIMEOUT), ("get", firebase.FIRESTORE_TIMEOUT),
+                     ("update", firebase.FIRESTORE_TIMEOUT)]
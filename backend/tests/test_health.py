@@ -0,0 +1,64 @@
+"""Cached dependency state behind /health."""
+from app.services import health
+
+
+def test_report_counts_consecutive_failures():
+    health.report("dep_a", False, "boom")
+    health.report("dep_a", False, "boom again")
+    entry = health.get_dependency_health()["dep_a"]
+    assert entry["status"] == "error"
+    assert entry["consecutive_failures"] == 2
+    assert entry["error"] == "boom again"
+
+    health.report("dep_a", True, latency_ms=1.0)
+    entry = health.get_dependency_health()["dep_a"]
+    assert entry["status"] == "ok"
+    assert entry["consecutive_failures"] == 0
+    assert "error" not in entry
+
+
+def test_failure_reported_after_set_status():
+    health.set_status("dep_b", "unknown", provider="openai")
+    health.report("dep_b", False, "provider error")
+    entry = health.get_dependency_health()["dep_b"]
+    assert entry["status"] == "error"
+    assert entry["consecutive_failures"] == 1
+    assert entry["provider"] == "openai"
+    assert health.overall_status() == "degraded"
+
+    health.set_status("dep_b", "mock")
+    assert health.get_dependency_health()["dep_b"]["consecutive_failures"] == 0
+    health.report("dep_b", True)
+
+
+def test_probe_returning_mock_then_failing():
+    async def probe():
+        return "mock"
+
+    async def failing():
+        raise RuntimeError("unreachable")
+
+    import asyncio
+
+    health.register_probe("dep_c", probe)
+    try:
+        asyncio.run(health.run_probes())
+        assert health.get_dependency_health()["dep_c"]["status"] == "mock"
+        health.register_probe("dep_c", failing)
+        asyncio.run(health.run_probes())
+        entry = health.get_dependency_health()["dep_c"]
+        assert entry["status"] == "error"
+        assert entry["error"] == "unreachable"
+    finally:
+        health._probes.pop("dep_c", None)
+        health._state.pop("dep_c", None)
+
+
+def test_chat_falls_back_when_the_provider_fails(client, failing_llm):
+    response = client.post("/api/v1/chat/", json={"messages": [{"role": "user", "content": "Do you sell tungsten?"}]})
+    assert response.status_code == 200
+    assert response.json()["response"]
+    llm = client.get("/health").json()["dependencies"]["llm"]
+    assert llm["status"] == "error"
+    assert llm["consecutive_failures"] >= 1
+    assert "provider unavailable" in llm["error"]
@@ -0,0 +1,34 @@
+"""Precompressed, ETag-validated responses."""
+import gzip
+
+from app.api.endpoints import products
+from app.services.http_cache import CachedBody, data_version
+
+BODY = [{"id": i, "name": f"Tungsten rod {i}", "grade": "W-99.95"} for i in range(50)]
+
+
+def test_per_query_entries_use_cheap_compression():
+    dynamic, static = CachedBody(1, BODY), CachedBody(1, BODY, static=True)
+    # gzip XFL header byte: 2 = maximum compression, 0 = default levels
+    assert dynamic.encodings["gzip"][0][8] == 0
+    assert static.encodings["gzip"][0][8] == 2
+    assert gzip.decompress(dynamic.encodings["gzip"][0]) == static.identity
+    assert dynamic.etag == static.etag
+
+
+def test_data_version_follows_the_data():
+    assert data_version(BODY) == data_version([dict(row) for row in BODY])
+    assert data_version(BODY) != data_version(BODY[:-1])
+
+
+def test_products_revalidate_with_their_etag(client, monkeypatch):
+    first = client.get("/api/v1/products/")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get("/api/v1/products/", headers={"If-None-Match": etag}).status_code == 304
+
+    changed = products.PRODUCTS + [{"id": 3, "name": "Product C", "price": 300}]
+    monkeypatch.setattr(products, "PRODUCTS", changed)
+    monkeypatch.setattr(products, "PRODUCTS_VERSION", data_version(changed))
+    refreshed = client.get("/api/v1/products/", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and len(refreshed.json()) == 3
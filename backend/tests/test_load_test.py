@@ -0,0 +1,85 @@
+"""Load-test stand-ins and report maths: the fakes must behave like the services they replace."""
+import asyncio
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+from app.services import firebase
+from benchmarks.fake_firestore import InMemoryFirestore, seed_suppliers
+from benchmarks.fake_llm import FakeLLM
+from benchmarks.fake_sendgrid import FakeSendGrid
+from benchmarks.load_test import RouteStats, Workload, parse_mix, percentile, summarize
+
+
+def test_percentiles_and_summary():
+    assert percentile([], 50) is None
+    latencies = [i / 1000 for i in range(1, 101)]
+    assert (percentile(latencies, 50), percentile(latencies, 99), percentile(latencies, 100)) == (50.0, 99.0, 100.0)
+    assert parse_mix("chat=2, search, rfq_submit=0") == {"chat": 2.0, "search": 1.0}
+
+    stats = {"search": RouteStats(), "chat": RouteStats()}
+    stats["search"].latencies = latencies
+    stats["chat"].error("503")
+    stats["chat"].dropped = 2
+    summary = summarize(stats, elapsed=10.0)
+    assert summary["routes"]["search"]["throughput_rps"] == 10.0
+    assert summary["totals"] == {
+        "requests": 101, "ok": 100, "errors": 1, "dropped": 2, "throughput_rps": 10.0,
+        "p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0, "elapsed_s": 10.0,
+    }
+
+
+def test_fake_llm_answers_plain_and_streamed_completions():
+    fake = FakeLLM(first_token_ms=0, token_ms=0, tokens=5)
+    client = TestClient(fake.app)
+    body = {"model": "gpt-test", "messages": [{"role": "user", "content": "hi"}]}
+    assert client.post("/v1/chat/completions", json=body).status_code == 401
+
+    auth = {"Authorization": "Bearer test"}
+    plain = client.post("/v1/chat/completions", json=body, headers=auth).json()
+    assert len(plain["choices"][0]["message"]["content"].split()) == 5
+
+    streamed = client.post("/v1/chat/completions", json={**body, "stream": True}, headers=auth)
+    events = [line[len("data: "):] for line in streamed.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    tokens = [json.loads(e)["choices"][0]["delta"].get("content") for e in events[:-1]]
+    assert "".join(t for t in tokens if t).split() == plain["choices"][0]["message"]["content"].split()
+    assert fake.stats() == {"requests": 2, "streams": 1, "max_in_flight": 1}
+
+
+def test_fake_sendgrid_records_recipients_and_can_fail():
+    fake = FakeSendGrid()
+    client = TestClient(fake.app)
+    message = {"personalizations": [{"to": [{"email": "a@example.com"}]}, {"to": [{"email": "b@example.com"}]}]}
+    assert client.post("/v3/mail/send", json=message).status_code == 401
+    assert client.post("/v3/mail/send", json=message, headers={"Authorization": "Bearer k"}).status_code == 202
+    assert client.get("/stats").json() == {"requests": 1, "recipients": 2}
+
+    failing = TestClient(FakeSendGrid(fail_status=503).app)
+    assert failing.post("/v3/mail/send", json=message, headers={"Authorization": "Bearer k"}).status_code == 503
+
+
+def test_in_memory_firestore_serves_the_backend_queries(monkeypatch):
+    db = InMemoryFirestore()
+    seed_suppliers(db, 50)
+    db.collection("suppliers").document("off").set({"id": "off", "active": False, "capabilities": ["tungsten"]})
+    monkeypatch.setattr(firebase, "_db", db)
+
+    suppliers = asyncio.run(firebase.load_suppliers(["tungsten"]))
+    expected = [s for s in db._data["suppliers"].values() if s["active"] and "tungsten" in s["capabilities"]]
+    assert sorted(s["id"] for s in suppliers) == sorted(s["id"] for s in expected)
+    # The capability query is projected to the scoring fields
+    assert "active" not in suppliers[0] and suppliers[0]["email"]
+    assert len(asyncio.run(firebase.load_suppliers())) == 50
+    assert asyncio.run(firebase.get_supplier("sup_000003"))["name"] == "Supplier 3"
+
+
+def test_workload_requests_are_accepted_by_the_app(client, failing_llm):
+    workload = Workload(random.Random(1), clients=3)
+    for route in ("chat", "chat_stream", "search", "material", "rfq_submit", "rfq_status"):
+        method, path, kwargs = workload.request(route)
+        response = client.request(method, path, **kwargs)
+        assert response.status_code < 400 or (route == "rfq_status" and response.status_code == 404), route
+        if route == "rfq_submit":
+            workload.rfq_ids.append(response.json()["rfq_id"])
@@ -0,0 +1,84 @@
+"""Supplier scoring over the incrementally maintained capability index."""
+import asyncio
+
+from app.models.supplier import Supplier
+from app.services import firebase, matching, supplier_catalog
+from app.services.capability_index import CapabilityIndex
+from app.services.scoring import SupplierScoringEngine
+
+SUPPLIERS = {
+    "a": {"id": "a", "capabilities": ["Tungsten", "high-temp"], "certifications": ["ISO9001"], "avg_lead_time": 21},
+    "b": {"id": "b", "capabilities": ["tungsten"], "certifications": ["EN9100", "ISO9001"], "avg_lead_time": 7},
+    "c": {"id": "c", "capabilities": ["titanium"], "reliability_score": 0.95},
+    "d": {"id": "d", "capabilities": ["tungsten", "high-temp", "refractory-metals"]},
+}
+
+
+def _engine():
+    index = CapabilityIndex()
+    index.apply_changes(SUPPLIERS, [])
+    return index, SupplierScoringEngine(index)
+
+
+def _ids(ranked):
+    return [(supplier["id"], round(score, 4)) for supplier, score in ranked]
+
+
+def test_top_matches_scores_only_candidates_in_catalog_order():
+    _, engine = _engine()
+    tungsten, titanium, unknown = engine.top_matches(
+        [["tungsten", "refractory-metals", "high-temp"], ["titanium"], ["unobtainium"]], k=3)
+    assert _ids(tungsten) == [("d", 1.0), ("a", 0.7), ("b", 0.385)]
+    assert _ids(titanium) == [("c", 1.0)]
+    assert unknown == []
+
+
+def test_catalog_changes_apply_in_place():
+    index, engine = _engine()
+    index.apply_changes({"b": {**SUPPLIERS["b"], "active": False},
+                         "e": {"id": "e", "capabilities": ["titanium"]}}, ["d"])
+    assert len(index) == 3
+    assert _ids(engine.top_matches([["tungsten"]])[0]) == [("a", 1.0)]
+    # Same score: catalog order decides
+    assert [s["id"] for s, _ in engine.top_matches([["titanium"]])[0]] == ["c", "e"]
+
+    index.apply_changes({"b": SUPPLIERS["b"]}, [])
+    assert [s["id"] for s, _ in engine.top_matches([["tungsten"]])[0]] == ["a", "b"]
+
+
+def test_removed_rows_are_compacted():
+    index = CapabilityIndex()
+    for i in range(3000):
+        index.apply_changes({f"s{i}": {"id": f"s{i}", "capabilities": ["nickel"]}}, [f"s{i - 1}"] if i % 3 else [])
+    assert index._size < 3000
+    assert [s["id"] for s, _ in SupplierScoringEngine(index).top_matches([["nickel"]], k=2)[0]] == ["s2", "s5"]
+
+
+def test_rush_recommendations_prefer_short_lead_times():
+    _, engine = _engine()
+    ranked = engine.top_recommendations(["tungsten"], urgency="rush", k=5)
+    assert [(s["id"], round(score, 3), overlap) for s, score, overlap in ranked] == [
+        ("b", 0.96, 1), ("a", 0.64, 1), ("d", 0.64, 1)]
+
+
+def test_unloaded_replica_queries_only_the_required_capabilities(monkeypatch):
+    requested = []
+    get_suppliers = firebase.get_suppliers
+
+    async def recording_get_suppliers(capabilities=None):
+        requested.append(capabilities)
+        return await get_suppliers(capabilities)
+
+    monkeypatch.setattr(supplier_catalog, "_loaded", False)
+    monkeypatch.setattr(firebase, "get_suppliers", recording_get_suppliers)
+    ranked = asyncio.run(matching.get_recommended_suppliers("Tantalum sheet"))
+    assert requested == [["chemical", "refractory-metals", "tantalum"]]
+    assert [r["supplier"]["id"] for r in ranked] == ["sup_002"]
+
+
+def test_capabilities_are_lowercased_on_write_and_on_query():
+    supplier = Supplier(id="s", name="S", email="s@example.com", capabilities=["Tungsten", " High-Temp"])
+    assert supplier.capabilities == ["tungsten", "high-temp"]
+
+    suppliers = asyncio.run(firebase.load_suppliers(["TUNGSTEN"]))
+    assert [s["id"] for s in suppliers] == ["sup_001"]
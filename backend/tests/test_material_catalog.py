@@ -0,0 +1,15 @@
+"""Compiled material catalog."""
+import pytest
+
+from app.services import materials
+
+
+@pytest.mark.parametrize("material_id, form, alloy", [
+    ("tantalum", "Fasteners", "Ta-10W"),
+    ("niobium", "Tubes", "Nb-Ti"),
+])
+def test_element_products_keep_forms_and_alloys(client, material_id, form, alloy):
+    material = materials.get_material_info(material_id)
+    assert form in material["forms"]
+    assert alloy in material["alloys"]
+    assert materials.search_materials(alloy)["id"] == material_id
@@ -0,0 +1,119 @@
+"""Email outbox: leases, retries with backoff, dead-lettering and crash recovery."""
+import asyncio
+
+import pytest
+
+from app.services import outbox
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    """A fresh outbox file installed as the shared outbox, with no handlers."""
+    box = outbox.EmailOutbox(str(tmp_path / "outbox.db"))
+    monkeypatch.setattr(outbox, "_outbox", box)
+    monkeypatch.setattr(outbox, "_handlers", {})
+    monkeypatch.setattr(outbox, "_wakeup", None)
+    monkeypatch.setattr(outbox, "_worker_task", None)
+    yield box
+    box.close()
+
+
+def test_claim_leases_messages_until_the_lease_expires(journal):
+    first = journal.append("note", {"n": 1})
+    journal.append("note", {"n": 2})
+
+    claimed = journal.claim(limit=1, lease_seconds=60)
+    assert [(m.id, m.payload, m.attempts) for m in claimed] == [(first, {"n": 1}, 1)]
+    assert [m.payload for m in journal.claim()] == [{"n": 2}]
+    assert journal.claim() == []
+
+    # An expired lease (a worker that died mid-send) is claimed again
+    journal.append("note", {"n": 3})
+    stale = journal.claim(lease_seconds=-1)
+    assert [(m.payload, m.attempts) for m in journal.claim()] == [({"n": 3}, 2)]
+    assert stale[0].payload == {"n": 3}
+
+
+def test_recover_requeues_messages_left_sending(journal):
+    journal.append("note", {"n": 1})
+    journal.claim()
+    assert journal.counts()[outbox.SENDING] == 1
+
+    assert journal.recover() == 1
+    assert journal.counts()[outbox.PENDING] == 1
+    assert [m.attempts for m in journal.claim()] == [2]
+
+
+def test_drain_marks_sent_and_retries_failures(journal):
+    delivered = []
+
+    async def deliver(payload):
+        if payload["fail"]:
+            raise ConnectionError("SendGrid 503")
+        delivered.append(payload["n"])
+
+    outbox.register_handler("note", deliver)
+    asyncio.run(outbox.enqueue("note", {"n": 1, "fail": False}))
+    asyncio.run(outbox.enqueue("note", {"n": 2, "fail": True}))
+
+    assert asyncio.run(outbox.drain_once()) == (1, 1)
+    assert delivered == [1]
+    assert journal.counts() == {outbox.PENDING: 1, outbox.SENDING: 0, outbox.SENT: 1, outbox.DEAD: 0}
+    # Backed off: not due again yet
+    assert asyncio.run(outbox.drain_once()) == (0, 0)
+
+
+def test_messages_that_keep_failing_are_dead_lettered(journal, monkeypatch):
+    monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(outbox, "BACKOFF_BASE", 0)
+    journal.append("unknown", {"n": 1})
+
+    assert asyncio.run(outbox.drain_once()) == (0, 1)
+    assert journal.counts()[outbox.PENDING] == 1
+    assert asyncio.run(outbox.drain_once()) == (0, 1)
+    assert journal.counts()[outbox.DEAD] == 1
+    assert asyncio.run(outbox.drain_once()) == (0, 0)
+
+    assert journal.requeue_dead() == 1
+    assert [m.attempts for m in journal.claim()] == [1]
+
+
+def test_batch_handler_results_are_per_message(journal):
+    batches = []
+
+    async def deliver_all(payloads):
+        batches.append([p["n"] for p in payloads])
+        return [None if p["n"] % 2 else ValueError("bad address") for p in payloads]
+
+    outbox.register_handler("rfq", deliver_all, batch=True)
+    for n in range(1, 5):
+        journal.append("rfq", {"n": n})
+
+    assert asyncio.run(outbox.drain_once()) == (2, 2)
+    assert batches == [[1, 2, 3, 4]]
+    assert journal.counts()[outbox.SENT] == 2
+
+
+def test_message_enqueued_during_a_drain_is_not_left_until_the_next_poll(journal, monkeypatch):
+    monkeypatch.setattr(outbox, "POLL_INTERVAL", 60)
+    delivered = []
+
+    async def deliver(payload):
+        delivered.append(payload["n"])
+        if payload["n"] == 1:
+            await outbox.enqueue("note", {"n": 2})
+
+    outbox.register_handler("note", deliver)
+
+    async def run():
+        await outbox.start_outbox_worker()
+        try:
+            await outbox.enqueue("note", {"n": 1})
+            while len(delivered) < 2:
+                await asyncio.sleep(0.01)
+        finally:
+            outbox._worker_task.cancel()
+            await asyncio.gather(outbox._worker_task, return_exceptions=True)
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert delivered == [1, 2]
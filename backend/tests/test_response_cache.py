@@ -0,0 +1,70 @@
+"""LLM response cache: byte-bounded LRU, TTL expiry and the disk tier."""
+from app.services import response_cache
+from app.services.response_cache import ResponseCache
+
+
+def test_lru_evicts_least_recently_used_past_the_byte_budget():
+    cache = ResponseCache(max_bytes=25, ttl=60)
+    cache.set_memory("a", "x" * 9)
+    cache.set_memory("b", "x" * 9)
+    assert cache.get_memory("a") is not None  # "b" is now least recently used
+    cache.set_memory("c", "x" * 9)
+
+    assert cache.get_memory("b") is None
+    assert cache.get_memory("a") and cache.get_memory("c")
+    assert cache.stats()["bytes"] == 20
+    assert cache.evictions == 1
+
+    # A value larger than the whole budget is not cached and evicts nothing
+    cache.set_memory("huge", "x" * 100)
+    assert cache.get_memory("huge") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire_after_the_ttl():
+    cache = ResponseCache(max_bytes=1000, ttl=0)
+    cache.set_memory("a", "value")
+    assert cache.get_memory("a") is None
+    assert cache.expirations == 1
+    assert cache.stats()["bytes"] == 0
+
+
+def test_disk_tier_warms_a_restarted_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ResponseCache(max_bytes=1000, ttl=60, path=path)
+    for key in ("old", "new"):
+        first.set_disk(key, f"{key}-value", first.set_memory(key, f"{key}-value"))
+    first.set_disk("stale", "gone", 0)
+    first.close()
+
+    # Room for one entry: the most recently used one is loaded
+    restarted = ResponseCache(max_bytes=12, ttl=60, path=path)
+    assert restarted.warm() == 1
+    assert restarted.get_memory("new") == "new-value"
+    assert restarted.get_memory("old") is None
+
+    # The rest is still on disk and is promoted on a disk hit; expired rows are not
+    assert restarted.get_disk("old") == "old-value"
+    assert restarted.get_memory("old") == "old-value"
+    assert restarted.get_disk("stale") is None
+    restarted.close()
+
+
+def test_disk_tier_is_trimmed_periodically(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "DISK_TRIM_INTERVAL", 3)
+    monkeypatch.setattr(response_cache, "LLM_CACHE_DISK_MAX_ENTRIES", 2)
+    cache = ResponseCache(max_bytes=1000, ttl=60, path=str(tmp_path / "cache.db"))
+
+    def rows():
+        return cache._disk.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+    for i in range(2):
+        cache.set_disk(f"k{i}", "v", cache.set_memory(f"k{i}", "v"))
+    cache.set_disk("expired", "v", 0)
+    assert rows() == 2
+    cache.set_disk("k2", "v", cache.set_memory("k2", "v"))
+    cache.set_disk("k3", "v", cache.set_memory("k3", "v"))
+    assert rows() == 4  # below the trim interval, nothing is deleted
+    cache.set_disk("k4", "v", cache.set_memory("k4", "v"))
+    assert rows() == 2
+    cache.close()
@@ -0,0 +1,28 @@
+"""RFQ fan-out shutdown: overrunning tasks are cancelled and finish unwinding."""
+import asyncio
+
+from app.services import rfq_pipeline
+
+
+def test_drain_waits_for_cancelled_fan_outs_to_unwind(monkeypatch):
+    monkeypatch.setattr(rfq_pipeline, "_background_tasks", set())
+    unwound = []
+
+    async def fan_out():
+        try:
+            await asyncio.sleep(60)
+        finally:
+            await asyncio.sleep(0)  # cleanup that itself awaits
+            unwound.append(True)
+
+    async def shutdown():
+        task = asyncio.create_task(fan_out())
+        rfq_pipeline._background_tasks.add(task)
+        task.add_done_callback(rfq_pipeline._background_tasks.discard)
+        await asyncio.sleep(0)
+        await rfq_pipeline.drain_pipeline(timeout=0.01)
+        return task
+
+    task = asyncio.run(shutdown())
+    assert unwound == [True]
+    assert task.cancelled()
@@ -0,0 +1,58 @@
+"""Scaling benchmark: synthetic data shapes and a tiny end-to-end run."""
+import json
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from app.services import material_catalog
+from benchmarks.scaling import make_catalog, make_rfq, make_suppliers, measure
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_synthetic_suppliers_are_deterministic_and_skewed():
+    suppliers = make_suppliers(2000, seed=3)
+    assert suppliers == make_suppliers(2000, seed=3)
+    assert len({s["id"] for s in suppliers}) == 2000
+
+    # Most suppliers cover one or two material families; a few cover many
+    sizes = Counter(len(s["capabilities"]) for s in suppliers)
+    assert sum(n for size, n in sizes.items() if size <= 6) > 0.7 * len(suppliers)
+    assert max(sizes) > 6
+    iso = sum("ISO9001" in s["certifications"] for s in suppliers) / len(suppliers)
+    assert 0.6 < iso < 0.8
+
+
+def test_rfqs_and_catalog_copies_scale_as_asked(client):
+    assert len(make_rfq(25).items) == 25
+    base = material_catalog.get_catalog()
+    catalog = make_catalog(base, 3)
+    assert len(catalog.materials) == 3 * len(base.materials)
+    assert len(catalog.products) == 3 * len(base.products)
+    assert catalog.search_index.best("tungsten")["id"].startswith("tungsten")
+
+
+def test_measure_reports_median_and_peak_memory():
+    calls = []
+    result = measure(lambda i: calls.append(bytearray(64 * 1024)), min_time=0, max_calls=5)
+    assert result["calls"] == 1  # min_time 0: one timed call, then the tracemalloc one
+    assert len(calls) == 2
+    assert result["peak_kb"] >= 64
+
+
+def test_tiny_run_writes_and_compares_results(tmp_path):
+    output = tmp_path / "scaling.json"
+    command = [sys.executable, "-m", "benchmarks.scaling", "--suppliers", "300", "--items", "1,5",
+               "--copies", "1,2", "--min-time", "0", "--max-calls", "2", "--output", str(output)]
+    subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    result = json.loads(output.read_text())
+    functions = Counter(row["function"] for row in result["results"])
+    assert functions == {
+        "scoring_engine_build": 1, "match_suppliers_for_rfq": 2, "get_recommended_suppliers": 1,
+        "search_materials": 2, "get_materials_by_capability": 2,
+    }
+
+    compared = subprocess.run(command[:-1] + [str(tmp_path / "again.json"), "--compare", str(output)],
+                              cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    assert "% time" in compared.stdout
@@ -0,0 +1,64 @@
+"""Ranked, typo-tolerant search index."""
+import json
+
+from app.services.search_index import SearchIndex, tokenize
+
+DOCUMENTS = [
+    ({"id": "tungsten"}, {"name": "Tungsten", "description": "Refractory metal with the highest melting point"}),
+    ({"id": "molybdenum"}, {"name": "Molybdenum", "description": "Refractory metal used in furnaces"}),
+    ({"id": "w-re"}, {"name": "Tungsten-rhenium W-Re", "description": "Thermocouple wire"}),
+    ({"id": "titanium"}, {"name": "Titanium", "description": "Light aerospace metal, also used with tungsten carbide"}),
+]
+WEIGHTS = {"name": 3.0, "description": 1.0}
+
+
+def _ids(index, query, **kwargs):
+    total, hits = index.search(query, **kwargs)
+    return total, [hit.document["id"] for hit in hits]
+
+
+def test_tokenize_splits_compounds_and_keeps_them():
+    assert tokenize("W-Re 99.95% wire") == ["w-re", "w", "re", "99.95", "99", "95", "wire"]
+
+
+def test_name_matches_outrank_description_matches():
+    index = SearchIndex(DOCUMENTS, WEIGHTS)
+    total, ids = _ids(index, "tungsten")
+    assert total == 3
+    assert ids[-1] == "titanium"
+    assert set(ids[:2]) == {"tungsten", "w-re"}
+
+
+def test_typos_and_prefixes_still_find_the_material():
+    index = SearchIndex(DOCUMENTS, WEIGHTS)
+    assert index.best("tungstn")["id"] == "tungsten"
+    assert index.best("molybdneum")["id"] == "molybdenum"
+    assert index.best("molyb")["id"] == "molybdenum"
+    assert index.best("w-re thermocouple")["id"] == "w-re"
+    # Stop words and unknown terms match nothing
+    assert index.search("what is the") == (0, [])
+    assert index.best("zzzz") is None
+
+
+def test_paging_keeps_the_ranking():
+    index = SearchIndex(DOCUMENTS, WEIGHTS)
+    total, ranked = _ids(index, "refractory metal", limit=10)
+    assert total == 3 and ranked[-1] == "titanium"
+    assert _ids(index, "refractory metal", limit=2, offset=1) == (3, ranked[1:3])
+    assert _ids(index, "refractory metal", limit=0) == (3, [])
+
+
+def test_saved_state_restores_the_same_results():
+    index = SearchIndex(DOCUMENTS, WEIGHTS)
+    state = json.loads(json.dumps(index.to_state()))
+    restored = SearchIndex.from_state(state, [payload for payload, _ in DOCUMENTS])
+    for query in ("tungsten", "tungstn carbide", "refractory", "molyb"):
+        assert _ids(restored, query) == _ids(index, query)
+
+
+def test_search_endpoint_ranks_the_catalog(client):
+    response = client.get("/api/v1/chat/search", params={"q": "molybdneum", "limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"][0]["id"] == "molybdenum"
+    assert len(body["results"]) == min(2, body["count"])
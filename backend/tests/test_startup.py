@@ -0,0 +1,72 @@
+"""Cold start: slow SDKs stay out of the import, and the background warm-up."""
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.services import startup
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SLOW_MODULES = ("firebase_admin", "google.cloud.firestore", "openai", "anthropic", "tiktoken", "sendgrid")
+
+
+@pytest.fixture
+def fresh_stats(monkeypatch):
+    for name in ("_phases", "_milestones", "_errors"):
+        monkeypatch.setattr(startup, name, {})
+    monkeypatch.setattr(startup, "_warmup_task", None)
+
+
+def test_importing_the_app_leaves_slow_sdks_for_the_warm_up():
+    code = f"import sys, app.main; print([m for m in {SLOW_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+def test_warm_up_runs_chains_concurrently_and_steps_in_order(fresh_stats):
+    events = []
+
+    def step(name, fail=False):
+        async def run():
+            events.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            if fail:
+                raise RuntimeError(f"{name} unreachable")
+            events.append(f"{name}:done")
+        return name, run
+
+    async def run():
+        startup.start_warmup([step("a1", fail=True), step("a2")], [step("b1")])
+        await startup._warmup_task
+
+    asyncio.run(run())
+    # b1 starts while a1 is running; a2 still runs after a1 failed
+    assert events.index("b1:start") < events.index("a2:start")
+    assert events.index("a2:start") > events.index("a1:start")
+    assert "a2:done" in events
+
+    stats = startup.get_startup_stats()
+    assert stats["warm"] is True
+    assert stats["errors"] == {"a1": "a1 unreachable"}
+    assert {"warmup.a1", "warmup.a2", "warmup.b1"} <= set(stats["phases_ms"])
+
+
+def test_stop_cancels_an_unfinished_warm_up(fresh_stats):
+    async def run():
+        startup.start_warmup([("slow", lambda: asyncio.sleep(60))])
+        await asyncio.sleep(0)
+        task = startup._warmup_task
+        await startup.stop_warmup()
+        return task
+
+    task = asyncio.run(run())
+    assert task.cancelled()
+    assert startup.get_startup_stats()["warm"] is False
+
+
+def test_health_reports_startup_phases(client):
+    stats = client.get("/health").json()["startup"]
+    assert {"imported", "serving"} <= set(stats["milestones_ms"])
+    assert "material_catalog" in stats["phases_ms"]
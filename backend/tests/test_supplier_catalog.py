@@ -0,0 +1,84 @@
+"""Supplier catalog replica: full reads, listener races and staleness."""
+import asyncio
+
+import pytest
+
+from app.routers import rfq as rfq_router
+from app.services import firebase, supplier_catalog
+
+SUPPLIERS = [
+    {"id": "s1", "name": "Alpha", "capabilities": ["tungsten"]},
+    {"id": "s2", "name": "Beta", "capabilities": ["tantalum"]},
+]
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A fresh, empty replica with one recording subscriber."""
+    monkeypatch.setattr(supplier_catalog, "_suppliers", {})
+    monkeypatch.setattr(supplier_catalog, "_subscribers", [])
+    monkeypatch.setattr(supplier_catalog, "_version", 0)
+    monkeypatch.setattr(supplier_catalog, "_loaded", False)
+    monkeypatch.setattr(supplier_catalog, "_last_sync", None)
+    changes = []
+    supplier_catalog.subscribe(lambda upserts, removals: changes.append((sorted(upserts), removals)))
+    return changes
+
+
+def _reads(monkeypatch, *results):
+    results = list(results)
+
+    async def load_suppliers(capabilities=None):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(firebase, "load_suppliers", load_suppliers)
+
+
+def test_failed_read_keeps_the_replica_but_empty_read_empties_it(replica, monkeypatch):
+    _reads(monkeypatch, SUPPLIERS, RuntimeError("deadline exceeded"), [])
+    asyncio.run(supplier_catalog.refresh_suppliers())
+    with pytest.raises(RuntimeError):
+        asyncio.run(supplier_catalog.refresh_suppliers())
+    assert supplier_catalog.get_catalog_stats()["suppliers"] == 2
+
+    asyncio.run(supplier_catalog.refresh_suppliers())
+    assert supplier_catalog.get_catalog_stats()["suppliers"] == 0
+    assert replica == [(["s1", "s2"], []), ([], ["s1", "s2"])]
+
+
+def test_read_overtaken_by_the_listener_is_dropped(replica, monkeypatch):
+    supplier_catalog._apply_changes({s["id"]: s for s in SUPPLIERS}, [])
+
+    async def load_suppliers(capabilities=None):
+        # The listener removes s2 while the full read is in flight
+        supplier_catalog._apply_changes({}, ["s2"])
+        return SUPPLIERS
+
+    monkeypatch.setattr(firebase, "load_suppliers", load_suppliers)
+    asyncio.run(supplier_catalog.refresh_suppliers())
+    assert supplier_catalog.get_supplier("s2") is None
+
+
+def test_staleness_counts_from_the_last_delivery(replica, monkeypatch):
+    assert supplier_catalog.get_staleness_seconds() is None
+    supplier_catalog._apply_changes({"s1": SUPPLIERS[0]}, [])
+    monkeypatch.setattr(supplier_catalog, "_last_sync", supplier_catalog._last_sync - 120)
+    # An attached listener does not make the replica fresh by itself
+    monkeypatch.setattr(supplier_catalog, "_listener", object())
+    assert supplier_catalog.get_staleness_seconds() >= 120
+
+
+def test_refresh_endpoint_is_admin_only(client, replica, monkeypatch):
+    _reads(monkeypatch, SUPPLIERS)
+    url = "/api/v1/rfq/suppliers/refresh"
+    monkeypatch.setattr(rfq_router, "ADMIN_API_TOKEN", "")
+    assert client.post(url, headers={"Authorization": "Bearer anything"}).status_code == 404
+
+    monkeypatch.setattr(rfq_router, "ADMIN_API_TOKEN", "s3cret")
+    assert client.post(url).status_code == 401
+    response = client.post(url, headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert response.json()["suppliers"] == 2